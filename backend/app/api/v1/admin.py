@@ -22,6 +22,10 @@ from app.schemas.user import (
 )
 from app.schemas.report import DatasetCreate, DatasetResponse
 from app.schemas.common import PaginatedResponse, SuccessResponse, CountResponse
+from app.core.database import async_engine
+from app.core.telemetry import query_telemetry, pool_status
+from app.core.materialized_views import MaterializedViewRegistry
+from app.api.v1.datasets import invalidate_dataset_cache
 
 logger = logging.getLogger(__name__)
 
@@ -479,6 +483,7 @@ async def create_dataset(
     db.add(dataset)
     await db.commit()
     await db.refresh(dataset)
+    invalidate_dataset_cache()
 
     return DatasetResponse(
         dataset_id=dataset.dataset_id,
@@ -525,3 +530,30 @@ async def get_admin_stats(
         "reports": report_count,
         "ai_conversations": conversation_count
     }
+
+
+# Database Telemetry
+@router.get("/telemetry/database")
+async def get_database_telemetry(
+    admin: UserAdminAccess,
+    top: int = Query(50, ge=1, le=500)
+):
+    """Get per-statement latency, slow queries and connection pool usage"""
+    snapshot = query_telemetry.snapshot(top=top)
+    snapshot["pool_status"] = pool_status(async_engine.sync_engine)
+    return snapshot
+
+
+@router.get("/materialized-views")
+async def get_materialized_views(admin: UserAdminAccess):
+    """Get the materialized views queries are currently rewritten to"""
+    await MaterializedViewRegistry.refresh()
+    return MaterializedViewRegistry.snapshot()
+
+
+@router.post("/telemetry/database/reset", response_model=SuccessResponse)
+async def reset_database_telemetry(admin: UserAdminAccess):
+    """Clear collected database telemetry"""
+    query_telemetry.reset()
+    logger.info(f"Database telemetry reset by admin {admin.email}")
+    return SuccessResponse(message="Database telemetry reset")
@@ -28,13 +28,18 @@ from app.schemas.ai import (
     ReportSuggestionRequest, ReportSuggestionResponse
 )
 from app.schemas.common import PaginatedResponse, SuccessResponse
-from app.services.ai_service import AIService
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 
+def get_ai_service(db: AsyncSession):
+    """Create an AIService, importing the module on first use to keep startup fast"""
+    from app.services.ai_service import AIService
+    return AIService(db)
+
+
 @router.post("/chat", response_model=ChatResponse)
 async def chat(
     request: ChatRequest,
@@ -46,7 +51,7 @@ async def chat(
     Send a message to the AI assistant.
     Creates a new conversation if conversation_id is not provided.
     """
-    ai_service = AIService(db)
+    ai_service = get_ai_service(db)
 
     # Check if existing conversation (read-only lookup)
     is_new_conversation = not request.conversation_id
@@ -298,7 +303,7 @@ async def generate_sql(
     Generate SQL query from natural language.
     Optionally executes the query if safe.
     """
-    ai_service = AIService(db)
+    ai_service = get_ai_service(db)
 
     # Get user context - admins/super users have full access
     customer_ids = None
@@ -370,7 +375,7 @@ async def get_insights(
     _: None = Depends(ai_rate_limit)
 ):
     """Generate AI-powered insights for a dataset"""
-    ai_service = AIService(db)
+    ai_service = get_ai_service(db)
 
     # Get user context - admins/super users have full access
     customer_ids = None
@@ -409,7 +414,7 @@ async def suggest_dashboard(
     user: UserAIAccess
 ):
     """Get AI suggestions for dashboard widgets"""
-    ai_service = AIService(db)
+    ai_service = get_ai_service(db)
 
     result = await ai_service.suggest_dashboard_widgets(
         dataset=request.dataset,
@@ -429,7 +434,7 @@ async def suggest_report(
     user: UserAIAccess
 ):
     """Get AI suggestions for report configuration"""
-    ai_service = AIService(db)
+    ai_service = get_ai_service(db)
 
     result = await ai_service.suggest_report_config(
         purpose=request.purpose,
@@ -449,7 +454,7 @@ async def semantic_search(
     user: UserAIAccess
 ):
     """Perform semantic search across fleet data"""
-    ai_service = AIService(db)
+    ai_service = get_ai_service(db)
 
     results = await ai_service.vector_search(
         query=request.query,
@@ -2,15 +2,17 @@
 FleetAI - Dataset API Routes
 """
 
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 import json
 import logging
+import time
 
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, text
 
 from app.api.deps import AsyncDB, UserViewReports
+from app.core.config import settings
 from app.models.report import Dataset
 from app.schemas.report import (
     DatasetResponse, DatasetSchemaResponse, DatasetFieldInfo
@@ -21,15 +23,25 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
-@router.get("/", response_model=List[DatasetResponse])
-async def list_datasets(
-    db: AsyncDB,
-    user: UserViewReports,
+# Dataset metadata rarely changes; keep the list responses across requests
+_dataset_cache: Dict[Optional[bool], Tuple[float, List[DatasetResponse]]] = {}
+
+
+def invalidate_dataset_cache() -> None:
+    """Drop cached dataset metadata (call after creating/updating datasets)"""
+    _dataset_cache.clear()
+
+
+async def load_dataset_metadata(
+    db: AsyncSession,
     is_active: Optional[bool] = True
-):
-    """
-    List available datasets for building reports and dashboards.
-    """
+) -> List[DatasetResponse]:
+    """Load dataset metadata, served from cache while fresh"""
+    ttl = settings.DATASET_CACHE_TTL_SECONDS
+    cached = _dataset_cache.get(is_active)
+    if ttl > 0 and cached and (time.time() - cached[0]) < ttl:
+        return cached[1]
+
     query = select(Dataset)
 
     if is_active is not None:
@@ -40,7 +52,7 @@ async def list_datasets(
     result = await db.execute(query)
     datasets = result.scalars().all()
 
-    return [
+    responses = [
         DatasetResponse(
             dataset_id=d.dataset_id,
             name=d.name,
@@ -58,6 +70,22 @@ async def list_datasets(
         for d in datasets
     ]
 
+    if ttl > 0:
+        _dataset_cache[is_active] = (time.time(), responses)
+    return responses
+
+
+@router.get("/", response_model=List[DatasetResponse])
+async def list_datasets(
+    db: AsyncDB,
+    user: UserViewReports,
+    is_active: Optional[bool] = True
+):
+    """
+    List available datasets for building reports and dashboards.
+    """
+    return await load_dataset_metadata(db, is_active)
+
 
 @router.get("/{dataset_name}", response_model=DatasetResponse)
 async def get_dataset(
@@ -11,7 +11,8 @@ from typing import Optional, Literal
 
 from fastapi import APIRouter, Query
 from fastapi.responses import StreamingResponse
-from app.core.database import execute_raw_query
+from app.core.database import execute_raw_query, fetch_rows, fetch_value
+from app.core.serialization import RawJSONResponse
 
 logger = logging.getLogger(__name__)
 
@@ -51,27 +52,27 @@ async def get_operations_kpis():
     """Get fleet operations KPI summary from dim_vehicle."""
     try:
         # Count active vehicles (status_code = 1)
-        active_result = await execute_raw_query(
-            "SELECT COUNT(*) as cnt FROM dim_vehicle WHERE vehicle_status_code = 1"
+        active_vehicles = await fetch_value(
+            "SELECT COUNT(*) as cnt FROM dim_vehicle WHERE vehicle_status_code = 1",
+            default=0
         )
-        active_vehicles = active_result[0]['cnt'] if active_result else 0
 
         # Count vehicles started in last 12 months (by lease_start_date)
-        started_result = await execute_raw_query(
+        started_last_12_months = await fetch_value(
             "SELECT COUNT(*) as cnt FROM dim_vehicle "
             "WHERE lease_start_date >= date('now', '-12 months') "
-            "AND lease_start_date IS NOT NULL"
+            "AND lease_start_date IS NOT NULL",
+            default=0
         )
-        started_last_12_months = started_result[0]['cnt'] if started_result else 0
 
         # Count vehicles terminated in last 12 months (by lease_end_date + status)
-        terminated_result = await execute_raw_query(
+        terminated_last_12_months = await fetch_value(
             "SELECT COUNT(*) as cnt FROM dim_vehicle "
             "WHERE vehicle_status_code >= 2 "
             "AND lease_end_date >= date('now', '-12 months') "
-            "AND lease_end_date IS NOT NULL"
+            "AND lease_end_date IS NOT NULL",
+            default=0
         )
-        terminated_last_12_months = terminated_result[0]['cnt'] if terminated_result else 0
 
         # Active within 12 months = active + started + terminated within 12m
         active_within_12_months = active_vehicles + started_last_12_months + terminated_last_12_months
@@ -168,8 +169,7 @@ async def get_vehicles_list(
             LEFT JOIN dim_driver d ON v.vehicle_id = d.vehicle_id AND d.is_primary_driver = 1
             {where_clause}
         """
-        count_result = await execute_raw_query(count_query, params)
-        total = count_result[0]['total'] if count_result else 0
+        total = await fetch_value(count_query, params, default=0)
         total_pages = math.ceil(total / page_size) if total > 0 else 1
 
         # Fetch page
@@ -201,15 +201,15 @@ async def get_vehicles_list(
         params["limit"] = page_size
         params["offset"] = offset
 
-        rows = await execute_raw_query(data_query, params)
+        rows = await fetch_rows(data_query, params)
 
-        return {
+        return RawJSONResponse({
             "items": rows,
             "total": total,
             "total_pages": total_pages,
             "page": page,
             "page_size": page_size,
-        }
+        })
     except Exception as e:
         logger.error(f"Error fetching vehicles list: {e}")
         raise
@@ -452,8 +452,7 @@ async def get_renewals_kpis():
                   WHERE previous_object_no IS NOT NULL AND order_status_code < 6
               )
         """
-        result = await execute_raw_query(overdue_with_order_query)
-        overdue_with_order = result[0]['cnt'] if result else 0
+        overdue_with_order = await fetch_value(overdue_with_order_query, default=0)
 
         # Query 2: Overdue without order (days_to_contract_end < 0 AND no active order)
         overdue_no_order_query = """
@@ -466,8 +465,7 @@ async def get_renewals_kpis():
                   WHERE previous_object_no IS NOT NULL AND order_status_code < 6
               )
         """
-        result = await execute_raw_query(overdue_no_order_query)
-        overdue_no_order = result[0]['cnt'] if result else 0
+        overdue_no_order = await fetch_value(overdue_no_order_query, default=0)
 
         # Query 3: Due without order (0-90 days AND no active order)
         due_no_order_query = """
@@ -480,8 +478,7 @@ async def get_renewals_kpis():
                   WHERE previous_object_no IS NOT NULL AND order_status_code < 6
               )
         """
-        result = await execute_raw_query(due_no_order_query)
-        due_no_order = result[0]['cnt'] if result else 0
+        due_no_order = await fetch_value(due_no_order_query, default=0)
 
         # Query 4: Renewal orders (has previous_object_no, not delivered)
         renewal_orders_query = """
@@ -490,8 +487,7 @@ async def get_renewals_kpis():
             WHERE previous_object_no IS NOT NULL
               AND order_status_code < 6
         """
-        result = await execute_raw_query(renewal_orders_query)
-        renewal_orders = result[0]['cnt'] if result else 0
+        renewal_orders = await fetch_value(renewal_orders_query, default=0)
 
         # Query 5: New orders (no previous_object_no, not delivered)
         new_orders_query = """
@@ -500,8 +496,7 @@ async def get_renewals_kpis():
             WHERE previous_object_no IS NULL
               AND order_status_code < 6
         """
-        result = await execute_raw_query(new_orders_query)
-        new_orders = result[0]['cnt'] if result else 0
+        new_orders = await fetch_value(new_orders_query, default=0)
 
         return {
             "overdue_renewals_with_order": overdue_with_order,
@@ -664,8 +659,7 @@ async def _get_renewal_vehicles_list(
         LEFT JOIN dim_driver d ON v.vehicle_id = d.vehicle_id AND d.is_primary_driver = 1
         {where_clause}
     """
-    count_result = await execute_raw_query(count_query, params)
-    total = count_result[0]['total'] if count_result else 0
+    total = await fetch_value(count_query, params, default=0)
     total_pages = math.ceil(total / page_size) if total > 0 else 1
 
     # Fetch page with order info
@@ -703,16 +697,16 @@ async def _get_renewal_vehicles_list(
     params["limit"] = page_size
     params["offset"] = offset
 
-    rows = await execute_raw_query(data_query, params)
+    rows = await fetch_rows(data_query, params)
 
-    return {
+    return RawJSONResponse({
         "items": rows,
         "total": total,
         "total_pages": total_pages,
         "page": page,
         "page_size": page_size,
         "filter_type": filter_type
-    }
+    })
 
 
 async def _get_orders_list(
@@ -771,8 +765,7 @@ async def _get_orders_list(
         LEFT JOIN staging_customers c ON o.customer_no = c.customer_id
         {where_clause}
     """
-    count_result = await execute_raw_query(count_query, params)
-    total = count_result[0]['total'] if count_result else 0
+    total = await fetch_value(count_query, params, default=0)
     total_pages = math.ceil(total / page_size) if total > 0 else 1
 
     # Fetch page
@@ -806,16 +799,16 @@ async def _get_orders_list(
     params["limit"] = page_size
     params["offset"] = offset
 
-    rows = await execute_raw_query(data_query, params)
+    rows = await fetch_rows(data_query, params)
 
-    return {
+    return RawJSONResponse({
         "items": rows,
         "total": total,
         "total_pages": total_pages,
         "page": page,
         "page_size": page_size,
         "filter_type": filter_type
-    }
+    })
 
 
 @router.get("/renewals/export")
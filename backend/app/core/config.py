@@ -41,6 +41,28 @@ class Settings(BaseSettings):
     MSSQL_DRIVER: str = Field(default="ODBC Driver 18 for SQL Server")
     MSSQL_POOL_SIZE: int = Field(default=10, ge=1, le=50)
     MSSQL_MAX_OVERFLOW: int = Field(default=20, ge=0, le=100)
+    DB_CREATE_ALL_ON_STARTUP: bool = Field(default=True, description="Run metadata.create_all at startup; disable when migrations are managed externally")
+
+    # Startup Warm-up & Caching
+    WARMUP_ENABLED: bool = Field(default=True, description="Pre-load caches in the lifespan before serving")
+    WARMUP_TIMEOUT_SECONDS: float = Field(default=30.0, ge=1, description="Upper bound on the warm-up phase")
+    WARMUP_MAX_WIDGETS: int = Field(default=20, ge=0, description="Dashboard widgets pre-computed at startup")
+    WIDGET_RESULT_CACHE_TTL_SECONDS: int = Field(default=300, ge=0, description="Widget result cache TTL (0 disables)")
+    DATASET_CACHE_TTL_SECONDS: int = Field(default=300, ge=0, description="Dataset metadata cache TTL (0 disables)")
+
+    # Health Checks
+    HEALTH_CHECK_INTERVAL_SECONDS: int = Field(default=60, ge=5, description="Interval of the background deep health check")
+
+    # Query & Pool Telemetry
+    QUERY_TELEMETRY_ENABLED: bool = Field(default=True, description="Record per-statement and pool metrics")
+    QUERY_TELEMETRY_MAX_FINGERPRINTS: int = Field(default=500, ge=10, description="Distinct statements tracked before grouping as <other>")
+    SLOW_QUERY_THRESHOLD_MS: float = Field(default=500.0, ge=0, description="Statements slower than this are logged")
+    METRICS_TOKEN: Optional[str] = Field(default=None, description="Bearer token required by /metrics (the endpoint is disabled when unset)")
+    METRICS_MAX_STATEMENTS: int = Field(default=50, ge=1, description="Statements exported to /metrics with their own label; the rest are summed as other")
+
+    # Materialized Views (mv_* copies of heavy semantic views, maintained by the ETL)
+    MATERIALIZED_VIEW_REWRITE_ENABLED: bool = Field(default=True, description="Read heavy view_* views from their fresh mv_* copies")
+    MATERIALIZED_VIEW_REGISTRY_TTL_SECONDS: int = Field(default=60, ge=1, description="How often the fresh materialized view list is reloaded")
 
     # Azure OpenAI (optional for local testing)
     AZURE_OPENAI_ENDPOINT: Optional[str] = Field(default=None, description="Azure OpenAI Endpoint URL")
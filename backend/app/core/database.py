@@ -3,16 +3,25 @@ FleetAI - Database Configuration
 SQLAlchemy async database setup supporting SQLite (dev) and MSSQL (production)
 """
 
-from typing import AsyncGenerator
+from typing import Any, AsyncGenerator, Dict, List, Optional, Sequence, Union
 from contextlib import asynccontextmanager
+from datetime import datetime
+from functools import lru_cache
+import asyncio
 import logging
+import time
 
-from sqlalchemy import create_engine, text, event
+from sqlalchemy import create_engine, text, event, RowMapping, TextClause
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import Session, sessionmaker, DeclarativeBase
-from sqlalchemy.pool import QueuePool, StaticPool
+from sqlalchemy.pool import StaticPool
 
 from .config import settings
+from .materialized_views import install_view_rewriter
+from .telemetry import (
+    TimedAsyncAdaptedQueuePool, TimedQueuePool, instrument_engine, pool_status,
+    query_telemetry
+)
 
 logger = logging.getLogger(__name__)
 
@@ -42,7 +51,7 @@ else:
     # MSSQL configuration (for production)
     sync_engine = create_engine(
         settings.database_url,
-        poolclass=QueuePool,
+        poolclass=TimedQueuePool,
         pool_size=settings.MSSQL_POOL_SIZE,
         max_overflow=settings.MSSQL_MAX_OVERFLOW,
         pool_pre_ping=True,
@@ -52,6 +61,7 @@ else:
 
     async_engine = create_async_engine(
         settings.async_database_url,
+        poolclass=TimedAsyncAdaptedQueuePool,
         pool_size=settings.MSSQL_POOL_SIZE,
         max_overflow=settings.MSSQL_MAX_OVERFLOW,
         pool_pre_ping=True,
@@ -59,6 +69,14 @@ else:
         echo=settings.DEBUG,
     )
 
+# Statement latency and pool usage metrics
+instrument_engine(sync_engine)
+instrument_engine(async_engine.sync_engine)
+
+# Reads of heavy semantic views go to their fresh materialized copies
+install_view_rewriter(sync_engine)
+install_view_rewriter(async_engine.sync_engine)
+
 # Session factories
 SyncSessionLocal = sessionmaker(
     bind=sync_engine,
@@ -145,6 +163,60 @@ async def get_session_with_user(user_id: int) -> AsyncGenerator[AsyncSession, No
             await session.close()
 
 
+@lru_cache(maxsize=512)
+def compiled_text(query: str) -> TextClause:
+    """
+    Return a cached text() construct for a SQL string.
+
+    Endpoints build the same handful of statements on every request; caching
+    the construct lets SQLAlchemy reuse its compiled form instead of parsing
+    bind parameters again for each call.
+    """
+    return text(query)
+
+
+async def fetch_rows(
+    query: str,
+    params: dict = None,
+    columnar: bool = False,
+) -> Union[Sequence[RowMapping], Dict[str, List[Any]]]:
+    """
+    Execute a read-only SQL query on a raw async connection.
+
+    Skips the ORM session entirely, which makes it the preferred path for
+    read endpoints that only need rows back.
+
+    Args:
+        query: SQL query string
+        params: Optional parameters dict
+        columnar: Return {column: [values]} instead of row mappings
+
+    Returns:
+        Sequence of RowMapping (dict-like, read-only) or column-oriented arrays
+    """
+    async with async_engine.connect() as conn:
+        result = await conn.execute(compiled_text(query), params or {})
+        if columnar:
+            columns = list(result.keys())
+            rows = result.fetchall()
+            query_telemetry.record_rows(query, len(rows))
+            return {
+                column: [row[i] for row in rows]
+                for i, column in enumerate(columns)
+            }
+        rows = result.mappings().all()
+        query_telemetry.record_rows(query, len(rows))
+        return rows
+
+
+async def fetch_value(query: str, params: dict = None, default: Any = None) -> Any:
+    """Execute a query and return the first column of the first row"""
+    async with async_engine.connect() as conn:
+        result = await conn.execute(compiled_text(query), params or {})
+        value = result.scalar()
+        return default if value is None else value
+
+
 async def execute_raw_query(query: str, params: dict = None) -> list:
     """
     Execute a raw SQL query and return results.
@@ -156,10 +228,8 @@ async def execute_raw_query(query: str, params: dict = None) -> list:
     Returns:
         List of result rows as dicts
     """
-    async with AsyncSessionLocal() as session:
-        result = await session.execute(text(query), params or {})
-        columns = result.keys()
-        return [dict(zip(columns, row)) for row in result.fetchall()]
+    rows = await fetch_rows(query, params)
+    return [dict(row) for row in rows]
 
 
 async def check_database_connection() -> bool:
@@ -190,7 +260,73 @@ async def close_database():
 
 
 class DatabaseHealthCheck:
-    """Database health check utility"""
+    """
+    Database health check utility.
+
+    ping() is a single SELECT 1 suitable for readiness probes. The deep check
+    (is_healthy) inspects schemas and tables, so it runs on a background
+    interval and probes read the cached snapshot instead.
+    """
+
+    _snapshot: Optional[dict] = None
+    _refresh_task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    async def ping() -> dict:
+        """Cheap connectivity check for readiness probes"""
+        start = time.perf_counter()
+        try:
+            async with async_engine.connect() as conn:
+                await conn.execute(compiled_text("SELECT 1"))
+            return {
+                "healthy": True,
+                "latency_ms": round((time.perf_counter() - start) * 1000, 2),
+            }
+        except Exception as e:
+            return {
+                "healthy": False,
+                "error": str(e)
+            }
+
+    @staticmethod
+    async def last_etl_run() -> Optional[dict]:
+        """Return the most recent ETL generation recorded in the log tables"""
+        if settings.DATABASE_TYPE == "sqlite":
+            query = """
+                SELECT MAX(load_end) AS completed_at,
+                       MAX(load_start) AS started_at,
+                       SUM(CASE WHEN status = 'FAILED' THEN 1 ELSE 0 END) AS failed_tables,
+                       COUNT(*) AS tables_loaded
+                FROM staging_etl_log
+                WHERE load_start >= (
+                    SELECT datetime(MAX(load_start), '-1 hour') FROM staging_etl_log
+                )
+            """
+        else:
+            query = """
+                SELECT MAX(extraction_end) AS completed_at,
+                       MAX(extraction_start) AS started_at,
+                       SUM(CASE WHEN status = 'FAILED' THEN 1 ELSE 0 END) AS failed_tables,
+                       COUNT(*) AS tables_loaded
+                FROM landing.etl_extraction_log
+                WHERE extraction_start >= (
+                    SELECT DATEADD(hour, -1, MAX(extraction_start)) FROM landing.etl_extraction_log
+                )
+            """
+        try:
+            rows = await fetch_rows(query)
+        except Exception as e:
+            logger.debug(f"ETL log not available: {e}")
+            return None
+        if not rows or rows[0]["started_at"] is None:
+            return None
+        row = rows[0]
+        return {
+            "started_at": str(row["started_at"]),
+            "completed_at": str(row["completed_at"]) if row["completed_at"] else None,
+            "tables_loaded": row["tables_loaded"],
+            "failed_tables": row["failed_tables"] or 0,
+        }
 
     @staticmethod
     async def is_healthy() -> dict:
@@ -247,3 +383,50 @@ class DatabaseHealthCheck:
                 "healthy": False,
                 "error": str(e)
             }
+
+    @classmethod
+    async def refresh_snapshot(cls) -> dict:
+        """Run the deep check and cache the result with pool and ETL info"""
+        start = time.perf_counter()
+        snapshot = await cls.is_healthy()
+        snapshot["pool"] = pool_status(async_engine.sync_engine)
+        snapshot["last_etl_run"] = await cls.last_etl_run()
+        snapshot["check_duration_ms"] = round((time.perf_counter() - start) * 1000, 2)
+        snapshot["checked_at"] = datetime.utcnow().isoformat()
+        cls._snapshot = snapshot
+        return snapshot
+
+    @classmethod
+    async def cached_snapshot(cls) -> dict:
+        """Return the last deep-check snapshot, running it once if none exists"""
+        if cls._snapshot is None:
+            return await cls.refresh_snapshot()
+        return cls._snapshot
+
+    @classmethod
+    def start_background_refresh(cls, interval_seconds: int) -> None:
+        """Refresh the deep-check snapshot every interval_seconds"""
+        if cls._refresh_task is not None and not cls._refresh_task.done():
+            return
+
+        async def _refresh_loop():
+            while True:
+                try:
+                    await cls.refresh_snapshot()
+                except Exception as e:
+                    logger.warning(f"Background health check failed: {e}")
+                await asyncio.sleep(interval_seconds)
+
+        cls._refresh_task = asyncio.create_task(_refresh_loop())
+
+    @classmethod
+    async def stop_background_refresh(cls) -> None:
+        """Cancel the background refresh task"""
+        task, cls._refresh_task = cls._refresh_task, None
+        if task is None:
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
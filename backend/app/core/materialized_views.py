@@ -0,0 +1,126 @@
+"""
+FleetAI - Materialized View Rewriting
+Points queries on heavy semantic views at the mv_* copies maintained by
+the semantic ETL, as long as the ETL has marked the copy fresh
+"""
+
+from datetime import datetime
+from typing import Any, Dict, Optional, Pattern
+import asyncio
+import logging
+import re
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class MaterializedViewRegistry:
+    """
+    Class-level map of view name -> fresh materialized table, read from
+    semantic_materialized_views and reloaded every
+    MATERIALIZED_VIEW_REGISTRY_TTL_SECONDS. The registry only exists in the
+    SQLite semantic layer, so it is only read once install_view_rewriter()
+    has enabled it for a SQLite engine. An unreadable registry leaves the
+    map empty (every query runs against the views themselves) and is logged
+    as a warning once, until it loads again.
+    """
+
+    _enabled: bool = False
+    _warned: bool = False
+    _views: Dict[str, str] = {}
+    _pattern: Optional[Pattern] = None
+    _loaded_at: float = 0.0
+    _refreshed_at: Optional[datetime] = None
+    _refreshing: bool = False
+
+    @classmethod
+    async def refresh(cls) -> Dict[str, str]:
+        """Reload the fresh materialized copies from the database"""
+        from .database import fetch_rows
+
+        if not cls._enabled:
+            return {}
+        cls._refreshing = True
+        try:
+            rows = await fetch_rows("""
+                SELECT view_name, table_name
+                FROM semantic_materialized_views
+                WHERE is_fresh = 1
+            """)
+            views = {row["view_name"]: row["table_name"] for row in rows}
+            cls._warned = False
+        except Exception as e:
+            if not cls._warned:
+                logger.warning(f"Materialized view registry unavailable, reading the views directly: {e}")
+                cls._warned = True
+            views = {}
+        finally:
+            cls._loaded_at = time.monotonic()
+            cls._refreshing = False
+
+        cls._views = views
+        cls._pattern = (
+            re.compile(r"(?<!['\"\w])(" + "|".join(map(re.escape, views)) + r")(?!['\"\w])")
+            if views else None
+        )
+        cls._refreshed_at = datetime.utcnow()
+        return views
+
+    @classmethod
+    def is_expired(cls) -> bool:
+        return time.monotonic() - cls._loaded_at >= settings.MATERIALIZED_VIEW_REGISTRY_TTL_SECONDS
+
+    @classmethod
+    def rewrite(cls, statement: str) -> str:
+        """Replace references to materialized views (not quoted literals) with their copies"""
+        pattern = cls._pattern
+        if pattern is None:
+            return statement
+        views = cls._views
+        return pattern.sub(lambda m: views[m.group(1)], statement)
+
+    @classmethod
+    def snapshot(cls) -> Dict[str, Any]:
+        return {
+            "enabled": cls._enabled,
+            "views": dict(cls._views),
+            "refreshed_at": cls._refreshed_at.isoformat() if cls._refreshed_at else None,
+        }
+
+
+def _schedule_refresh() -> None:
+    """Reload the registry in the background when its TTL has passed"""
+    if MaterializedViewRegistry._refreshing or not MaterializedViewRegistry.is_expired():
+        return
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        # Sync engine outside the event loop: keep using the current map
+        return
+    MaterializedViewRegistry._refreshing = True
+    loop.create_task(MaterializedViewRegistry.refresh())
+
+
+def install_view_rewriter(engine: Engine) -> None:
+    """
+    Rewrite statements on a (sync) engine to read materialized copies.
+    Only SQLite engines are rewritten: the mv_* copies and their registry
+    are maintained by the SQLite semantic ETL.
+
+    For async engines pass ``async_engine.sync_engine``.
+    """
+    if not settings.MATERIALIZED_VIEW_REWRITE_ENABLED or engine.dialect.name != "sqlite":
+        return
+    MaterializedViewRegistry._enabled = True
+
+    @event.listens_for(engine, "before_cursor_execute", retval=True)
+    def _rewrite_views(conn, cursor, statement, parameters, context, executemany):
+        if "view_" not in statement:
+            return statement, parameters
+        _schedule_refresh()
+        return MaterializedViewRegistry.rewrite(statement), parameters
@@ -0,0 +1,53 @@
+"""
+FleetAI - Response Serialization
+Direct-to-JSON bytes encoding for large row sets
+"""
+
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any
+import json
+
+from fastapi.responses import Response
+from sqlalchemy import RowMapping
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib encoder
+    orjson = None
+
+
+def _default(value: Any) -> Any:
+    """Encode types the JSON encoders do not handle natively"""
+    if isinstance(value, RowMapping):
+        return dict(value)
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, bytes):
+        return value.decode("utf-8", errors="replace")
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(payload: Any) -> bytes:
+    """
+    Serialize a payload (dicts, lists, RowMapping rows) straight to JSON bytes.
+
+    Bypasses FastAPI's jsonable_encoder and Pydantic validation, which walk
+    every value of every row before encoding.
+    """
+    if orjson is not None:
+        return orjson.dumps(payload, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(payload, default=_default, separators=(",", ":")).encode("utf-8")
+
+
+class RawJSONResponse(Response):
+    """JSON response that encodes its content with dumps()"""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return dumps(content)
@@ -0,0 +1,383 @@
+"""
+FleetAI - Database Telemetry
+Per-statement latency, row counts and connection pool usage collected
+through SQLAlchemy engine and pool events
+"""
+
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+import hashlib
+import logging
+import re
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+# Literal patterns stripped when building a statement fingerprint
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_BIND_PARAM = re.compile(r"(?<![:\w]):\w+|%\(\w+\)s")
+_IN_LIST = re.compile(r"\bIN\s*\((?:\s*\?\s*,?)+\)", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+
+def fingerprint_sql(statement: str) -> str:
+    """
+    Normalize a SQL statement so that queries differing only in literal
+    values are grouped together.
+    """
+    normalized = _STRING_LITERAL.sub("?", statement)
+    normalized = _NUMBER_LITERAL.sub("?", normalized)
+    normalized = _BIND_PARAM.sub("?", normalized)
+    normalized = _WHITESPACE.sub(" ", normalized).strip()
+    normalized = _IN_LIST.sub("IN (?)", normalized)
+    return normalized[:1000]
+
+
+def statement_id(fingerprint: str) -> str:
+    """Short stable id of a fingerprint, used as the Prometheus label"""
+    return hashlib.sha1(fingerprint.encode("utf-8")).hexdigest()[:12]
+
+
+class _StatementStats:
+    """Aggregated timings for one statement fingerprint"""
+
+    __slots__ = ("calls", "total_ms", "max_ms", "rows", "errors", "last_seen")
+
+    def __init__(self):
+        self.calls = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.rows = 0
+        self.errors = 0
+        self.last_seen: Optional[datetime] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "total_ms": round(self.total_ms, 3),
+            "avg_ms": round(self.total_ms / self.calls, 3) if self.calls else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "rows": self.rows,
+            "errors": self.errors,
+            "last_seen": self.last_seen.isoformat() if self.last_seen else None,
+        }
+
+
+class QueryTelemetry:
+    """In-memory collector for statement and pool metrics"""
+
+    def __init__(
+        self,
+        slow_query_threshold_ms: float = 500.0,
+        max_fingerprints: int = 500,
+        slow_log_size: int = 100,
+    ):
+        self.slow_query_threshold_ms = slow_query_threshold_ms
+        self.max_fingerprints = max_fingerprints
+        self._lock = threading.Lock()
+        self._statements: Dict[str, _StatementStats] = {}
+        self._slow_queries: deque = deque(maxlen=slow_log_size)
+        self._pool = {
+            "checkouts": 0,
+            "checkout_wait_ms_total": 0.0,
+            "checkout_wait_ms_max": 0.0,
+            "overflow_checkouts": 0,
+            "overflow_max": 0,
+            "timeouts": 0,
+            "connects": 0,
+            "invalidations": 0,
+        }
+        self._started_at = datetime.utcnow()
+
+    # Statements
+    def record_statement(
+        self,
+        statement: str,
+        elapsed_ms: float,
+        rows: int = 0,
+        error: bool = False,
+    ) -> None:
+        """Record one statement execution"""
+        fingerprint = fingerprint_sql(statement)
+        with self._lock:
+            stats = self._statements.get(fingerprint)
+            if stats is None:
+                if len(self._statements) >= self.max_fingerprints:
+                    fingerprint = "<other>"
+                    stats = self._statements.setdefault(fingerprint, _StatementStats())
+                else:
+                    stats = self._statements[fingerprint] = _StatementStats()
+            stats.calls += 1
+            stats.total_ms += elapsed_ms
+            stats.max_ms = max(stats.max_ms, elapsed_ms)
+            stats.rows += max(rows, 0)
+            stats.errors += 1 if error else 0
+            stats.last_seen = datetime.utcnow()
+
+        if elapsed_ms >= self.slow_query_threshold_ms:
+            with self._lock:
+                self._slow_queries.append({
+                    "fingerprint": fingerprint,
+                    "elapsed_ms": round(elapsed_ms, 3),
+                    "rows": rows,
+                    "at": datetime.utcnow().isoformat(),
+                })
+            logger.warning(f"Slow query ({elapsed_ms:.1f} ms): {fingerprint[:200]}")
+
+    def record_rows(self, statement: str, rows: int) -> None:
+        """Add rows fetched by a caller to an already recorded statement"""
+        fingerprint = fingerprint_sql(statement)
+        with self._lock:
+            stats = self._statements.get(fingerprint)
+            if stats is not None:
+                stats.rows += rows
+
+    # Pool
+    def record_checkout_wait(self, wait_ms: float, overflow: int) -> None:
+        """Record the time spent waiting for a pooled connection"""
+        with self._lock:
+            pool = self._pool
+            pool["checkouts"] += 1
+            pool["checkout_wait_ms_total"] += wait_ms
+            pool["checkout_wait_ms_max"] = max(pool["checkout_wait_ms_max"], wait_ms)
+            if overflow > 0:
+                pool["overflow_checkouts"] += 1
+                pool["overflow_max"] = max(pool["overflow_max"], overflow)
+
+    def record_pool_event(self, name: str) -> None:
+        """Increment a pool event counter (timeouts, connects, invalidations)"""
+        with self._lock:
+            self._pool[name] = self._pool.get(name, 0) + 1
+
+    # Reporting
+    def snapshot(self, top: int = 50) -> Dict[str, Any]:
+        """Return a point-in-time copy of all collected metrics"""
+        with self._lock:
+            statements = sorted(
+                ((fp, stats.to_dict()) for fp, stats in self._statements.items()),
+                key=lambda item: item[1]["total_ms"],
+                reverse=True,
+            )
+            pool = dict(self._pool)
+            slow_queries = list(self._slow_queries)
+
+        checkouts = pool["checkouts"]
+        pool["checkout_wait_ms_avg"] = (
+            round(pool["checkout_wait_ms_total"] / checkouts, 3) if checkouts else 0.0
+        )
+        return {
+            "since": self._started_at.isoformat(),
+            "slow_query_threshold_ms": self.slow_query_threshold_ms,
+            "statements": [
+                {"statement_id": statement_id(fp), "fingerprint": fp, **stats}
+                for fp, stats in statements[:top]
+            ],
+            "pool": pool,
+            "slow_queries": slow_queries,
+        }
+
+    def reset(self) -> None:
+        """Clear all collected metrics"""
+        with self._lock:
+            self._statements.clear()
+            self._slow_queries.clear()
+            for key in self._pool:
+                self._pool[key] = 0
+            self._started_at = datetime.utcnow()
+
+    def _statement_totals(self, max_statements: int) -> List[tuple]:
+        """
+        (statement id, calls, total ms, rows) of the first max_statements
+        fingerprints seen, plus one "other" entry summing the rest. Labels
+        follow first-seen order, so a statement never moves between series
+        and every series stays a monotonic counter.
+        """
+        with self._lock:
+            stats = list(self._statements.items())
+
+        totals = [
+            (statement_id(fp), s.calls, s.total_ms, s.rows) for fp, s in stats[:max_statements]
+        ]
+        rest = [s for _, s in stats[max_statements:]]
+        if rest:
+            totals.append((
+                "other",
+                sum(s.calls for s in rest),
+                sum(s.total_ms for s in rest),
+                sum(s.rows for s in rest),
+            ))
+        return totals
+
+    def to_prometheus(self, pool_status: Optional[Dict[str, Any]] = None, max_statements: int = 50) -> str:
+        """
+        Render metrics in the Prometheus text exposition format. Statements
+        are labelled by statement_id (the SQL itself is only in the admin
+        telemetry endpoint), at most max_statements of them.
+        """
+        snapshot = self.snapshot(top=0)
+        lines: List[str] = []
+
+        def metric(name: str, kind: str, help_text: str, samples: List[tuple]) -> None:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                label_text = ""
+                if labels:
+                    label_text = "{" + ",".join(
+                        f'{k}="{_escape_label(str(v))}"' for k, v in labels.items()
+                    ) + "}"
+                lines.append(f"{name}{label_text} {value}")
+
+        statements = self._statement_totals(max_statements)
+        metric(
+            "fleetai_db_statement_calls_total", "counter",
+            "Statements executed, by statement id (see the admin database telemetry)",
+            [({"statement": sid}, calls) for sid, calls, _, _ in statements],
+        )
+        metric(
+            "fleetai_db_statement_seconds_total", "counter",
+            "Total statement execution time in seconds, by statement id",
+            [({"statement": sid}, total_ms / 1000) for sid, _, total_ms, _ in statements],
+        )
+        metric(
+            "fleetai_db_statement_rows_total", "counter",
+            "Rows returned or affected, by statement id",
+            [({"statement": sid}, rows) for sid, _, _, rows in statements],
+        )
+        metric(
+            "fleetai_db_slow_queries", "gauge",
+            "Entries currently held in the slow query log",
+            [({}, len(snapshot["slow_queries"]))],
+        )
+
+        pool = snapshot["pool"]
+        metric(
+            "fleetai_db_pool_checkouts_total", "counter",
+            "Connections checked out of the pool", [({}, pool["checkouts"])],
+        )
+        metric(
+            "fleetai_db_pool_checkout_wait_seconds_total", "counter",
+            "Total time spent waiting for a pooled connection",
+            [({}, pool["checkout_wait_ms_total"] / 1000)],
+        )
+        metric(
+            "fleetai_db_pool_checkout_wait_seconds_max", "gauge",
+            "Longest wait for a pooled connection",
+            [({}, pool["checkout_wait_ms_max"] / 1000)],
+        )
+        metric(
+            "fleetai_db_pool_overflow_checkouts_total", "counter",
+            "Checkouts served by overflow connections", [({}, pool["overflow_checkouts"])],
+        )
+        metric(
+            "fleetai_db_pool_timeouts_total", "counter",
+            "Checkouts that timed out because the pool was exhausted",
+            [({}, pool["timeouts"])],
+        )
+
+        for name, value in (pool_status or {}).items():
+            if isinstance(value, (int, float)):
+                metric(
+                    f"fleetai_db_pool_{name}", "gauge",
+                    f"Current pool {name.replace('_', ' ')}", [({}, value)],
+                )
+
+        return "\n".join(lines) + "\n"
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ")
+
+
+# Global telemetry instance
+query_telemetry = QueryTelemetry(
+    slow_query_threshold_ms=settings.SLOW_QUERY_THRESHOLD_MS,
+    max_fingerprints=settings.QUERY_TELEMETRY_MAX_FINGERPRINTS,
+)
+
+
+class _TimedPoolMixin:
+    """Measures how long callers wait for a connection from a queue pool"""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            query_telemetry.record_pool_event("timeouts")
+            raise
+        query_telemetry.record_checkout_wait(
+            (time.perf_counter() - start) * 1000, self.overflow()
+        )
+        return connection
+
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    """QueuePool that reports checkout wait and overflow use"""
+
+
+class TimedAsyncAdaptedQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that reports checkout wait and overflow use"""
+
+
+def pool_status(engine: Engine) -> Dict[str, Any]:
+    """Return current pool occupancy for an engine"""
+    pool = engine.pool
+    status: Dict[str, Any] = {"pool_class": type(pool).__name__}
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        getter = getattr(pool, name, None)
+        if callable(getter):
+            status[name] = getter()
+    return status
+
+
+def instrument_engine(engine: Engine) -> None:
+    """
+    Attach statement and pool listeners to a (sync) engine.
+
+    For async engines pass ``async_engine.sync_engine``.
+    """
+    if not settings.QUERY_TELEMETRY_ENABLED:
+        return
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("_fleetai_query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get("_fleetai_query_start")
+        if not starts:
+            return
+        elapsed_ms = (time.perf_counter() - starts.pop()) * 1000
+        rowcount = getattr(cursor, "rowcount", -1)
+        query_telemetry.record_statement(statement, elapsed_ms, rows=rowcount)
+
+    @event.listens_for(engine, "handle_error")
+    def _handle_error(exception_context):
+        conn = exception_context.connection
+        starts = conn.info.get("_fleetai_query_start") if conn is not None else None
+        if not starts or exception_context.statement is None:
+            return
+        elapsed_ms = (time.perf_counter() - starts.pop()) * 1000
+        query_telemetry.record_statement(
+            exception_context.statement, elapsed_ms, error=True
+        )
+
+    @event.listens_for(engine.pool, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        query_telemetry.record_pool_event("connects")
+
+    @event.listens_for(engine.pool, "invalidate")
+    def _on_invalidate(dbapi_connection, connection_record, exception):
+        query_telemetry.record_pool_event("invalidations")
@@ -5,17 +5,19 @@ AI-Enabled Fleet Reporting Platform
 
 from contextlib import asynccontextmanager
 import logging
-from typing import AsyncGenerator
+import secrets
+from typing import AsyncGenerator, Optional
 
-from fastapi import FastAPI, Request, status
+from fastapi import FastAPI, Header, HTTPException, Request, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.exceptions import RequestValidationError
 import uvicorn
 
 from app.core.config import settings
-from app.core.database import init_database, close_database, DatabaseHealthCheck
+from app.core.database import init_database, close_database, DatabaseHealthCheck, async_engine
+from app.core.telemetry import query_telemetry, pool_status
 
 # Import API routers
 from app.api.v1 import auth, dashboards, reports, datasets, ai_agent, admin, fleet
@@ -37,17 +39,29 @@ async def lifespan(app: FastAPI) -> AsyncGenerator:
     logger.info(f"Environment: {settings.ENVIRONMENT}")
 
     # Initialize database
-    try:
-        await init_database()
-        logger.info("Database initialized successfully")
-    except Exception as e:
-        logger.error(f"Database initialization failed: {e}")
-        # Continue anyway - might be using external migrations
+    if settings.DB_CREATE_ALL_ON_STARTUP:
+        try:
+            await init_database()
+            logger.info("Database initialized successfully")
+        except Exception as e:
+            logger.error(f"Database initialization failed: {e}")
+            # Continue anyway - might be using external migrations
+    else:
+        logger.info("Skipping create_all (DB_CREATE_ALL_ON_STARTUP=false)")
+
+    # Pre-load caches so the first requests after a deploy are not cold
+    if settings.WARMUP_ENABLED:
+        from app.services.warmup import warm_caches
+        app.state.warmup = await warm_caches()
+
+    # Deep health check runs in the background; probes read the cached snapshot
+    DatabaseHealthCheck.start_background_refresh(settings.HEALTH_CHECK_INTERVAL_SECONDS)
 
     yield
 
     # Shutdown
     logger.info("Shutting down application")
+    await DatabaseHealthCheck.stop_background_refresh()
     await close_database()
     logger.info("Application shutdown complete")
 
@@ -173,10 +187,24 @@ async def health_check():
     }
 
 
+@app.get("/health/ready", tags=["Health"])
+async def readiness_check():
+    """Readiness check: a single SELECT 1 against the database"""
+    db_ping = await DatabaseHealthCheck.ping()
+
+    return JSONResponse(
+        status_code=status.HTTP_200_OK if db_ping["healthy"] else status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={
+            "status": "ready" if db_ping["healthy"] else "not_ready",
+            "database": db_ping
+        }
+    )
+
+
 @app.get("/health/detailed", tags=["Health"])
 async def detailed_health_check():
-    """Detailed health check with database status"""
-    db_health = await DatabaseHealthCheck.is_healthy()
+    """Detailed health check with database status (cached background snapshot)"""
+    db_health = await DatabaseHealthCheck.cached_snapshot()
 
     return {
         "status": "healthy" if db_health.get("healthy") else "degraded",
@@ -185,10 +213,35 @@ async def detailed_health_check():
         "environment": settings.ENVIRONMENT,
         "components": {
             "database": db_health
-        }
+        },
+        "warmup": getattr(app.state, "warmup", None)
     }
 
 
+@app.get("/metrics", tags=["Health"], response_class=PlainTextResponse)
+async def metrics(authorization: Optional[str] = Header(default=None)):
+    """
+    Database query and connection pool metrics in Prometheus text format.
+    Requires the METRICS_TOKEN bearer token; disabled when it is not set.
+    """
+    if not settings.METRICS_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    expected = f"Bearer {settings.METRICS_TOKEN}".encode("utf-8")
+    if not authorization or not secrets.compare_digest(authorization.encode("utf-8"), expected):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid metrics token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return PlainTextResponse(
+        query_telemetry.to_prometheus(
+            pool_status(async_engine.sync_engine),
+            max_statements=settings.METRICS_MAX_STATEMENTS,
+        ),
+        media_type="text/plain; version=0.0.4"
+    )
+
+
 @app.get("/", tags=["Root"])
 async def root():
     """Root endpoint"""
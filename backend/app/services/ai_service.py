@@ -3,6 +3,7 @@ FleetAI - AI Service
 Handles OpenAI / Azure OpenAI integration, SQL generation, and insights
 """
 
+from functools import lru_cache
 from typing import Any, Dict, List, Optional, Tuple
 import json
 import logging
@@ -11,40 +12,54 @@ import time
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
-from openai import AsyncAzureOpenAI, AsyncOpenAI
 
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=1)
+def get_openai_client() -> Tuple[Any, Optional[str]]:
+    """
+    Build the OpenAI client on first use and reuse it across requests.
+
+    The openai package is imported here rather than at module level so that
+    API startup does not pay for it until the AI assistant is actually used.
+
+    Returns:
+        Tuple of (client or None, model override or None)
+    """
+    if settings.AZURE_OPENAI_API_KEY and settings.AZURE_OPENAI_ENDPOINT:
+        from openai import AsyncAzureOpenAI
+        logger.info("AI Service: Using Azure OpenAI")
+        return AsyncAzureOpenAI(
+            api_key=settings.AZURE_OPENAI_API_KEY,
+            api_version=settings.AZURE_OPENAI_API_VERSION,
+            azure_endpoint=settings.AZURE_OPENAI_ENDPOINT
+        ), None
+    if settings.OPENAI_API_KEY:
+        from openai import AsyncOpenAI
+        logger.info(f"AI Service: Using OpenAI ({settings.OPENAI_MODEL})")
+        return AsyncOpenAI(api_key=settings.OPENAI_API_KEY), settings.OPENAI_MODEL
+    return None, None
+
+
 class AIService:
     """Service for AI-powered features using OpenAI or Azure OpenAI"""
 
     # Class-level cache shared across all per-request instances
     _domain_cache: Dict[str, Any] = {}
     _cache_loaded_at: Optional[float] = None
+    _schema_info: Optional[str] = None
+    _schema_loaded_at: Optional[float] = None
     _CACHE_TTL_SECONDS: int = 3600  # 1 hour
 
     def __init__(self, db: AsyncSession):
         self.db = db
-        self.client = None
-        self.model = settings.AZURE_OPENAI_DEPLOYMENT_NAME
 
         # Try Azure OpenAI first, then regular OpenAI
-        if settings.AZURE_OPENAI_API_KEY and settings.AZURE_OPENAI_ENDPOINT:
-            self.client = AsyncAzureOpenAI(
-                api_key=settings.AZURE_OPENAI_API_KEY,
-                api_version=settings.AZURE_OPENAI_API_VERSION,
-                azure_endpoint=settings.AZURE_OPENAI_ENDPOINT
-            )
-            logger.info("AI Service: Using Azure OpenAI")
-        elif settings.OPENAI_API_KEY:
-            self.client = AsyncOpenAI(
-                api_key=settings.OPENAI_API_KEY
-            )
-            self.model = settings.OPENAI_MODEL
-            logger.info(f"AI Service: Using OpenAI ({self.model})")
+        self.client, model_override = get_openai_client()
+        self.model = model_override or settings.AZURE_OPENAI_DEPLOYMENT_NAME
 
     @property
     def is_configured(self) -> bool:
@@ -1958,14 +1973,33 @@ ORDER BY es.reporting_period"""
         return sql
 
     async def _get_schema_info(self) -> str:
-        """Get database schema information for SQL generation.
+        """Get database schema information for SQL generation (cached at class level)."""
+        now = time.time()
+        cls = type(self)
+        if cls._schema_loaded_at and (now - cls._schema_loaded_at) < cls._CACHE_TTL_SECONDS:
+            return cls._schema_info  # Cache is fresh
+
+        cls._schema_info = await cls._load_schema_info(self.db)
+        cls._schema_loaded_at = now
+        return cls._schema_info
+
+    @classmethod
+    async def warm_cache(cls, db: AsyncSession) -> None:
+        """Load domain knowledge and schema info ahead of the first chat request."""
+        await cls._load_domain_knowledge(db)
+        cls._schema_info = await cls._load_schema_info(db)
+        cls._schema_loaded_at = time.time()
+
+    @staticmethod
+    async def _load_schema_info(db: AsyncSession) -> str:
+        """Read database schema information for SQL generation.
 
         Only includes semantic-layer tables (dim_*, fact_*, view_*, ref_*, agg_*)
         to keep the prompt focused and avoid confusion with raw landing/staging tables.
         """
         if settings.DATABASE_TYPE == "sqlite":
             # Only show semantic-layer tables/views — not landing_ or staging_ tables
-            result = await self.db.execute(
+            result = await db.execute(
                 text("""SELECT name, type FROM sqlite_master
                         WHERE (type='table' OR type='view')
                           AND (name LIKE 'dim_%' OR name LIKE 'fact_%' OR name LIKE 'view_%'
@@ -1976,7 +2010,7 @@ ORDER BY es.reporting_period"""
 
             info_lines = []
             for table_name, _ in tables:
-                col_result = await self.db.execute(text(f"PRAGMA table_info('{table_name}')"))
+                col_result = await db.execute(text(f"PRAGMA table_info('{table_name}')"))
                 columns = col_result.fetchall()
                 col_names = ", ".join(col[1] for col in columns)
                 info_lines.append(f"- {table_name}: {col_names}")
@@ -1996,7 +2030,7 @@ ORDER BY es.reporting_period"""
                 ORDER BY s.name, t.name
             """)
 
-            result = await self.db.execute(query)
+            result = await db.execute(query)
             rows = result.fetchall()
 
             info_lines = []
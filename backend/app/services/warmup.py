@@ -0,0 +1,121 @@
+"""
+FleetAI - Startup Warm-up
+Pre-loads the caches that the first requests after a deploy would otherwise
+fill on the request path
+"""
+
+from typing import Any, Awaitable, Callable, Dict
+import asyncio
+import logging
+import time
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+async def _warm_ai_catalog() -> str:
+    """Semantic catalog (domain knowledge) and schema info for the AI assistant"""
+    from app.services.ai_service import AIService
+
+    async with AsyncSessionLocal() as session:
+        await AIService.warm_cache(session)
+    return "semantic catalog and schema info loaded"
+
+
+async def _warm_datasets() -> str:
+    """Dataset metadata used by report/dashboard builders"""
+    from app.api.v1.datasets import load_dataset_metadata
+
+    async with AsyncSessionLocal() as session:
+        datasets = await load_dataset_metadata(session, is_active=True)
+    return f"{len(datasets)} datasets"
+
+
+async def _warm_dashboard_widgets() -> str:
+    """Results of the most widely shared dashboard widgets"""
+    from app.services.dashboard_engine import DashboardEngine
+
+    async with AsyncSessionLocal() as session:
+        warmed = await DashboardEngine.warm_widget_results(
+            session, limit=settings.WARMUP_MAX_WIDGETS
+        )
+    return f"{warmed} widgets"
+
+
+async def _warm_fleet_kpis() -> str:
+    """Fleet KPI queries, so their pages and plans are cached by the database"""
+    from app.api.v1 import fleet
+
+    await fleet.get_operations_kpis()
+    await fleet.get_renewals_kpis()
+    return "operations and renewals KPIs"
+
+
+async def _warm_materialized_views() -> str:
+    """Map of fresh materialized views, so the first reads already use them"""
+    from app.core.materialized_views import MaterializedViewRegistry
+
+    views = await MaterializedViewRegistry.refresh()
+    return f"{len(views)} materialized views"
+
+
+WARMUP_TASKS: Dict[str, Callable[[], Awaitable[str]]] = {
+    "materialized_views": _warm_materialized_views,
+    "ai_catalog": _warm_ai_catalog,
+    "datasets": _warm_datasets,
+    "dashboard_widgets": _warm_dashboard_widgets,
+    "fleet_kpis": _warm_fleet_kpis,
+}
+
+
+async def _run_task(name: str, task: Callable[[], Awaitable[str]]) -> Dict[str, Any]:
+    start = time.perf_counter()
+    try:
+        detail = await task()
+        status = "ok"
+    except Exception as e:
+        detail = str(e)
+        status = "failed"
+        logger.warning(f"Warm-up task '{name}' failed: {e}")
+    return {
+        "status": status,
+        "detail": detail,
+        "duration_ms": round((time.perf_counter() - start) * 1000, 1),
+    }
+
+
+async def warm_caches() -> Dict[str, Any]:
+    """
+    Run all warm-up tasks concurrently, bounded by WARMUP_TIMEOUT_SECONDS.
+
+    Failures are logged and reported but never prevent startup.
+
+    Returns:
+        Dict with per-task status/duration and the total duration
+    """
+    start = time.perf_counter()
+    names = list(WARMUP_TASKS)
+    pending = [asyncio.create_task(_run_task(n, WARMUP_TASKS[n])) for n in names]
+
+    done, not_done = await asyncio.wait(pending, timeout=settings.WARMUP_TIMEOUT_SECONDS)
+    for task in not_done:
+        task.cancel()
+
+    results: Dict[str, Any] = {}
+    for name, task in zip(names, pending):
+        if task in done:
+            results[name] = task.result()
+        else:
+            results[name] = {"status": "timeout", "detail": None, "duration_ms": None}
+
+    total_ms = round((time.perf_counter() - start) * 1000, 1)
+    summary = ", ".join(
+        f"{name}={r['status']}"
+        + (f" ({r['duration_ms']} ms)" if r["duration_ms"] is not None else "")
+        for name, r in results.items()
+    )
+    logger.info(f"Cache warm-up finished in {total_ms} ms: {summary}")
+
+    return {"tasks": results, "duration_ms": total_ms}
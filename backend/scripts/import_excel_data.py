@@ -12,8 +12,10 @@ import pandas as pd
 
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Shared ETL helpers (date dimension builder, landing ingest)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'database', 'scripts'))
 
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, insert, select, text
 from sqlalchemy.orm import sessionmaker
 
 # Set environment before importing app modules
@@ -29,6 +31,9 @@ from app.models.user import User, Role
 from app.models.dashboard import Dashboard
 from app.models.report import Report, Dataset
 
+from date_dimension import date_range_bounds, missing_dates
+from landing_ingest import frame_columns
+
 # Excel files directory
 EXCEL_DIR = r"C:\Users\X1Carbon\Documents\FleetAI\Files"
 
@@ -41,45 +46,27 @@ def create_tables():
 
 
 def generate_date_dimension(start_year=2020, end_year=2026):
-    """Generate date dimension data"""
-    print(f"Generating date dimension ({start_year}-{end_year})...")
+    """Add missing dates to the date dimension (shared builder in database/scripts)"""
+    start, end = date_range_bounds(date(start_year, 1, 1), date(end_year, 12, 31))
+    print(f"Generating date dimension ({start.year}-{end.year})...")
 
     Session = sessionmaker(bind=sync_engine)
     session = Session()
 
     try:
-        dates = []
-        current = date(start_year, 1, 1)
-        end = date(end_year, 12, 31)
-        key = 1
-
-        while current <= end:
-            dim_date = DimDate(
-                date_key=key,
-                full_date=current,
-                day_of_week=current.weekday() + 1,
-                day_name=current.strftime('%A'),
-                day_of_month=current.day,
-                day_of_year=current.timetuple().tm_yday,
-                week_of_year=current.isocalendar()[1],
-                month_number=current.month,
-                month_name=current.strftime('%B'),
-                month_short=current.strftime('%b'),
-                quarter_number=(current.month - 1) // 3 + 1,
-                quarter_name=f"Q{(current.month - 1) // 3 + 1}",
-                year_number=current.year,
-                fiscal_year=current.year if current.month >= 7 else current.year - 1,
-                is_weekend=current.weekday() >= 5,
-                is_holiday=False,
-                is_business_day=current.weekday() < 5
-            )
-            session.add(dim_date)
+        existing = session.execute(select(DimDate.date_key, DimDate.full_date)).all()
+        frame = missing_dates([row.full_date for row in existing], [row.date_key for row in existing], start, end)
 
-            key += 1
-            current = date.fromordinal(current.toordinal() + 1)
+        records = frame.astype(object).to_dict('records')
+        for record in records:
+            record['full_date'] = date.fromisoformat(record['full_date'])
+            for flag in ('is_weekend', 'is_holiday', 'is_business_day'):
+                record[flag] = bool(record[flag])
 
+        if records:
+            session.execute(insert(DimDate), records)
         session.commit()
-        print(f"  Added {key - 1} date records")
+        print(f"  Added {len(records)} date records")
     except Exception as e:
         session.rollback()
         print(f"  Error: {e}")
@@ -103,24 +90,24 @@ def import_customers():
     session = Session()
 
     try:
-        for idx, row in df.iterrows():
-            customer = DimCustomer(
+        values = frame_columns(df, ['CUCUNO', 'CUCUDS', 'CUCUNM', 'CUTYCU', 'CUCUCI', 'CUCOUC'], text_mode='all')
+        records = [
+            dict(
                 customer_key=idx + 1,
-                customer_id=str(row.get('CUCUNO', idx + 1)),
-                customer_name=str(row.get('CUCUDS', row.get('CUCUNM', f'Customer {idx + 1}'))),
-                legal_name=str(row.get('CUCUNM', '')) if pd.notna(row.get('CUCUNM')) else None,
-                account_type=str(row.get('CUTYCU', '')) if pd.notna(row.get('CUTYCU')) else None,
-                billing_city=str(row.get('CUCUCI', '')) if pd.notna(row.get('CUCUCI')) else None,
-                billing_country=str(row.get('CUCOUC', '')) if pd.notna(row.get('CUCOUC')) else None,
+                customer_id=cuno or str(idx + 1),
+                customer_name=cuds or cunm or f'Customer {idx + 1}',
+                legal_name=cunm,
+                account_type=tycu,
+                billing_city=cuci,
+                billing_country=couc,
                 status='Active',
                 effective_from=date.today(),
                 is_current=True
             )
-            session.add(customer)
-
-            if (idx + 1) % 500 == 0:
-                session.flush()
-                print(f"  Processed {idx + 1} customers...")
+            for idx, (cuno, cuds, cunm, tycu, cuci, couc) in enumerate(zip(*values.values()))
+        ]
+        if records:
+            session.execute(insert(DimCustomer), records)
 
         session.commit()
         print(f"  Imported {len(df)} customers")
@@ -149,41 +136,33 @@ def import_vehicles():
     session = Session()
 
     try:
-        for idx, row in df.iterrows():
-            # Parse make/model from columns
-            make = str(row.get('AUMKDS', '')) if pd.notna(row.get('AUMKDS')) else None
-            model_desc = str(row.get('AUMDDS', '')) if pd.notna(row.get('AUMDDS')) else None
+        values = frame_columns(df, ['AUMKDS', 'AUMDDS', 'AUTYDS', 'AUMDCD'], text_mode='all')
+        fuel_codes = frame_columns(df, ['AUFUCD'])['AUFUCD']
+        fuel_map = {1: 'Gasoline', 2: 'Diesel', 3: 'Electric', 4: 'Hybrid'}
 
+        records = []
+        for idx, (make, model_desc, type_desc, model_code) in enumerate(zip(*values.values())):
             # Extract model year from AUTYDS if available (e.g., "4.0L,4WD,2008,")
             model_year = None
-            type_desc = str(row.get('AUTYDS', '')) if pd.notna(row.get('AUTYDS')) else ''
-            for part in type_desc.split(','):
+            for part in (type_desc or '').split(','):
                 part = part.strip()
                 if part.isdigit() and len(part) == 4 and part.startswith('20'):
                     model_year = int(part)
                     break
 
-            # Fuel type mapping
-            fuel_code = row.get('AUFUCD')
-            fuel_map = {1: 'Gasoline', 2: 'Diesel', 3: 'Electric', 4: 'Hybrid'}
-            fuel_type = fuel_map.get(fuel_code, 'Gasoline')
-
-            vehicle = DimVehicle(
+            records.append(dict(
                 vehicle_key=idx + 1,
-                equipment_id=str(row.get('AUMDCD', idx + 1)),
+                equipment_id=model_code or str(idx + 1),
                 make=make,
                 model=model_desc.split(',')[0] if model_desc else None,
                 model_year=model_year,
-                fuel_type=fuel_type,
+                fuel_type=fuel_map.get(fuel_codes[idx], 'Gasoline'),
                 status='Active',
                 effective_from=date.today(),
                 is_current=True
-            )
-            session.add(vehicle)
-
-            if (idx + 1) % 1000 == 0:
-                session.flush()
-                print(f"  Processed {idx + 1} vehicles...")
+            ))
+        if records:
+            session.execute(insert(DimVehicle), records)
 
         session.commit()
         print(f"  Imported {len(df)} vehicles")
@@ -212,33 +191,30 @@ def import_drivers():
     session = Session()
 
     try:
-        for idx, row in df.iterrows():
+        values = frame_columns(
+            df, ['DRDRNO', 'DRCUNO', 'DRDRFN', 'DRDRLN', 'DRDRNM', 'DRMAIL', 'DRDEPT'], text_mode='all'
+        )
+        records = []
+        for idx, (drno, cuno, first_name, last_name, full_name, mail, dept) in enumerate(zip(*values.values())):
             # Driver name handling
-            first_name = str(row.get('DRDRFN', '')) if pd.notna(row.get('DRDRFN')) else None
-            last_name = str(row.get('DRDRLN', '')) if pd.notna(row.get('DRDRLN')) else None
-            full_name = str(row.get('DRDRNM', '')) if pd.notna(row.get('DRDRNM')) else None
-
             if not full_name and (first_name or last_name):
                 full_name = f"{first_name or ''} {last_name or ''}".strip()
 
-            driver = DimDriver(
+            records.append(dict(
                 driver_key=idx + 1,
-                driver_id=str(row.get('DRDRNO', idx + 1)),
-                customer_id=str(row.get('DRCUNO', '')) if pd.notna(row.get('DRCUNO')) else None,
+                driver_id=drno or str(idx + 1),
+                customer_id=cuno,
                 first_name=first_name,
                 last_name=last_name,
                 full_name=full_name or f"Driver {idx + 1}",
-                email=str(row.get('DRMAIL', '')) if pd.notna(row.get('DRMAIL')) else None,
-                department=str(row.get('DRDEPT', '')) if pd.notna(row.get('DRDEPT')) else None,
+                email=mail,
+                department=dept,
                 status='Active',
                 effective_from=date.today(),
                 is_current=True
-            )
-            session.add(driver)
-
-            if (idx + 1) % 1000 == 0:
-                session.flush()
-                print(f"  Processed {idx + 1} drivers...")
+            ))
+        if records:
+            session.execute(insert(DimDriver), records)
 
         session.commit()
         print(f"  Imported {len(df)} drivers")
@@ -267,21 +243,21 @@ def import_contracts():
     session = Session()
 
     try:
-        for idx, row in df.iterrows():
-            contract = DimContract(
+        values = frame_columns(df, ['COCONO', 'COCUNO', 'COTLCD'], text_mode='all')
+        records = [
+            dict(
                 contract_key=idx + 1,
-                contract_no=str(row.get('COCONO', idx + 1)),
-                customer_id=str(row.get('COCUNO', '')) if pd.notna(row.get('COCUNO')) else None,
-                contract_type=str(row.get('COTLCD', '')) if pd.notna(row.get('COTLCD')) else None,
+                contract_no=cono or str(idx + 1),
+                customer_id=cuno,
+                contract_type=tlcd,
                 status='Active',
                 effective_from=date.today(),
                 is_current=True
             )
-            session.add(contract)
-
-            if (idx + 1) % 500 == 0:
-                session.flush()
-                print(f"  Processed {idx + 1} contracts...")
+            for idx, (cono, cuno, tlcd) in enumerate(zip(*values.values()))
+        ]
+        if records:
+            session.execute(insert(DimContract), records)
 
         session.commit()
         print(f"  Imported {len(df)} contracts")
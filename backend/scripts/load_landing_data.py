@@ -3,7 +3,7 @@ Load Excel Data into Landing Tables
 
 This script loads data from Excel source files into the SQL Server landing tables.
 Features:
-- Chunk-based loading for large files
+- Streaming, chunk-based loading (one chunk in memory at a time)
 - Extraction logging
 - Column renaming with table prefix
 - Error handling and recovery
@@ -11,7 +11,6 @@ Features:
 
 import os
 import sys
-import pandas as pd
 import numpy as np
 from pathlib import Path
 from datetime import datetime
@@ -21,12 +20,15 @@ from sqlalchemy import create_engine, text
 from sqlalchemy.engine import Engine
 import urllib
 
+# Shared landing ingest helpers (streaming source reader)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'database', 'scripts'))
+from landing_ingest import read_source_chunks
+
 warnings.filterwarnings('ignore', category=UserWarning, module='openpyxl')
 
 # Configuration
 SOURCE_DIR = Path(r"C:\Users\X1Carbon\Documents\FleetAI\Files")
-CHUNK_SIZE = 5000  # Rows per batch insert
-LARGE_FILE_THRESHOLD = 50000  # Files with more rows use chunked reading
+CHUNK_SIZE = 5000  # Rows read and inserted per batch
 
 # Database connection string components
 # Update these with your actual connection details
@@ -132,25 +134,15 @@ def load_excel_to_table(engine: Engine, filepath: Path, table_name: str) -> int:
     Returns:
         Number of rows loaded
     """
-    # Read Excel file
-    df = pd.read_excel(filepath, engine='openpyxl')
-
-    # Rename columns with table prefix
-    new_columns = {}
-    for col in df.columns:
-        clean_col = str(col).strip().upper()
-        new_columns[col] = f"{table_name}_{clean_col}"
-
-    df = df.rename(columns=new_columns)
-
-    # Handle NaN values - convert to None for SQL
-    df = df.replace({np.nan: None})
-
-    # Load to database in chunks
     total_rows = 0
 
-    for i in range(0, len(df), CHUNK_SIZE):
-        chunk = df.iloc[i:i + CHUNK_SIZE]
+    # Stream the workbook: read and load one chunk at a time
+    for chunk in read_source_chunks(filepath, 'xlsx', chunk_rows=CHUNK_SIZE):
+        # Rename columns with table prefix
+        chunk = chunk.rename(columns=lambda col: f"{table_name}_{str(col).strip().upper()}")
+
+        # Handle NaN values - convert to None for SQL
+        chunk = chunk.replace({np.nan: None})
 
         chunk.to_sql(
             name=table_name,
@@ -163,7 +155,7 @@ def load_excel_to_table(engine: Engine, filepath: Path, table_name: str) -> int:
         )
 
         total_rows += len(chunk)
-        print(f"    Loaded {total_rows:,} / {len(df):,} rows", end="\r")
+        print(f"    Loaded {total_rows:,} rows", end="\r")
 
     print()  # New line after progress
     return total_rows
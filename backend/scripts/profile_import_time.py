@@ -0,0 +1,94 @@
+"""
+Profile API Cold-Start Import Time
+
+Runs `python -X importtime` in a fresh interpreter for the given module
+(default: app.main) and reports the total wall time and the slowest
+imports by cumulative time. Use it to check that heavy dependencies
+(openai, openpyxl, pandas) stay out of the startup path.
+
+Usage (from the backend directory):
+    python scripts/profile_import_time.py
+    python scripts/profile_import_time.py --module app.main --top 30 --runs 5
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Modules that should only load on first use, never at startup
+LAZY_MODULES = ("openai", "openpyxl", "pandas", "numpy", "app.services.ai_service")
+
+IMPORT_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def run_import_profile(module: str) -> tuple[float, list[tuple[int, int, int, str]]]:
+    """Import a module in a subprocess and return wall time and importtime rows."""
+    env = dict(os.environ)
+    env.setdefault("SECRET_KEY", "x" * 32)
+
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    elapsed = time.perf_counter() - start
+
+    if proc.returncode != 0:
+        errors = [line for line in proc.stderr.splitlines() if not line.startswith("import time:")]
+        raise RuntimeError("\n".join(errors[-20:]))
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            rows.append((int(self_us), int(cumulative_us), (len(indent) - 1) // 2, name))
+    return elapsed, rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile FleetAI API import time")
+    parser.add_argument("--module", default="app.main", help="Module to import")
+    parser.add_argument("--top", type=int, default=20, help="Number of slowest imports to show")
+    parser.add_argument("--runs", type=int, default=3, help="Number of runs (best is reported)")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print(f"Import-time profile: {args.module}")
+    print("=" * 60)
+
+    timings = []
+    rows = []
+    for run in range(args.runs):
+        elapsed, rows = run_import_profile(args.module)
+        timings.append(elapsed)
+        print(f"  Run {run + 1}: {elapsed * 1000:,.0f} ms")
+
+    print(f"\nBest wall time: {min(timings) * 1000:,.0f} ms")
+
+    # Top-level packages only (depth 0) give the clearest picture
+    top_level = sorted((r for r in rows if r[2] == 0), key=lambda r: r[1], reverse=True)
+    print("\nSlowest top-level imports (cumulative):")
+    for _, cumulative_us, _, name in top_level[:args.top]:
+        print(f"  {cumulative_us / 1000:>9,.1f} ms  {name}")
+
+    loaded = {name for _, _, _, name in rows}
+    eager = [m for m in LAZY_MODULES if m in loaded]
+    print()
+    if eager:
+        print(f"WARNING: loaded at import time: {', '.join(eager)}")
+    else:
+        print("OK: no lazily-loaded dependencies imported at startup")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+-- =============================================
+-- FleetAI Reference Data (code lookups)
+-- SQLite Version
+--
+-- Small keyed tables that decode status and type codes. The staging and
+-- semantic transforms join to them instead of repeating CASE expressions,
+-- and the ETL runners report codes that have no entry here
+-- (CODE_CHECKS in database/scripts/reference_lookups.py).
+-- Applied by both ETL scripts at the start of every run.
+-- =============================================
+
+-- Vehicle Status Reference Table
+CREATE TABLE IF NOT EXISTS ref_vehicle_status (
+    status_code INTEGER PRIMARY KEY,
+    status_name TEXT NOT NULL,
+    status_description TEXT NOT NULL,
+    status_category TEXT NOT NULL,  -- 'Active', 'Created', 'Terminated'
+    is_active_status INTEGER DEFAULT 0,
+    display_order INTEGER
+);
+
+-- Insert vehicle status definitions
+INSERT OR REPLACE INTO ref_vehicle_status (status_code, status_name, status_description, status_category, is_active_status, display_order) VALUES
+(0, 'Created', 'Vehicle record created but not yet active', 'Created', 1, 1),
+(1, 'Active', 'Vehicle is currently active in the fleet', 'Active', 1, 2),
+(2, 'Terminated - Invoicing Stopped', 'Contract terminated, invoicing has stopped', 'Terminated', 0, 3),
+(3, 'Terminated - Invoice Adjustment Made', 'Contract terminated, invoice adjustment completed', 'Terminated', 0, 4),
+(4, 'Terminated - Mileage Adjustment Made', 'Contract terminated, mileage variation adjustment completed', 'Terminated', 0, 5),
+(5, 'Terminated - De-investment Made', 'Contract terminated, de-investment completed (steps 3 & 4 done)', 'Terminated', 0, 6),
+(8, 'Terminated - Ready for Settlement', 'Contract terminated, ready for first final settlement run', 'Terminated', 0, 7),
+(9, 'Terminated - Final Settlement Made', 'Contract terminated, final settlement report completed', 'Terminated', 0, 8);
+
+-- Order Status Reference Table
+CREATE TABLE IF NOT EXISTS ref_order_status (
+    status_code INTEGER PRIMARY KEY,
+    status_name TEXT NOT NULL,
+    status_description TEXT NOT NULL,
+    status_phase TEXT NOT NULL,  -- 'Order Phase', 'Delivery Phase', 'Cancelled'
+    is_active_order INTEGER DEFAULT 1,
+    display_order INTEGER
+);
+
+-- Insert order status definitions
+INSERT OR REPLACE INTO ref_order_status (status_code, status_name, status_description, status_phase, is_active_order, display_order) VALUES
+(0, 'Created', 'Order created into the system', 'Order Phase', 1, 1),
+(1, 'Sent to Dealer', 'Order sent to dealer', 'Order Phase', 1, 2),
+(2, 'Delivery Confirmed', 'Delivery confirmed by dealer', 'Order Phase', 1, 3),
+(3, 'Insurance Arranged', 'Arranged for insurance', 'Delivery Phase', 1, 4),
+(4, 'Registration Arranged', 'Arranged for vehicle registration and other modifications', 'Delivery Phase', 1, 5),
+(5, 'Driver Pack Prepared', 'Prepared driver information pack', 'Delivery Phase', 1, 6),
+(6, 'Vehicle Delivered', 'Vehicle delivered to client', 'Delivery Phase', 1, 7),
+(7, 'Lease Schedule Generated', 'Generate lease schedule in the system for invoicing', 'Delivery Phase', 0, 8),
+(9, 'Cancelled', 'Order cancelled', 'Cancelled', 0, 9);
+
+-- Fuel Code Reference Table
+CREATE TABLE IF NOT EXISTS ref_fuel_code (
+    fuel_code INTEGER PRIMARY KEY,
+    fuel_type TEXT NOT NULL,         -- 'Petrol', 'Diesel', 'LPG', 'Electric'
+    fuel_subtype TEXT NOT NULL,      -- Detailed variant name
+    fuel_category TEXT NOT NULL,     -- 'ICE', 'Alternative', 'Electric'
+    is_electric INTEGER DEFAULT 0,
+    display_order INTEGER
+);
+
+-- Insert fuel code definitions
+INSERT OR REPLACE INTO ref_fuel_code (fuel_code, fuel_type, fuel_subtype, fuel_category, is_electric, display_order) VALUES
+(1, 'Petrol', 'Unleaded 91 E-Plus', 'ICE', 0, 1),
+(2, 'Petrol', 'Unleaded 95 Special', 'ICE', 0, 2),
+(3, 'Diesel', 'Diesel', 'ICE', 0, 3),
+(4, 'LPG', 'LPG', 'Alternative', 0, 4),
+(6, 'Petrol', 'Unleaded 98 Super', 'ICE', 0, 5),
+(7, 'Electric', 'Full Electric Vehicle (BEV)', 'Electric', 1, 6),
+(8, 'Electric', 'Plugin Hybrid Electric Vehicle (PHEV)', 'Electric', 1, 7),
+(9, 'Electric', 'Hybrid Electric Vehicle (HEV)', 'Electric', 1, 8);
+
+-- Lease Type Reference Table
+CREATE TABLE IF NOT EXISTS ref_lease_type (
+    lease_type TEXT PRIMARY KEY,
+    lease_type_description TEXT NOT NULL
+);
+
+INSERT OR REPLACE INTO ref_lease_type (lease_type, lease_type_description) VALUES
+('O', 'Operational Lease'),
+('F', 'Financial Lease'),
+('L', 'Lease');
+
+-- Country Reference Table (customer country names)
+CREATE TABLE IF NOT EXISTS ref_country (
+    country_code TEXT PRIMARY KEY,
+    country_name TEXT NOT NULL
+);
+
+INSERT OR REPLACE INTO ref_country (country_code, country_name) VALUES
+('AE', 'United Arab Emirates'),
+('NO', 'Norway'),
+('US', 'United States');
+
+-- Odometer Reading Source Reference Table
+CREATE TABLE IF NOT EXISTS ref_odometer_source (
+    source_code INTEGER PRIMARY KEY,
+    source_description TEXT NOT NULL
+);
+
+INSERT OR REPLACE INTO ref_odometer_source (source_code, source_description) VALUES
+(1, 'Manual Entry'),
+(2, 'Fuel Transaction'),
+(3, 'Service');
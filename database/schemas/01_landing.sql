@@ -26,9 +26,25 @@ CREATE TABLE [landing].[etl_extraction_log] (
     [extracted_row_count] INT NULL,
     [status] VARCHAR(20) NOT NULL,  -- 'RUNNING', 'SUCCESS', 'FAILED'
     [error_message] VARCHAR(MAX) NULL,
+    [watermark_column] VARCHAR(128) NULL,  -- Ascending source column of INCREMENTAL extractions
+    [watermark_value] VARCHAR(64) NULL,  -- Highest value extracted (sequence or ISO timestamp)
+    [first_extraction_id] BIGINT NULL,  -- extraction_id range of the landing rows inserted
+    [last_extraction_id] BIGINT NULL,
     [created_at] DATETIME2 DEFAULT GETUTCDATE()
 );
 
+-- Watermark columns for logs created before incremental extraction
+IF COL_LENGTH('landing.etl_extraction_log', 'watermark_value') IS NULL
+    ALTER TABLE [landing].[etl_extraction_log] ADD
+        [watermark_column] VARCHAR(128) NULL,
+        [watermark_value] VARCHAR(64) NULL;
+
+-- Landing row range for logs created before CDC read extractions by extraction_id
+IF COL_LENGTH('landing.etl_extraction_log', 'last_extraction_id') IS NULL
+    ALTER TABLE [landing].[etl_extraction_log] ADD
+        [first_extraction_id] BIGINT NULL,
+        [last_extraction_id] BIGINT NULL;
+
 CREATE INDEX [IX_etl_extraction_log_table] ON [landing].[etl_extraction_log]([table_name], [extraction_start]);
 
 -- Checkpoint table for incremental loads
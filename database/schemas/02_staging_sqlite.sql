@@ -277,6 +277,7 @@ CREATE TABLE IF NOT EXISTS staging_billing (
 );
 
 CREATE INDEX IF NOT EXISTS idx_staging_billing_object ON staging_billing(object_no);
+CREATE INDEX IF NOT EXISTS idx_staging_billing_hash ON staging_billing(source_hash);
 CREATE INDEX IF NOT EXISTS idx_staging_billing_no ON staging_billing(billing_no);
 
 -- =============================================
@@ -344,6 +345,7 @@ CREATE TABLE IF NOT EXISTS staging_odometer_history (
 
 CREATE INDEX IF NOT EXISTS idx_staging_odometer_object ON staging_odometer_history(object_no);
 CREATE INDEX IF NOT EXISTS idx_staging_odometer_date ON staging_odometer_history(reading_date);
+CREATE INDEX IF NOT EXISTS idx_staging_odometer_hash ON staging_odometer_history(source_hash);
 
 -- =============================================
 -- Fuel Prices
@@ -448,6 +450,7 @@ CREATE TABLE IF NOT EXISTS staging_exploitation_services (
 
 CREATE INDEX IF NOT EXISTS idx_staging_es_object ON staging_exploitation_services(object_no);
 CREATE INDEX IF NOT EXISTS idx_staging_es_customer ON staging_exploitation_services(customer_no);
+CREATE INDEX IF NOT EXISTS idx_staging_es_hash ON staging_exploitation_services(source_hash);
 
 -- =============================================
 -- Maintenance Approvals (Transactional)
@@ -483,6 +486,7 @@ CREATE TABLE IF NOT EXISTS staging_maintenance_approvals (
 CREATE INDEX IF NOT EXISTS idx_staging_ma_object ON staging_maintenance_approvals(object_no);
 CREATE INDEX IF NOT EXISTS idx_staging_ma_supplier ON staging_maintenance_approvals(supplier_no);
 CREATE INDEX IF NOT EXISTS idx_staging_ma_date ON staging_maintenance_approvals(approval_date);
+CREATE INDEX IF NOT EXISTS idx_staging_ma_hash ON staging_maintenance_approvals(source_hash);
 
 -- =============================================
 -- Passed On Invoices (Financial)
@@ -515,6 +519,7 @@ CREATE TABLE IF NOT EXISTS staging_passed_invoices (
 
 CREATE INDEX IF NOT EXISTS idx_staging_pi_object ON staging_passed_invoices(object_no);
 CREATE INDEX IF NOT EXISTS idx_staging_pi_customer ON staging_passed_invoices(customer_no);
+CREATE INDEX IF NOT EXISTS idx_staging_pi_hash ON staging_passed_invoices(source_hash);
 
 -- =============================================
 -- Replacement Cars (Transactional)
@@ -546,6 +551,7 @@ CREATE TABLE IF NOT EXISTS staging_replacement_cars (
 
 CREATE INDEX IF NOT EXISTS idx_staging_rc_object ON staging_replacement_cars(object_no);
 CREATE INDEX IF NOT EXISTS idx_staging_rc_dates ON staging_replacement_cars(begin_date, end_date);
+CREATE INDEX IF NOT EXISTS idx_staging_rc_hash ON staging_replacement_cars(source_hash);
 
 -- =============================================
 -- Reporting Periods (Reference)
@@ -563,6 +569,8 @@ CREATE TABLE IF NOT EXISTS staging_reporting_periods (
     source_hash TEXT
 );
 
+CREATE INDEX IF NOT EXISTS idx_staging_rp_hash ON staging_reporting_periods(source_hash);
+
 -- =============================================
 -- Suppliers (Reference/Master)
 -- =============================================
@@ -710,6 +718,7 @@ CREATE TABLE IF NOT EXISTS staging_car_reports (
 CREATE INDEX IF NOT EXISTS idx_staging_cr_object ON staging_car_reports(object_no);
 CREATE INDEX IF NOT EXISTS idx_staging_cr_period ON staging_car_reports(reporting_period);
 CREATE INDEX IF NOT EXISTS idx_staging_cr_object_period ON staging_car_reports(object_no, reporting_period);
+CREATE INDEX IF NOT EXISTS idx_staging_cr_hash ON staging_car_reports(source_hash);
 
 -- =============================================
 -- ETL Tracking Tables
@@ -724,6 +733,10 @@ CREATE TABLE IF NOT EXISTS staging_etl_log (
     source_rows INTEGER,
     inserted_rows INTEGER,
     updated_rows INTEGER,
+    unchanged_rows INTEGER,
+    retired_rows INTEGER,
+    source_watermark TEXT,                      -- landing MAX(extraction_timestamp)|row count
+    duration_ms REAL,
     status TEXT NOT NULL,
     error_message TEXT,
     created_at TEXT DEFAULT (datetime('now'))
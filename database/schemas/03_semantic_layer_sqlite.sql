@@ -89,69 +89,9 @@ CREATE TABLE IF NOT EXISTS dim_date (
 CREATE INDEX IF NOT EXISTS idx_dim_date_full ON dim_date(full_date);
 CREATE INDEX IF NOT EXISTS idx_dim_date_year_month ON dim_date(year_number, month_number);
 
--- Vehicle Status Reference Table
-CREATE TABLE IF NOT EXISTS ref_vehicle_status (
-    status_code INTEGER PRIMARY KEY,
-    status_name TEXT NOT NULL,
-    status_description TEXT NOT NULL,
-    status_category TEXT NOT NULL,  -- 'Active', 'Created', 'Terminated'
-    is_active_status INTEGER DEFAULT 0,
-    display_order INTEGER
-);
-
--- Insert vehicle status definitions
-INSERT OR REPLACE INTO ref_vehicle_status (status_code, status_name, status_description, status_category, is_active_status, display_order) VALUES
-(0, 'Created', 'Vehicle record created but not yet active', 'Created', 1, 1),
-(1, 'Active', 'Vehicle is currently active in the fleet', 'Active', 1, 2),
-(2, 'Terminated - Invoicing Stopped', 'Contract terminated, invoicing has stopped', 'Terminated', 0, 3),
-(3, 'Terminated - Invoice Adjustment Made', 'Contract terminated, invoice adjustment completed', 'Terminated', 0, 4),
-(4, 'Terminated - Mileage Adjustment Made', 'Contract terminated, mileage variation adjustment completed', 'Terminated', 0, 5),
-(5, 'Terminated - De-investment Made', 'Contract terminated, de-investment completed (steps 3 & 4 done)', 'Terminated', 0, 6),
-(8, 'Terminated - Ready for Settlement', 'Contract terminated, ready for first final settlement run', 'Terminated', 0, 7),
-(9, 'Terminated - Final Settlement Made', 'Contract terminated, final settlement report completed', 'Terminated', 0, 8);
-
--- Order Status Reference Table
-CREATE TABLE IF NOT EXISTS ref_order_status (
-    status_code INTEGER PRIMARY KEY,
-    status_name TEXT NOT NULL,
-    status_description TEXT NOT NULL,
-    status_phase TEXT NOT NULL,  -- 'Order Phase', 'Delivery Phase', 'Cancelled'
-    is_active_order INTEGER DEFAULT 1,
-    display_order INTEGER
-);
-
--- Insert order status definitions
-INSERT OR REPLACE INTO ref_order_status (status_code, status_name, status_description, status_phase, is_active_order, display_order) VALUES
-(0, 'Created', 'Order created into the system', 'Order Phase', 1, 1),
-(1, 'Sent to Dealer', 'Order sent to dealer', 'Order Phase', 1, 2),
-(2, 'Delivery Confirmed', 'Delivery confirmed by dealer', 'Order Phase', 1, 3),
-(3, 'Insurance Arranged', 'Arranged for insurance', 'Delivery Phase', 1, 4),
-(4, 'Registration Arranged', 'Arranged for vehicle registration and other modifications', 'Delivery Phase', 1, 5),
-(5, 'Driver Pack Prepared', 'Prepared driver information pack', 'Delivery Phase', 1, 6),
-(6, 'Vehicle Delivered', 'Vehicle delivered to client', 'Delivery Phase', 1, 7),
-(7, 'Lease Schedule Generated', 'Generate lease schedule in the system for invoicing', 'Delivery Phase', 0, 8),
-(9, 'Cancelled', 'Order cancelled', 'Cancelled', 0, 9);
-
--- Fuel Code Reference Table
-CREATE TABLE IF NOT EXISTS ref_fuel_code (
-    fuel_code INTEGER PRIMARY KEY,
-    fuel_type TEXT NOT NULL,         -- 'Petrol', 'Diesel', 'LPG', 'Electric'
-    fuel_subtype TEXT NOT NULL,      -- Detailed variant name
-    fuel_category TEXT NOT NULL,     -- 'ICE', 'Alternative', 'Electric'
-    is_electric INTEGER DEFAULT 0,
-    display_order INTEGER
-);
-
--- Insert fuel code definitions
-INSERT OR REPLACE INTO ref_fuel_code (fuel_code, fuel_type, fuel_subtype, fuel_category, is_electric, display_order) VALUES
-(1, 'Petrol', 'Unleaded 91 E-Plus', 'ICE', 0, 1),
-(2, 'Petrol', 'Unleaded 95 Special', 'ICE', 0, 2),
-(3, 'Diesel', 'Diesel', 'ICE', 0, 3),
-(4, 'LPG', 'LPG', 'Alternative', 0, 4),
-(6, 'Petrol', 'Unleaded 98 Super', 'ICE', 0, 5),
-(7, 'Electric', 'Full Electric Vehicle (BEV)', 'Electric', 1, 6),
-(8, 'Electric', 'Plugin Hybrid Electric Vehicle (PHEV)', 'Electric', 1, 7),
-(9, 'Electric', 'Hybrid Electric Vehicle (HEV)', 'Electric', 1, 8);
+-- Code lookup tables (ref_vehicle_status, ref_order_status, ref_fuel_code,
+-- ref_lease_type, ref_country, ref_odometer_source) live in
+-- 00_reference_sqlite.sql, shared with the staging transforms
 
 -- Domain Translation Reference Table
 CREATE TABLE IF NOT EXISTS ref_domain_translation (
@@ -241,6 +181,8 @@ CREATE INDEX IF NOT EXISTS idx_dim_vehicle_customer ON dim_vehicle(customer_id);
 CREATE INDEX IF NOT EXISTS idx_dim_vehicle_make ON dim_vehicle(make_name);
 CREATE INDEX IF NOT EXISTS idx_dim_vehicle_status ON dim_vehicle(vehicle_status);
 CREATE INDEX IF NOT EXISTS idx_dim_vehicle_lease_start ON dim_vehicle(lease_start_date);
+-- Renewals KPIs/lists filter active vehicles by days_to_contract_end ranges
+CREATE INDEX IF NOT EXISTS idx_dim_vehicle_active_contract_end ON dim_vehicle(is_active, days_to_contract_end);
 
 -- Driver Dimension
 CREATE TABLE IF NOT EXISTS dim_driver (
@@ -879,3 +821,54 @@ CREATE TABLE IF NOT EXISTS agg_customer_kpis (
     primary_vehicle_makes TEXT,
     calculated_at TEXT DEFAULT (datetime('now'))
 );
+
+-- Daily customer KPI snapshots (trend history; agg_customer_kpis holds the latest)
+CREATE TABLE IF NOT EXISTS agg_customer_kpis_history (
+    kpi_date TEXT NOT NULL,
+    customer_id INTEGER NOT NULL,
+    customer_name TEXT,
+    total_vehicles INTEGER,
+    active_vehicles INTEGER,
+    total_drivers INTEGER,
+    total_monthly_lease_value REAL,
+    average_vehicle_value REAL,
+    total_fleet_value REAL,
+    primary_vehicle_makes TEXT,
+    PRIMARY KEY (kpi_date, customer_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_agg_customer_kpis_history_customer ON agg_customer_kpis_history(customer_id, kpi_date);
+
+-- Checksum of the dimension rows behind each customer's KPIs when they were
+-- last calculated; customers whose checksum moved are recalculated
+CREATE TABLE IF NOT EXISTS agg_customer_kpi_checksums (
+    customer_id INTEGER PRIMARY KEY,
+    checksum TEXT
+);
+
+-- =============================================
+-- MATERIALIZED VIEWS
+-- =============================================
+-- Heavy view_* views are copied into mv_* tables at the end of each
+-- semantic ETL run (see MATERIALIZED_VIEWS in etl_staging_to_semantic.py).
+-- The API reads through the copy only while is_fresh = 1.
+
+CREATE TABLE IF NOT EXISTS semantic_materialized_views (
+    view_name TEXT PRIMARY KEY,
+    table_name TEXT NOT NULL,
+    refresh_mode TEXT,                       -- FULL, PARTITIONS or UNCHANGED
+    refreshed_at TEXT,
+    row_count INTEGER,
+    partitions_refreshed INTEGER,
+    duration_ms INTEGER,
+    is_fresh INTEGER DEFAULT 0,
+    source_checksums TEXT                    -- JSON {source: checksum} of the last refresh
+);
+
+-- Per-partition checksums of the fact table behind a partitioned view
+CREATE TABLE IF NOT EXISTS semantic_materialized_partitions (
+    view_name TEXT NOT NULL,
+    partition_value,                         -- untyped: keeps the fact column's own type
+    checksum TEXT,
+    PRIMARY KEY (view_name, partition_value)
+);
@@ -0,0 +1,139 @@
+"""
+Benchmark: SQLite Bulk-Load Profile
+
+Loads the same synthetic landing and staging tables twice into scratch
+databases: once with sqlite3 defaults (rollback journal, synchronous=FULL,
+default cache, a commit per batch, indexes maintained row by row) and once
+with the profile from sqlite_bulk_load.py (WAL, synchronous=OFF, large
+cache, temp_store=MEMORY, mmap, deferred secondary indexes, ANALYZE at the
+end). Prints the wall time of each phase and the speed-up.
+
+Usage:
+    python benchmark_bulk_load.py
+    python benchmark_bulk_load.py --rows 500000 --batch 500 --dir D:\\scratch
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+from sqlite_bulk_load import apply_bulk_load_pragmas, deferred_indexes, finish_bulk_load
+
+LANDING_DDL = """
+    CREATE TABLE landing_bench (
+        object_no INTEGER, registration TEXT, customer_no INTEGER,
+        make_code TEXT, model_code TEXT, lease_amount REAL,
+        start_date TEXT, end_date TEXT, extraction_timestamp TEXT
+    )
+"""
+STAGING_DDL = """
+    CREATE TABLE staging_bench (
+        object_no INTEGER PRIMARY KEY, registration_number TEXT, customer_id INTEGER,
+        make_code TEXT, model_code TEXT, monthly_lease_amount REAL,
+        contract_start_date TEXT, contract_end_date TEXT, source_hash TEXT
+    )
+"""
+INDEXES = [
+    "CREATE INDEX idx_landing_bench_timestamp ON landing_bench(extraction_timestamp)",
+    "CREATE INDEX idx_landing_bench_customer ON landing_bench(customer_no)",
+    "CREATE INDEX idx_staging_bench_customer ON staging_bench(customer_id)",
+    "CREATE INDEX idx_staging_bench_make_model ON staging_bench(make_code, model_code)",
+    "CREATE INDEX idx_staging_bench_end_date ON staging_bench(contract_end_date)",
+]
+TRANSFORM_SQL = """
+    INSERT INTO staging_bench
+    SELECT object_no, UPPER(TRIM(registration)), customer_no, make_code, model_code,
+           ROUND(lease_amount, 2), start_date, end_date,
+           object_no || '|' || customer_no || '|' || lease_amount
+    FROM landing_bench
+    ORDER BY object_no
+"""
+
+
+def synthetic_rows(count, seed=42):
+    rng = random.Random(seed)
+    for object_no in range(1, count + 1):
+        year = rng.randint(2018, 2026)
+        yield (
+            object_no, f" {rng.randint(1, 99):02d}-ABC-{object_no % 1000:03d} ",
+            rng.randint(1, 5000), f"M{rng.randint(1, 60):02d}", f"X{rng.randint(1, 400):03d}",
+            rng.uniform(200, 1500), f"{year}-{rng.randint(1, 12):02d}-01",
+            f"{year + 4}-{rng.randint(1, 12):02d}-28", "2026-01-01 02:00:00",
+        )
+
+
+def run(db_path, rows, batch, profile):
+    """Load landing, transform into staging, finish. Returns {phase: seconds}."""
+    conn = sqlite3.connect(db_path)
+    if profile:
+        apply_bulk_load_pragmas(conn, synchronous='OFF')
+    conn.execute(LANDING_DDL)
+    conn.execute(STAGING_DDL)
+    for sql in INDEXES:
+        conn.execute(sql)
+    conn.commit()
+
+    timings = {}
+    insert_sql = "INSERT INTO landing_bench VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+    start = time.perf_counter()
+    if profile:
+        with deferred_indexes(conn, 'landing_bench'):
+            conn.executemany(insert_sql, synthetic_rows(rows))
+        conn.commit()
+    else:
+        data = list(synthetic_rows(rows))
+        for i in range(0, rows, batch):
+            conn.executemany(insert_sql, data[i:i + batch])
+            conn.commit()
+    timings['landing insert'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    if profile:
+        with deferred_indexes(conn, 'staging_bench'):
+            conn.execute(TRANSFORM_SQL)
+    else:
+        conn.execute(TRANSFORM_SQL)
+    conn.commit()
+    timings['staging transform'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    if profile:
+        finish_bulk_load(conn)
+    timings['finish (analyze/checkpoint)'] = time.perf_counter() - start
+
+    conn.close()
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the SQLite bulk-load profile")
+    parser.add_argument("--rows", type=int, default=200000, help="Synthetic rows to load")
+    parser.add_argument("--batch", type=int, default=500, help="Commit batch size of the baseline run")
+    parser.add_argument("--dir", default=None, help="Directory for the scratch databases")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print(f"SQLite bulk-load benchmark: {args.rows:,} rows")
+    print("=" * 60)
+
+    results = {}
+    with tempfile.TemporaryDirectory(dir=args.dir) as scratch:
+        for label, profile in (("default", False), ("bulk profile", True)):
+            results[label] = run(os.path.join(scratch, f"{label.replace(' ', '_')}.db"),
+                                 args.rows, args.batch, profile)
+
+    before, after = results["default"], results["bulk profile"]
+    print(f"  {'phase':<30} {'default s':>10} {'profile s':>10} {'speed-up':>9}")
+    for phase in before:
+        speedup = f"x{before[phase] / after[phase]:.1f}" if min(before[phase], after[phase]) > 0.001 else "-"
+        print(f"  {phase:<30} {before[phase]:>10.2f} {after[phase]:>10.2f} {speedup:>9}")
+    total_before, total_after = sum(before.values()), sum(after.values())
+    print(f"  {'total':<30} {total_before:>10.2f} {total_after:>10.2f} {f'x{total_before / total_after:.1f}':>9}")
+    print(f"\n  Throughput: {args.rows / total_before:,.0f} -> {args.rows / total_after:,.0f} rows/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Benchmark: Landing Ingest Conversion
+
+Writes a synthetic landing source file (1M rows by default), reads it once
+with pandas and loads it into a scratch SQLite table two ways:
+
+    iterrows        the old loaders: df.iterrows() and a per-cell NaN check
+    landing_ingest  column-wise conversion, chunked executemany
+
+Prints the time to convert the frame to insert tuples, the time to insert
+them and the speed-up. The file read is reported separately, as it is the
+same for both.
+
+Usage:
+    python benchmark_landing_ingest.py
+    python benchmark_landing_ingest.py --rows 200000 --format xlsx --dir D:\\scratch
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+import pandas as pd
+
+from landing_ingest import DEFAULT_CHUNK_ROWS, iter_row_chunks
+
+COLUMNS = ['OBJECT_NO', 'REGISTRATION', 'CUSTOMER_NO', 'MAKE_CODE', 'LEASE_AMOUNT',
+           'KM_READING', 'START_DATE', 'REMARK']
+TABLE = 'landing_bench'
+
+
+def write_source_file(path, count, file_format, seed=42):
+    """Synthetic landing rows with NULLs in the numeric and text columns."""
+    rng = random.Random(seed)
+    frame = pd.DataFrame({
+        'OBJECT_NO': range(1, count + 1),
+        'REGISTRATION': [f"{rng.randint(1, 99):02d}-ABC-{i % 1000:03d}" for i in range(count)],
+        'CUSTOMER_NO': [rng.randint(1, 5000) for _ in range(count)],
+        'MAKE_CODE': [f"M{rng.randint(1, 60):02d}" for _ in range(count)],
+        'LEASE_AMOUNT': [None if rng.random() < 0.1 else round(rng.uniform(200, 1500), 2) for _ in range(count)],
+        'KM_READING': [None if rng.random() < 0.2 else rng.randint(0, 300000) for _ in range(count)],
+        'START_DATE': [f"20{rng.randint(18, 26)}-{rng.randint(1, 12):02d}-01" for _ in range(count)],
+        'REMARK': [None if rng.random() < 0.3 else f"remark {rng.randint(1, 10 ** 6)}" for _ in range(count)],
+    })
+    if file_format == 'csv':
+        frame.to_csv(path, index=False)
+    else:
+        frame.to_excel(path, index=False, engine='openpyxl')
+
+
+def iterrows_rows(df):
+    """Insert tuples as the loaders built them before landing_ingest."""
+    data = []
+    for _, row in df.iterrows():
+        values = []
+        for val in row.values:
+            if pd.isna(val):
+                values.append(None)
+            elif isinstance(val, (int, float)):
+                values.append(val)
+            else:
+                values.append(str(val))
+        data.append(tuple(values))
+    return [data]
+
+
+def run(conn, df, convert):
+    """Convert and insert the frame into an empty table. Returns (convert s, insert s)."""
+    conn.execute(f"DELETE FROM {TABLE}")
+    conn.commit()
+    insert_sql = f"INSERT INTO {TABLE} VALUES ({', '.join('?' for _ in COLUMNS)})"
+
+    start = time.perf_counter()
+    chunks = iter(convert(df))
+    convert_seconds = time.perf_counter() - start
+    insert_seconds = 0.0
+    while True:
+        start = time.perf_counter()
+        rows = next(chunks, None)
+        convert_seconds += time.perf_counter() - start
+        if rows is None:
+            break
+        start = time.perf_counter()
+        conn.executemany(insert_sql, rows)
+        insert_seconds += time.perf_counter() - start
+    conn.commit()
+
+    loaded = conn.execute(f"SELECT COUNT(*) FROM {TABLE}").fetchone()[0]
+    if loaded != len(df):
+        raise RuntimeError(f"loaded {loaded} of {len(df)} rows")
+    return convert_seconds, insert_seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the landing ingest conversion")
+    parser.add_argument("--rows", type=int, default=1000000, help="Rows in the synthetic source file")
+    parser.add_argument("--format", choices=('csv', 'xlsx'), default='csv', help="Source file format")
+    parser.add_argument("--chunk", type=int, default=DEFAULT_CHUNK_ROWS, help="Rows per executemany")
+    parser.add_argument("--dir", default=None, help="Directory for the scratch files")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print(f"Landing ingest benchmark: {args.rows:,} rows ({args.format})")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as scratch:
+        source = os.path.join(scratch, f"bench.{args.format}")
+        write_source_file(source, args.rows, args.format)
+
+        start = time.perf_counter()
+        df = pd.read_csv(source) if args.format == 'csv' else pd.read_excel(source, engine='openpyxl')
+        read_seconds = time.perf_counter() - start
+
+        conn = sqlite3.connect(os.path.join(scratch, 'bench.db'))
+        conn.execute(f"CREATE TABLE {TABLE} ({', '.join(f'{column} TEXT' for column in COLUMNS)})")
+
+        results = {
+            'iterrows': run(conn, df, iterrows_rows),
+            'landing_ingest': run(conn, df, lambda frame: iter_row_chunks(frame, args.chunk, 'non_numeric')),
+        }
+        conn.close()
+
+    print(f"  File read (both): {read_seconds:.2f}s")
+    print(f"  {'path':<16} {'convert s':>10} {'insert s':>10} {'rows/s':>12}")
+    for label, (convert_seconds, insert_seconds) in results.items():
+        total = convert_seconds + insert_seconds
+        print(f"  {label:<16} {convert_seconds:>10.2f} {insert_seconds:>10.2f} {args.rows / total:>12,.0f}")
+    before, after = results['iterrows'], results['landing_ingest']
+    print(f"\n  Conversion speed-up: x{before[0] / after[0]:.1f}")
+    print(f"  Total speed-up:      x{sum(before) / sum(after):.1f}")
+
+
+if __name__ == "__main__":
+    main()
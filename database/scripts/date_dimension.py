@@ -0,0 +1,106 @@
+"""
+Shared Date Dimension Builder
+Generates dim_date rows as whole columns (pandas date ranges) and adds only
+the dates a table is missing, extending the horizon as time passes.
+
+Used by etl_staging_to_semantic.py and backend/scripts/import_excel_data.py.
+"""
+
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_START = date(2020, 1, 1)
+DEFAULT_END = date(2030, 12, 31)
+
+# The dimension always reaches at least this many years past the current one
+HORIZON_YEARS = 5
+
+# date_key values below this are a running counter, not YYYYMMDD
+COUNTER_KEY_LIMIT = 10000101
+
+
+def date_range_bounds(start=None, end=None, today=None):
+    """Resolve the dimension's date range, extending the end with the horizon."""
+    today = today or date.today()
+    start = start or DEFAULT_START
+    end = max(end or DEFAULT_END, date(today.year + HORIZON_YEARS, 12, 31))
+    return start, end
+
+
+def build_date_frame(start, end):
+    """
+    Build every dim_date column for start..end (inclusive).
+
+    date_key is the YYYYMMDD integer and full_date the ISO date string, so
+    the frame can be written to the SQLite semantic layer as is.
+    """
+    days = pd.date_range(start, end, freq='D')
+    weekday = days.dayofweek.to_numpy()
+    month = days.month.to_numpy()
+    year = days.year.to_numpy()
+    quarter = days.quarter.to_numpy()
+    month_name = days.month_name()
+
+    return pd.DataFrame({
+        'date_key': year * 10000 + month * 100 + days.day.to_numpy(),
+        'full_date': days.strftime('%Y-%m-%d'),
+        'day_of_week': weekday + 1,
+        'day_name': days.day_name(),
+        'day_of_month': days.day.to_numpy(),
+        'day_of_year': days.dayofyear.to_numpy(),
+        'week_of_year': days.isocalendar().week.to_numpy(dtype=np.int64),
+        'month_number': month,
+        'month_name': month_name,
+        'month_short': month_name.str[:3],
+        'quarter_number': quarter,
+        'quarter_name': 'Q' + pd.Index(quarter).astype(str),
+        'year_number': year,
+        'fiscal_year': np.where(month >= 7, year, year - 1),
+        'is_weekend': (weekday >= 5).astype(np.int64),
+        'is_holiday': np.zeros(len(days), dtype=np.int64),
+        'is_business_day': (weekday < 5).astype(np.int64),
+    })
+
+
+def missing_dates(existing_dates, existing_keys=(), start=None, end=None):
+    """
+    Rows of the resolved range whose full_date is not in existing_dates
+    (date objects or ISO strings). Dates are matched by full_date, not
+    date_key, so tables keyed another way are extended rather than
+    duplicated: when existing_keys are a running counter (as written by the
+    old backend importer), the new rows are numbered on from its largest key
+    instead of getting YYYYMMDD keys.
+    """
+    frame = build_date_frame(*date_range_bounds(start, end))
+    present = {str(value)[:10] for value in existing_dates}
+    frame = frame[~frame['full_date'].isin(present)]
+
+    last_key = max(existing_keys, default=None)
+    if last_key is not None and last_key < COUNTER_KEY_LIMIT:
+        frame = frame.assign(date_key=np.arange(last_key + 1, last_key + 1 + len(frame)))
+    return frame
+
+
+def ensure_date_dimension(conn, table='dim_date', start=None, end=None):
+    """
+    Insert the dates a sqlite3 dim_date table is missing. Only the frame
+    columns that exist in the table are written. Returns the rows added.
+    """
+    cursor = conn.cursor()
+    table_columns = {row[1] for row in cursor.execute(f"PRAGMA table_info({table})")}
+    existing = cursor.execute(f"SELECT date_key, full_date FROM {table}").fetchall()
+
+    frame = missing_dates([row[1] for row in existing], [row[0] for row in existing], start, end)
+    if frame.empty:
+        return 0
+
+    columns = [c for c in frame.columns if c in table_columns]
+    rows = frame[columns].astype(object).itertuples(index=False, name=None)
+    cursor.executemany(
+        f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+        rows,
+    )
+    conn.commit()
+    return len(frame)
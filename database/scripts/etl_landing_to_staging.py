@@ -3,17 +3,235 @@ ETL Script: Landing to Staging
 Transforms and loads data from landing tables to staging tables
 """
 
+import os
+import sys
 import sqlite3
-import hashlib
+import re
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from datetime import datetime
 
+from etl_profiler import EtlProfiler
+from sqlite_bulk_load import connect_for_bulk_load, deferred_indexes, finish_bulk_load
+from reference_lookups import create_reference_tables, report_unmatched_codes
+
+# Row fingerprints are shared with the Airflow CDC operator
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'etl', 'plugins'))
+from row_fingerprint import fingerprint_hex
+
 DB_PATH = r"C:\Users\X1Carbon\Documents\Projects\FleetAI\database\fleetai.db"
 SCHEMA_FILE = r"C:\Users\X1Carbon\Documents\Projects\FleetAI\database\schemas\02_staging_sqlite.sql"
 
+REPORT_DIR = os.path.join(os.path.dirname(DB_PATH), "etl_reports")
+
+# Seconds a connection waits for the write lock held by another loader
+BUSY_TIMEOUT = 300
+
+# Set by main(); log_etl_start/log_etl_end report each table load to it
+PROFILER = None
+
+
+def get_connection(mode=None):
+    """
+    Get database connection. FULL reloads use synchronous=OFF; incremental
+    merges (and the bookkeeping connection) keep synchronous=NORMAL.
+    """
+    synchronous = 'OFF' if mode == 'FULL' else 'NORMAL'
+    conn = connect_for_bulk_load(DB_PATH, timeout=BUSY_TIMEOUT, synchronous=synchronous)
+    # Content hash of a staged row, see row_fingerprint.py
+    conn.create_function("etl_row_hash", -1, fingerprint_hex, deterministic=True)
+    return conn
+
+
+# Natural keys used to match landing rows to staging rows in INCREMENTAL mode.
+# Only tables with a PRIMARY KEY / UNIQUE constraint on the business key are
+# listed; the rest are matched on source_hash (a changed row is a delete + insert).
+STAGING_KEYS = {
+    'staging_customers': ('customer_id',),
+    'staging_drivers': ('object_no', 'driver_no'),
+    'staging_vehicles': ('object_no',),
+    'staging_contracts': ('contract_position_no',),
+    'staging_orders': ('order_no',),
+    'staging_automobiles': ('make_code', 'model_code'),
+    'staging_groups': ('group_no',),
+    'staging_damages': ('damage_id',),
+    'staging_domain_translations': ('country_code', 'domain_id', 'domain_value', 'language_code'),
+    'staging_suppliers': ('supplier_no', 'branch_no'),
+}
+
+INSERT_PATTERN = re.compile(r"INSERT INTO (\w+) \((.*?)\)\s*SELECT", re.S)
+LANDING_PATTERN = re.compile(r"FROM (landing_\w+)")
+
+
+def _table_columns(cursor, table):
+    return [row[1] for row in cursor.execute(f"PRAGMA table_info({table})")]
+
+
+def _landing_watermark(cursor, landing_table):
+    """Latest extraction_timestamp and row count of a landing table, or None."""
+    try:
+        max_ts, rows = cursor.execute(
+            f"SELECT MAX(extraction_timestamp), COUNT(*) FROM {landing_table}"
+        ).fetchone()
+    except sqlite3.OperationalError:
+        return None
+    return f"{max_ts}|{rows}" if max_ts else None
+
+
+def _last_watermark(cursor, table_name):
+    row = cursor.execute("""
+        SELECT source_watermark FROM staging_etl_log
+        WHERE table_name = ? AND status = 'SUCCESS'
+        ORDER BY log_id DESC LIMIT 1
+    """, (table_name,)).fetchone()
+    return row[0] if row else None
+
+
+def _hash_expr(columns):
+    return f"etl_row_hash({', '.join(c for c in columns if c != 'source_hash')})"
+
+
+def _number_duplicate_hashes(cursor, table):
+    """Suffix repeated hashes with their ordinal so identical rows stay distinct."""
+    cursor.execute(f"""
+        UPDATE {table}
+        SET source_hash = source_hash || ':' || d.rn
+        FROM (
+            SELECT rowid AS rid,
+                   ROW_NUMBER() OVER (PARTITION BY source_hash ORDER BY rowid) AS rn
+            FROM {table}
+        ) d
+        WHERE {table}.rowid = d.rid AND d.rn > 1
+    """)
+
+
+def _build_shadow(cursor, table, insert_sql, columns, keys):
+    """Run the loader's transform into temp.etl_shadow; returns the row count."""
+    cursor.execute("DROP TABLE IF EXISTS temp.etl_shadow")
+    cursor.execute(f"CREATE TEMP TABLE etl_shadow AS SELECT * FROM {table} WHERE 0")
+    cursor.execute(insert_sql.replace(f"INSERT INTO {table} ", "INSERT INTO etl_shadow ", 1))
+    snapshot_rows = cursor.rowcount
+    cursor.execute(f"UPDATE etl_shadow SET source_hash = {_hash_expr(columns)}")
+    if keys is None:
+        _number_duplicate_hashes(cursor, 'etl_shadow')
+    return snapshot_rows
+
+
+def _replace_rows(cursor, table, columns, counts):
+    """FULL load: replace the table contents with the shadow rows."""
+    cursor.execute(f"DELETE FROM {table}")
+    with deferred_indexes(cursor.connection, table):
+        cursor.execute(f"""
+            INSERT INTO {table} ({', '.join(columns)})
+            SELECT {', '.join(columns)} FROM etl_shadow ORDER BY rowid
+        """)
+        counts['inserted'] = cursor.rowcount
+
+
+def _merge_rows(cursor, table, columns, keys, counts, retire_missing, snapshot_rows):
+    """INCREMENTAL load: apply only the differences between shadow and staging."""
+    match_columns = keys or ('source_hash',)
+    cursor.execute(f"CREATE INDEX temp.idx_etl_shadow_match ON etl_shadow({', '.join(match_columns)})")
+    match = ' AND '.join(f"s.{c} IS {table}.{c}" for c in match_columns)
+
+    if keys is not None:
+        target_columns = _table_columns(cursor, table)
+        extra = ""
+        if 'is_current' in target_columns:
+            extra += ", is_current = 1"
+        if 'valid_from' in target_columns:
+            extra += ", valid_from = datetime('now')"
+        cursor.execute(f"""
+            UPDATE {table}
+            SET ({', '.join(columns)}) = (
+                SELECT {', '.join('s.' + c for c in columns)}
+                FROM etl_shadow s WHERE {match}
+            ){extra}
+            WHERE EXISTS (
+                SELECT 1 FROM etl_shadow s
+                WHERE {match} AND s.source_hash IS NOT {table}.source_hash
+            )
+        """)
+        counts['updated'] = cursor.rowcount
+
+    cursor.execute(f"""
+        INSERT INTO {table} ({', '.join(columns)})
+        SELECT {', '.join(columns)} FROM etl_shadow s
+        WHERE NOT EXISTS (SELECT 1 FROM {table} WHERE {match})
+        ORDER BY s.rowid
+    """)
+    counts['inserted'] = cursor.rowcount
+
+    if retire_missing or keys is None:
+        cursor.execute(f"""
+            DELETE FROM {table}
+            WHERE NOT EXISTS (SELECT 1 FROM etl_shadow s WHERE {match})
+        """)
+        counts['retired'] = cursor.rowcount
+
+    counts['unchanged'] = snapshot_rows - counts['inserted'] - counts['updated']
+
+
+def stage_rows(conn, insert_sql, mode='FULL', retire_missing=False):
+    """
+    Run a loader's INSERT ... SELECT against its staging table.
+
+    The transform always runs into a temp shadow table first, holding only a
+    read snapshot, so several loaders can transform concurrently on their own
+    connections. The write to the staging table then happens under
+    BEGIN IMMEDIATE (the caller commits).
+
+    FULL: replace the table contents with the shadow rows.
+    INCREMENTAL: insert new rows, update rows whose source_hash changed and
+    leave the rest untouched. Rows missing from the snapshot are deleted when
+    retire_missing is set (always, for tables matched on source_hash). The
+    table is skipped outright when the landing extraction watermark has not
+    moved since the last successful load.
+
+    Returns a dict of inserted/updated/unchanged/retired row counts.
+    """
+    cursor = conn.cursor()
+    table, column_list = INSERT_PATTERN.search(insert_sql).groups()
+    columns = [c.strip() for c in column_list.split(',') if c.strip() != 'source_hash']
+    columns.append('source_hash')
+    keys = STAGING_KEYS.get(table)
+    landing_table = LANDING_PATTERN.search(insert_sql).group(1)
 
-def get_connection():
-    """Get database connection."""
-    return sqlite3.connect(DB_PATH)
+    counts = {'inserted': 0, 'updated': 0, 'unchanged': 0, 'retired': 0, 'skipped': False,
+              'watermark': _landing_watermark(cursor, landing_table)}
+
+    if (mode != 'FULL' and counts['watermark'] is not None
+            and counts['watermark'] == _last_watermark(cursor, table)):
+        counts['unchanged'] = cursor.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        counts['skipped'] = True
+        return counts
+
+    try:
+        snapshot_rows = _build_shadow(cursor, table, insert_sql, columns, keys)
+        # Release the read snapshot before asking for the write lock
+        conn.commit()
+        cursor.execute("BEGIN IMMEDIATE")
+        if mode == 'FULL':
+            _replace_rows(cursor, table, columns, counts)
+        else:
+            _merge_rows(cursor, table, columns, keys, counts, retire_missing, snapshot_rows)
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.execute("DROP TABLE IF EXISTS temp.etl_shadow")
+    return counts
+
+
+def format_counts(counts):
+    """One-line summary of stage_rows() counts for console output."""
+    if counts['skipped']:
+        return f"unchanged since last load ({counts['unchanged']} rows)"
+    if not counts['updated'] and not counts['unchanged'] and not counts['retired']:
+        return f"{counts['inserted']} rows"
+    return (f"{counts['inserted']} inserted, {counts['updated']} updated, "
+            f"{counts['unchanged']} unchanged, {counts['retired']} retired")
 
 
 def create_staging_schema(conn):
@@ -24,10 +242,24 @@ def create_staging_schema(conn):
 
     cursor = conn.cursor()
     cursor.executescript(schema_sql)
+    create_reference_tables(conn)
+
+    # Columns added to staging_etl_log after the first release
+    existing = _table_columns(cursor, 'staging_etl_log')
+    for column, col_type in (('unchanged_rows', 'INTEGER'), ('retired_rows', 'INTEGER'),
+                             ('source_watermark', 'TEXT'), ('duration_ms', 'REAL')):
+        if column not in existing:
+            cursor.execute(f"ALTER TABLE staging_etl_log ADD COLUMN {column} {col_type}")
     conn.commit()
     print("  Staging schema created.")
 
 
+# log_id -> perf_counter() at log_etl_start, for per-task duration
+_log_timers = {}
+# log_id -> table name of the profiler step opened by log_etl_start
+_log_steps = {}
+
+
 def log_etl_start(conn, table_name, load_type):
     """Log ETL start."""
     cursor = conn.cursor()
@@ -36,18 +268,39 @@ def log_etl_start(conn, table_name, load_type):
         VALUES (?, ?, datetime('now'), 'RUNNING')
     """, (table_name, load_type))
     conn.commit()
+    _log_timers[cursor.lastrowid] = time.perf_counter()
+    if PROFILER is not None:
+        _log_steps[cursor.lastrowid] = table_name
+        PROFILER.begin(table_name, conn)
     return cursor.lastrowid
 
 
-def log_etl_end(conn, log_id, source_rows, inserted_rows, updated_rows=0, status='SUCCESS', error=None):
+def log_etl_end(conn, log_id, source_rows, inserted_rows=0, updated_rows=0, status='SUCCESS', error=None,
+                counts=None):
     """Log ETL completion."""
+    unchanged_rows = retired_rows = 0
+    watermark = None
+    if counts is not None:
+        inserted_rows = counts['inserted']
+        updated_rows = counts['updated']
+        unchanged_rows = counts['unchanged']
+        retired_rows = counts['retired']
+        watermark = counts['watermark']
+
+    started = _log_timers.pop(log_id, None)
+    duration_ms = round((time.perf_counter() - started) * 1000, 1) if started is not None else None
+    if PROFILER is not None and log_id in _log_steps:
+        PROFILER.end(_log_steps.pop(log_id), rows=source_rows, status=status)
+
     cursor = conn.cursor()
     cursor.execute("""
         UPDATE staging_etl_log
         SET load_end = datetime('now'), source_rows = ?, inserted_rows = ?,
-            updated_rows = ?, status = ?, error_message = ?
+            updated_rows = ?, unchanged_rows = ?, retired_rows = ?,
+            source_watermark = ?, duration_ms = ?, status = ?, error_message = ?
         WHERE log_id = ?
-    """, (source_rows, inserted_rows, updated_rows, status, error, log_id))
+    """, (source_rows, inserted_rows, updated_rows, unchanged_rows, retired_rows,
+          watermark, duration_ms, status, error, log_id))
     conn.commit()
 
 
@@ -66,19 +319,15 @@ def parse_date_components(cc, yy, mm, dd):
         return None
 
 
-def load_customers(conn):
+def load_customers(conn, mode='FULL', retire_missing=False):
     """Load customers from landing to staging."""
-    print("  Loading customers...", end=" ", flush=True)
-    log_id = log_etl_start(conn, 'staging_customers', 'FULL')
+    log_id = log_etl_start(conn, 'staging_customers', mode)
 
     try:
         cursor = conn.cursor()
 
-        # Clear existing data
-        cursor.execute("DELETE FROM staging_customers")
-
         # Transform and load - using documented column names
-        cursor.execute("""
+        counts = stage_rows(conn, """
             INSERT INTO staging_customers (
                 customer_id, customer_name, customer_name_2, customer_name_3,
                 call_name, company_code, address, city, country_code,
@@ -105,31 +354,28 @@ def load_customers(conn):
                 CCCU_CUNKLO,
                 NULL
             FROM landing_CCCU
-        """)
+        """, mode, retire_missing)
 
         source_rows = cursor.execute("SELECT COUNT(*) FROM landing_CCCU").fetchone()[0]
         conn.commit()
-        inserted_rows = cursor.execute("SELECT COUNT(*) FROM staging_customers").fetchone()[0]
 
-        log_etl_end(conn, log_id, source_rows, inserted_rows)
-        print(f"{inserted_rows} rows")
+        log_etl_end(conn, log_id, source_rows, counts=counts)
+        print(f"  customers: {format_counts(counts)}")
 
     except Exception as e:
         log_etl_end(conn, log_id, 0, 0, status='FAILED', error=str(e))
-        print(f"FAILED - {e}")
+        print(f"  customers: FAILED - {e}")
 
 
-def load_drivers(conn):
+def load_drivers(conn, mode='FULL', retire_missing=False):
     """Load drivers from landing to staging."""
-    print("  Loading drivers...", end=" ", flush=True)
-    log_id = log_etl_start(conn, 'staging_drivers', 'FULL')
+    log_id = log_etl_start(conn, 'staging_drivers', mode)
 
     try:
         cursor = conn.cursor()
-        cursor.execute("DELETE FROM staging_drivers")
 
         # Using documented column names for clarity
-        cursor.execute("""
+        counts = stage_rows(conn, """
             INSERT INTO staging_drivers (
                 object_no, driver_no, active_driver, driver_name,
                 first_name, last_name, address, city, country_code,
@@ -154,32 +400,29 @@ def load_drivers(conn):
                 CCDR_DRCOUC_Country_Code,
                 NULL
             FROM landing_CCDR
-        """)
+        """, mode, retire_missing)
 
         source_rows = cursor.execute("SELECT COUNT(*) FROM landing_CCDR").fetchone()[0]
         conn.commit()
-        inserted_rows = cursor.execute("SELECT COUNT(*) FROM staging_drivers").fetchone()[0]
 
-        log_etl_end(conn, log_id, source_rows, inserted_rows)
-        print(f"{inserted_rows} rows")
+        log_etl_end(conn, log_id, source_rows, counts=counts)
+        print(f"  drivers: {format_counts(counts)}")
 
     except Exception as e:
         log_etl_end(conn, log_id, 0, 0, status='FAILED', error=str(e))
-        print(f"FAILED - {e}")
+        print(f"  drivers: FAILED - {e}")
 
 
-def load_vehicles(conn):
+def load_vehicles(conn, mode='FULL', retire_missing=False):
     """Load vehicles from landing to staging."""
-    print("  Loading vehicles...", end=" ", flush=True)
-    log_id = log_etl_start(conn, 'staging_vehicles', 'FULL')
+    log_id = log_etl_start(conn, 'staging_vehicles', mode)
 
     try:
         cursor = conn.cursor()
-        cursor.execute("DELETE FROM staging_vehicles")
 
         # Get automobile reference data for make/model names
         # Using documented column names for self-documenting ETL
-        cursor.execute("""
+        counts = stage_rows(conn, """
             INSERT INTO staging_vehicles (
                 object_no, vin, make_code, model_code, customer_no,
                 pc_no, contract_no, contract_position_no, color_code, color_name,
@@ -250,11 +493,10 @@ def load_vehicles(conn):
                 ELSE NULL END,
                 NULL
             FROM landing_CCOB ob
-        """)
+        """, mode, retire_missing)
 
         source_rows = cursor.execute("SELECT COUNT(*) FROM landing_CCOB").fetchone()[0]
         conn.commit()
-        inserted_rows = cursor.execute("SELECT COUNT(*) FROM staging_vehicles").fetchone()[0]
 
         # Compute expected_end_date, months_driven, months_remaining
         cursor.execute("""
@@ -285,25 +527,23 @@ def load_vehicles(conn):
         """)
         conn.commit()
 
-        log_etl_end(conn, log_id, source_rows, inserted_rows)
-        print(f"{inserted_rows} rows")
+        log_etl_end(conn, log_id, source_rows, counts=counts)
+        print(f"  vehicles: {format_counts(counts)}")
 
     except Exception as e:
         log_etl_end(conn, log_id, 0, 0, status='FAILED', error=str(e))
-        print(f"FAILED - {e}")
+        print(f"  vehicles: FAILED - {e}")
 
 
-def load_contracts(conn):
+def load_contracts(conn, mode='FULL', retire_missing=False):
     """Load contracts from landing to staging."""
-    print("  Loading contracts...", end=" ", flush=True)
-    log_id = log_etl_start(conn, 'staging_contracts', 'FULL')
+    log_id = log_etl_start(conn, 'staging_contracts', mode)
 
     try:
         cursor = conn.cursor()
-        cursor.execute("DELETE FROM staging_contracts")
 
         # Using documented column names
-        cursor.execute("""
+        counts = stage_rows(conn, """
             INSERT INTO staging_contracts (
                 contract_position_no, group_no, customer_no, pc_no, contract_no,
                 active_cp, delivery_days, duration_months, km_per_year,
@@ -360,11 +600,10 @@ def load_contracts(conn):
                 ELSE NULL END,
                 NULL
             FROM landing_CCCP
-        """)
+        """, mode, retire_missing)
 
         source_rows = cursor.execute("SELECT COUNT(*) FROM landing_CCCP").fetchone()[0]
         conn.commit()
-        inserted_rows = cursor.execute("SELECT COUNT(*) FROM staging_contracts").fetchone()[0]
 
         # Compute end_date from start_date + duration_months
         cursor.execute("""
@@ -383,25 +622,23 @@ def load_contracts(conn):
         """)
         conn.commit()
 
-        log_etl_end(conn, log_id, source_rows, inserted_rows)
-        print(f"{inserted_rows} rows")
+        log_etl_end(conn, log_id, source_rows, counts=counts)
+        print(f"  contracts: {format_counts(counts)}")
 
     except Exception as e:
         log_etl_end(conn, log_id, 0, 0, status='FAILED', error=str(e))
-        print(f"FAILED - {e}")
+        print(f"  contracts: FAILED - {e}")
 
 
-def load_orders(conn):
+def load_orders(conn, mode='FULL', retire_missing=False):
     """Load orders from landing to staging."""
-    print("  Loading orders...", end=" ", flush=True)
-    log_id = log_etl_start(conn, 'staging_orders', 'FULL')
+    log_id = log_etl_start(conn, 'staging_orders', mode)
 
     try:
         cursor = conn.cursor()
-        cursor.execute("DELETE FROM staging_orders")
 
         # Using documented column names
-        cursor.execute("""
+        counts = stage_rows(conn, """
             INSERT INTO staging_orders (
                 order_no, contract_position_no, group_no, customer_no,
                 pc_no, contract_no, exterior_color, interior_color, location,
@@ -426,11 +663,10 @@ def load_orders(conn):
                 CCOR_ORCOUC_Country_Code,
                 NULL
             FROM landing_CCOR
-        """)
+        """, mode, retire_missing)
 
         source_rows = cursor.execute("SELECT COUNT(*) FROM landing_CCOR").fetchone()[0]
         conn.commit()
-        inserted_rows = cursor.execute("SELECT COUNT(*) FROM staging_orders").fetchone()[0]
 
         # Update dates - Note: date columns not renamed, using original names
         cursor.execute("""
@@ -449,18 +685,10 @@ def load_orders(conn):
         # Derive order_status text from order_status_code
         cursor.execute("""
             UPDATE staging_orders
-            SET order_status = CASE order_status_code
-                WHEN 0 THEN 'Created'
-                WHEN 1 THEN 'Sent to Dealer'
-                WHEN 2 THEN 'Delivery Confirmed'
-                WHEN 3 THEN 'Insurance Arranged'
-                WHEN 4 THEN 'Registration Arranged'
-                WHEN 5 THEN 'Driver Pack Prepared'
-                WHEN 6 THEN 'Vehicle Delivered'
-                WHEN 7 THEN 'Lease Schedule Generated'
-                WHEN 9 THEN 'Cancelled'
-                ELSE 'Unknown'
-            END
+            SET order_status = COALESCE(
+                (SELECT status_name FROM ref_order_status WHERE status_code = order_status_code),
+                'Unknown'
+            )
         """)
         conn.commit()
 
@@ -513,25 +741,23 @@ def load_orders(conn):
         """)
         conn.commit()
 
-        log_etl_end(conn, log_id, source_rows, inserted_rows)
-        print(f"{inserted_rows} rows")
+        log_etl_end(conn, log_id, source_rows, counts=counts)
+        print(f"  orders: {format_counts(counts)}")
 
     except Exception as e:
         log_etl_end(conn, log_id, 0, 0, status='FAILED', error=str(e))
-        print(f"FAILED - {e}")
+        print(f"  orders: FAILED - {e}")
 
 
-def load_billing(conn):
+def load_billing(conn, mode='FULL', retire_missing=False):
     """Load billing from landing to staging."""
-    print("  Loading billing...", end=" ", flush=True)
-    log_id = log_etl_start(conn, 'staging_billing', 'FULL')
+    log_id = log_etl_start(conn, 'staging_billing', mode)
 
     try:
         cursor = conn.cursor()
-        cursor.execute("DELETE FROM staging_billing")
 
         # Using documented column names
-        cursor.execute("""
+        counts = stage_rows(conn, """
             INSERT INTO staging_billing (
                 billing_no, object_no, billing_run_no, billing_owner,
                 billing_name, billing_address, billing_city, billing_method,
@@ -558,31 +784,28 @@ def load_billing(conn):
                 CCBI_BICOUC_Country_Code,
                 NULL
             FROM landing_CCBI
-        """)
+        """, mode, retire_missing)
 
         source_rows = cursor.execute("SELECT COUNT(*) FROM landing_CCBI").fetchone()[0]
         conn.commit()
-        inserted_rows = cursor.execute("SELECT COUNT(*) FROM staging_billing").fetchone()[0]
 
-        log_etl_end(conn, log_id, source_rows, inserted_rows)
-        print(f"{inserted_rows} rows")
+        log_etl_end(conn, log_id, source_rows, counts=counts)
+        print(f"  billing: {format_counts(counts)}")
 
     except Exception as e:
         log_etl_end(conn, log_id, 0, 0, status='FAILED', error=str(e))
-        print(f"FAILED - {e}")
+        print(f"  billing: FAILED - {e}")
 
 
-def load_automobiles(conn):
+def load_automobiles(conn, mode='FULL', retire_missing=False):
     """Load automobile reference data from landing to staging."""
-    print("  Loading automobiles...", end=" ", flush=True)
-    log_id = log_etl_start(conn, 'staging_automobiles', 'FULL')
+    log_id = log_etl_start(conn, 'staging_automobiles', mode)
 
     try:
         cursor = conn.cursor()
-        cursor.execute("DELETE FROM staging_automobiles")
 
         # Using documented column names
-        cursor.execute("""
+        counts = stage_rows(conn, """
             INSERT INTO staging_automobiles (
                 make_code, make_name, model_code, model_name,
                 model_group_high, model_group_range, model_group_size,
@@ -601,31 +824,28 @@ def load_automobiles(conn):
                 CCAU_AUCOUC_Country_Code,
                 NULL
             FROM landing_CCAU
-        """)
+        """, mode, retire_missing)
 
         source_rows = cursor.execute("SELECT COUNT(*) FROM landing_CCAU").fetchone()[0]
         conn.commit()
-        inserted_rows = cursor.execute("SELECT COUNT(*) FROM staging_automobiles").fetchone()[0]
 
-        log_etl_end(conn, log_id, source_rows, inserted_rows)
-        print(f"{inserted_rows} rows")
+        log_etl_end(conn, log_id, source_rows, counts=counts)
+        print(f"  automobiles: {format_counts(counts)}")
 
     except Exception as e:
         log_etl_end(conn, log_id, 0, 0, status='FAILED', error=str(e))
-        print(f"FAILED - {e}")
+        print(f"  automobiles: FAILED - {e}")
 
 
-def load_groups(conn):
+def load_groups(conn, mode='FULL', retire_missing=False):
     """Load groups from landing to staging."""
-    print("  Loading groups...", end=" ", flush=True)
-    log_id = log_etl_start(conn, 'staging_groups', 'FULL')
+    log_id = log_etl_start(conn, 'staging_groups', mode)
 
     try:
         cursor = conn.cursor()
-        cursor.execute("DELETE FROM staging_groups")
 
         # Using documented column names
-        cursor.execute("""
+        counts = stage_rows(conn, """
             INSERT INTO staging_groups (
                 group_no, customer_no, group_name, report_period, country, source_hash
             )
@@ -637,31 +857,28 @@ def load_groups(conn):
                 CCGR_GRCOUC_Country_Code,
                 NULL
             FROM landing_CCGR
-        """)
+        """, mode, retire_missing)
 
         source_rows = cursor.execute("SELECT COUNT(*) FROM landing_CCGR").fetchone()[0]
         conn.commit()
-        inserted_rows = cursor.execute("SELECT COUNT(*) FROM staging_groups").fetchone()[0]
 
-        log_etl_end(conn, log_id, source_rows, inserted_rows)
-        print(f"{inserted_rows} rows")
+        log_etl_end(conn, log_id, source_rows, counts=counts)
+        print(f"  groups: {format_counts(counts)}")
 
     except Exception as e:
         log_etl_end(conn, log_id, 0, 0, status='FAILED', error=str(e))
-        print(f"FAILED - {e}")
+        print(f"  groups: FAILED - {e}")
 
 
-def load_odometer_history(conn):
+def load_odometer_history(conn, mode='FULL', retire_missing=False):
     """Load odometer/maintenance history from landing to staging."""
-    print("  Loading odometer history...", end=" ", flush=True)
-    log_id = log_etl_start(conn, 'staging_odometer_history', 'FULL')
+    log_id = log_etl_start(conn, 'staging_odometer_history', mode)
 
     try:
         cursor = conn.cursor()
-        cursor.execute("DELETE FROM staging_odometer_history")
 
         # Using documented column names
-        cursor.execute("""
+        counts = stage_rows(conn, """
             INSERT INTO staging_odometer_history (
                 object_no, sequence_no, reading_date, odometer_km, amount,
                 description, source_code, supplier_no, supplier_ref,
@@ -686,31 +903,28 @@ def load_odometer_history(conn):
                 CCGD_MAGDTSP,
                 NULL
             FROM landing_CCGD
-        """)
+        """, mode, retire_missing)
 
         source_rows = cursor.execute("SELECT COUNT(*) FROM landing_CCGD").fetchone()[0]
         conn.commit()
-        inserted_rows = cursor.execute("SELECT COUNT(*) FROM staging_odometer_history").fetchone()[0]
 
-        log_etl_end(conn, log_id, source_rows, inserted_rows)
-        print(f"{inserted_rows} rows")
+        log_etl_end(conn, log_id, source_rows, counts=counts)
+        print(f"  odometer history: {format_counts(counts)}")
 
     except Exception as e:
         log_etl_end(conn, log_id, 0, 0, status='FAILED', error=str(e))
-        print(f"FAILED - {e}")
+        print(f"  odometer history: FAILED - {e}")
 
 
-def load_damages(conn):
+def load_damages(conn, mode='FULL', retire_missing=False):
     """Load damages from landing to staging."""
-    print("  Loading damages...", end=" ", flush=True)
-    log_id = log_etl_start(conn, 'staging_damages', 'FULL')
+    log_id = log_etl_start(conn, 'staging_damages', mode)
 
     try:
         cursor = conn.cursor()
-        cursor.execute("DELETE FROM staging_damages")
 
         # Using documented column names from CCDA (Damages by Object Number)
-        cursor.execute("""
+        counts = stage_rows(conn, """
             INSERT INTO staging_damages (
                 damage_id, object_no, driver_no, damage_date,
                 description, damage_amount,
@@ -766,30 +980,26 @@ def load_damages(conn):
                 CCDA_DARSGA_Garage_Name,
                 NULL
             FROM landing_CCDA
-        """)
+        """, mode, retire_missing)
 
         source_rows = cursor.execute("SELECT COUNT(*) FROM landing_CCDA").fetchone()[0]
         conn.commit()
-        inserted_rows = cursor.execute("SELECT COUNT(*) FROM staging_damages").fetchone()[0]
 
-        log_etl_end(conn, log_id, source_rows, inserted_rows)
-        print(f"{inserted_rows} rows")
+        log_etl_end(conn, log_id, source_rows, counts=counts)
+        print(f"  damages: {format_counts(counts)}")
 
     except Exception as e:
         log_etl_end(conn, log_id, 0, 0, status='FAILED', error=str(e))
-        print(f"FAILED - {e}")
+        print(f"  damages: FAILED - {e}")
 
 
-def load_domain_translations(conn):
+def load_domain_translations(conn, mode='FULL', retire_missing=False):
     """Load domain translations from landing to staging."""
-    print("  Loading domain translations...", end=" ", flush=True)
-    log_id = log_etl_start(conn, 'staging_domain_translations', 'FULL')
+    log_id = log_etl_start(conn, 'staging_domain_translations', mode)
 
     try:
         cursor = conn.cursor()
-        cursor.execute("DELETE FROM staging_domain_translations")
-
-        cursor.execute("""
+        counts = stage_rows(conn, """
             INSERT INTO staging_domain_translations (
                 country_code, domain_id, domain_value, language_code, domain_text
             )
@@ -800,30 +1010,26 @@ def load_domain_translations(conn):
                 CCDT_DTDMLN_Language_Code,
                 CCDT_DTDMTX_Domain_Text
             FROM landing_CCDT
-        """)
+        """, mode, retire_missing)
 
         source_rows = cursor.execute("SELECT COUNT(*) FROM landing_CCDT").fetchone()[0]
         conn.commit()
-        inserted_rows = cursor.execute("SELECT COUNT(*) FROM staging_domain_translations").fetchone()[0]
 
-        log_etl_end(conn, log_id, source_rows, inserted_rows)
-        print(f"{inserted_rows} rows")
+        log_etl_end(conn, log_id, source_rows, counts=counts)
+        print(f"  domain translations: {format_counts(counts)}")
 
     except Exception as e:
         log_etl_end(conn, log_id, 0, 0, status='FAILED', error=str(e))
-        print(f"FAILED - {e}")
+        print(f"  domain translations: FAILED - {e}")
 
 
-def load_exploitation_services(conn):
+def load_exploitation_services(conn, mode='FULL', retire_missing=False):
     """Load exploitation services from landing to staging."""
-    print("  Loading exploitation services...", end=" ", flush=True)
-    log_id = log_etl_start(conn, 'staging_exploitation_services', 'FULL')
+    log_id = log_etl_start(conn, 'staging_exploitation_services', mode)
 
     try:
         cursor = conn.cursor()
-        cursor.execute("DELETE FROM staging_exploitation_services")
-
-        cursor.execute("""
+        counts = stage_rows(conn, """
             INSERT INTO staging_exploitation_services (
                 customer_no, contract_position_no, object_no, service_sequence,
                 service_code, service_cost_total, service_invoice,
@@ -850,30 +1056,26 @@ def load_exploitation_services(conn):
                 CCES_ESCONC_Consumption_Code,
                 CCES_ESCURC_Currency_Code
             FROM landing_CCES
-        """)
+        """, mode, retire_missing)
 
         source_rows = cursor.execute("SELECT COUNT(*) FROM landing_CCES").fetchone()[0]
         conn.commit()
-        inserted_rows = cursor.execute("SELECT COUNT(*) FROM staging_exploitation_services").fetchone()[0]
 
-        log_etl_end(conn, log_id, source_rows, inserted_rows)
-        print(f"{inserted_rows} rows")
+        log_etl_end(conn, log_id, source_rows, counts=counts)
+        print(f"  exploitation services: {format_counts(counts)}")
 
     except Exception as e:
         log_etl_end(conn, log_id, 0, 0, status='FAILED', error=str(e))
-        print(f"FAILED - {e}")
+        print(f"  exploitation services: FAILED - {e}")
 
 
-def load_maintenance_approvals(conn):
+def load_maintenance_approvals(conn, mode='FULL', retire_missing=False):
     """Load maintenance approvals from landing to staging."""
-    print("  Loading maintenance approvals...", end=" ", flush=True)
-    log_id = log_etl_start(conn, 'staging_maintenance_approvals', 'FULL')
+    log_id = log_etl_start(conn, 'staging_maintenance_approvals', mode)
 
     try:
         cursor = conn.cursor()
-        cursor.execute("DELETE FROM staging_maintenance_approvals")
-
-        cursor.execute("""
+        counts = stage_rows(conn, """
             INSERT INTO staging_maintenance_approvals (
                 object_no, sequence, approval_date, date_from,
                 mileage_km, amount, description, description_2, description_3,
@@ -920,30 +1122,26 @@ def load_maintenance_approvals(conn):
                 CCMS_MSCURC_Currency_Code,
                 CCMS_MSSIRN_SI_Run_No
             FROM landing_CCMS
-        """)
+        """, mode, retire_missing)
 
         source_rows = cursor.execute("SELECT COUNT(*) FROM landing_CCMS").fetchone()[0]
         conn.commit()
-        inserted_rows = cursor.execute("SELECT COUNT(*) FROM staging_maintenance_approvals").fetchone()[0]
 
-        log_etl_end(conn, log_id, source_rows, inserted_rows)
-        print(f"{inserted_rows} rows")
+        log_etl_end(conn, log_id, source_rows, counts=counts)
+        print(f"  maintenance approvals: {format_counts(counts)}")
 
     except Exception as e:
         log_etl_end(conn, log_id, 0, 0, status='FAILED', error=str(e))
-        print(f"FAILED - {e}")
+        print(f"  maintenance approvals: FAILED - {e}")
 
 
-def load_passed_invoices(conn):
+def load_passed_invoices(conn, mode='FULL', retire_missing=False):
     """Load passed invoices from landing to staging."""
-    print("  Loading passed invoices...", end=" ", flush=True)
-    log_id = log_etl_start(conn, 'staging_passed_invoices', 'FULL')
+    log_id = log_etl_start(conn, 'staging_passed_invoices', mode)
 
     try:
         cursor = conn.cursor()
-        cursor.execute("DELETE FROM staging_passed_invoices")
-
-        cursor.execute("""
+        counts = stage_rows(conn, """
             INSERT INTO staging_passed_invoices (
                 contract_no, customer_no, name_code, object_no,
                 contract_position_no, amount, cost_code, eb_reporting_period,
@@ -973,30 +1171,26 @@ def load_passed_invoices(conn):
                 CCPI_PIRPPD_Reporting_Period,
                 CCPI_PICOUC_Country_Code
             FROM landing_CCPI
-        """)
+        """, mode, retire_missing)
 
         source_rows = cursor.execute("SELECT COUNT(*) FROM landing_CCPI").fetchone()[0]
         conn.commit()
-        inserted_rows = cursor.execute("SELECT COUNT(*) FROM staging_passed_invoices").fetchone()[0]
 
-        log_etl_end(conn, log_id, source_rows, inserted_rows)
-        print(f"{inserted_rows} rows")
+        log_etl_end(conn, log_id, source_rows, counts=counts)
+        print(f"  passed invoices: {format_counts(counts)}")
 
     except Exception as e:
         log_etl_end(conn, log_id, 0, 0, status='FAILED', error=str(e))
-        print(f"FAILED - {e}")
+        print(f"  passed invoices: FAILED - {e}")
 
 
-def load_replacement_cars(conn):
+def load_replacement_cars(conn, mode='FULL', retire_missing=False):
     """Load replacement cars from landing to staging."""
-    print("  Loading replacement cars...", end=" ", flush=True)
-    log_id = log_etl_start(conn, 'staging_replacement_cars', 'FULL')
+    log_id = log_etl_start(conn, 'staging_replacement_cars', mode)
 
     try:
         cursor = conn.cursor()
-        cursor.execute("DELETE FROM staging_replacement_cars")
-
-        cursor.execute("""
+        counts = stage_rows(conn, """
             INSERT INTO staging_replacement_cars (
                 object_no, rc_no, sequence, driver_no, begin_date, end_date,
                 rc_run_no, rc_code, km, amount, reason,
@@ -1038,30 +1232,26 @@ def load_replacement_cars(conn):
                 CCRC_RCRPPD_Reporting_Period,
                 CCRC_RCCOUC_Country_Code
             FROM landing_CCRC
-        """)
+        """, mode, retire_missing)
 
         source_rows = cursor.execute("SELECT COUNT(*) FROM landing_CCRC").fetchone()[0]
         conn.commit()
-        inserted_rows = cursor.execute("SELECT COUNT(*) FROM staging_replacement_cars").fetchone()[0]
 
-        log_etl_end(conn, log_id, source_rows, inserted_rows)
-        print(f"{inserted_rows} rows")
+        log_etl_end(conn, log_id, source_rows, counts=counts)
+        print(f"  replacement cars: {format_counts(counts)}")
 
     except Exception as e:
         log_etl_end(conn, log_id, 0, 0, status='FAILED', error=str(e))
-        print(f"FAILED - {e}")
+        print(f"  replacement cars: FAILED - {e}")
 
 
-def load_reporting_periods(conn):
+def load_reporting_periods(conn, mode='FULL', retire_missing=False):
     """Load reporting periods from landing to staging."""
-    print("  Loading reporting periods...", end=" ", flush=True)
-    log_id = log_etl_start(conn, 'staging_reporting_periods', 'FULL')
+    log_id = log_etl_start(conn, 'staging_reporting_periods', mode)
 
     try:
         cursor = conn.cursor()
-        cursor.execute("DELETE FROM staging_reporting_periods")
-
-        cursor.execute("""
+        counts = stage_rows(conn, """
             INSERT INTO staging_reporting_periods (
                 reporting_period, month_period, reporting_date
             )
@@ -1077,30 +1267,26 @@ def load_reporting_periods(conn):
                     CCRP_RPRPMM_Period_MM, CCRP_RPRPDD_Period_DD)
                 ELSE NULL END
             FROM landing_CCRP
-        """)
+        """, mode, retire_missing)
 
         source_rows = cursor.execute("SELECT COUNT(*) FROM landing_CCRP").fetchone()[0]
         conn.commit()
-        inserted_rows = cursor.execute("SELECT COUNT(*) FROM staging_reporting_periods").fetchone()[0]
 
-        log_etl_end(conn, log_id, source_rows, inserted_rows)
-        print(f"{inserted_rows} rows")
+        log_etl_end(conn, log_id, source_rows, counts=counts)
+        print(f"  reporting periods: {format_counts(counts)}")
 
     except Exception as e:
         log_etl_end(conn, log_id, 0, 0, status='FAILED', error=str(e))
-        print(f"FAILED - {e}")
+        print(f"  reporting periods: FAILED - {e}")
 
 
-def load_suppliers(conn):
+def load_suppliers(conn, mode='FULL', retire_missing=False):
     """Load suppliers from landing to staging."""
-    print("  Loading suppliers...", end=" ", flush=True)
-    log_id = log_etl_start(conn, 'staging_suppliers', 'FULL')
+    log_id = log_etl_start(conn, 'staging_suppliers', mode)
 
     try:
         cursor = conn.cursor()
-        cursor.execute("DELETE FROM staging_suppliers")
-
-        cursor.execute("""
+        counts = stage_rows(conn, """
             INSERT INTO staging_suppliers (
                 supplier_no, branch_no, supplier_name, name_line_2, name_line_3,
                 class, country_code, address, city, category,
@@ -1126,30 +1312,26 @@ def load_suppliers(conn):
                 CCSU_SURPPD_Reporting_Period,
                 CCSU_SUCOUC_Country
             FROM landing_CCSU
-        """)
+        """, mode, retire_missing)
 
         source_rows = cursor.execute("SELECT COUNT(*) FROM landing_CCSU").fetchone()[0]
         conn.commit()
-        inserted_rows = cursor.execute("SELECT COUNT(*) FROM staging_suppliers").fetchone()[0]
 
-        log_etl_end(conn, log_id, source_rows, inserted_rows)
-        print(f"{inserted_rows} rows")
+        log_etl_end(conn, log_id, source_rows, counts=counts)
+        print(f"  suppliers: {format_counts(counts)}")
 
     except Exception as e:
         log_etl_end(conn, log_id, 0, 0, status='FAILED', error=str(e))
-        print(f"FAILED - {e}")
+        print(f"  suppliers: FAILED - {e}")
 
 
-def load_car_reports(conn):
+def load_car_reports(conn, mode='FULL', retire_missing=False):
     """Load car reports from landing to staging."""
-    print("  Loading car reports...", end=" ", flush=True)
-    log_id = log_etl_start(conn, 'staging_car_reports', 'FULL')
+    log_id = log_etl_start(conn, 'staging_car_reports', mode)
 
     try:
         cursor = conn.cursor()
-        cursor.execute("DELETE FROM staging_car_reports")
-
-        cursor.execute("""
+        counts = stage_rows(conn, """
             INSERT INTO staging_car_reports (
                 object_no, reporting_period,
                 odometer_date,
@@ -1302,28 +1484,147 @@ def load_car_reports(conn):
                 CCCR_CRWAMD_Warranty_Monthly_Deviation,
                 CCCR_CRWASL_Warranty_Slope
             FROM landing_CCCR
-        """)
+        """, mode, retire_missing)
 
         source_rows = cursor.execute("SELECT COUNT(*) FROM landing_CCCR").fetchone()[0]
         conn.commit()
-        inserted_rows = cursor.execute("SELECT COUNT(*) FROM staging_car_reports").fetchone()[0]
 
-        log_etl_end(conn, log_id, source_rows, inserted_rows)
-        print(f"{inserted_rows} rows")
+        log_etl_end(conn, log_id, source_rows, counts=counts)
+        print(f"  car reports: {format_counts(counts)}")
 
     except Exception as e:
         log_etl_end(conn, log_id, 0, 0, status='FAILED', error=str(e))
-        print(f"FAILED - {e}")
+        print(f"  car reports: FAILED - {e}")
+
+
+# Task name -> (loader, upstream tasks). Declaration order is the sequential
+# run order and the order --from counts from. No loader reads another staging
+# table; the dependencies keep child entities behind the parents they refer to
+# (vehicles resolve make/model against the automobile catalogue, drivers,
+# contracts and history hang off vehicles) so a rerun stays consistent.
+STAGING_TASKS = {
+    'customers': (load_customers, ()),
+    'automobiles': (load_automobiles, ()),
+    'groups': (load_groups, ()),
+    'reporting_periods': (load_reporting_periods, ()),
+    'suppliers': (load_suppliers, ()),
+    'domain_translations': (load_domain_translations, ()),
+    'vehicles': (load_vehicles, ('automobiles',)),
+    'drivers': (load_drivers, ('vehicles',)),
+    'contracts': (load_contracts, ('vehicles',)),
+    'orders': (load_orders, ()),
+    'billing': (load_billing, ()),
+    'odometer_history': (load_odometer_history, ('vehicles',)),
+    'damages': (load_damages, ('vehicles', 'drivers')),
+    'exploitation_services': (load_exploitation_services, ()),
+    'maintenance_approvals': (load_maintenance_approvals, ('suppliers',)),
+    'passed_invoices': (load_passed_invoices, ()),
+    'replacement_cars': (load_replacement_cars, ()),
+    'car_reports': (load_car_reports, ('vehicles', 'reporting_periods')),
+}
+
+
+def select_tasks(only=None, start_from=None):
+    """Resolve --only / --from into the list of task names to run."""
+    names = list(STAGING_TASKS)
+    for name in (only or []) + ([start_from] if start_from else []):
+        if name not in STAGING_TASKS:
+            raise SystemExit(f"Unknown task '{name}'. Choose from: {', '.join(names)}")
+    if only:
+        return [n for n in names if n in only]
+    if start_from:
+        return names[names.index(start_from):]
+    return names
+
+
+def _task_status(conn, name):
+    row = conn.execute("""
+        SELECT status FROM staging_etl_log
+        WHERE table_name = ? ORDER BY log_id DESC LIMIT 1
+    """, (f"staging_{name}",)).fetchone()
+    return row[0] if row else None
+
+
+def _run_task(name, mode, retire_missing):
+    """Run one loader on its own connection; returns its logged status."""
+    loader = STAGING_TASKS[name][0]
+    conn = get_connection(mode)
+    try:
+        loader(conn, mode, retire_missing)
+        return _task_status(conn, name)
+    finally:
+        conn.close()
+
+
+def run_staging_loads(tasks, mode='FULL', retire_missing=False, workers=4):
+    """
+    Run the selected loaders, starting each one as soon as its upstream tasks
+    have finished, with at most `workers` running at once. Dependencies that
+    are not selected count as satisfied; dependents of a failed task are skipped.
+
+    Returns a dict of task name -> status (SUCCESS / FAILED / SKIPPED).
+    """
+    pending = list(tasks)
+    results = {}
+    running = {}
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        while pending or running:
+            for name in list(pending):
+                deps = [d for d in STAGING_TASKS[name][1] if d in tasks]
+                if any(results.get(d) not in (None, 'SUCCESS') for d in deps):
+                    pending.remove(name)
+                    results[name] = 'SKIPPED'
+                    print(f"  {name}: SKIPPED (upstream failed)")
+                elif all(d in results for d in deps) and len(running) < workers:
+                    pending.remove(name)
+                    running[pool.submit(_run_task, name, mode, retire_missing)] = name
+
+            if not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                try:
+                    results[name] = future.result() or 'FAILED'
+                except Exception as e:
+                    results[name] = 'FAILED'
+                    print(f"  {name}: FAILED - {e}")
+
+    return results
 
 
 def main():
+    parser = argparse.ArgumentParser(description="ETL: Landing to Staging")
+    parser.add_argument("--mode", choices=["full", "incremental"], default="full",
+                        help="full: reload every table; incremental: apply only changed rows")
+    parser.add_argument("--retire-missing", action="store_true",
+                        help="incremental mode: delete staging rows no longer present in landing")
+    parser.add_argument("--workers", type=int, default=4,
+                        help="number of loaders to run concurrently (1 = sequential)")
+    parser.add_argument("--only", type=lambda v: v.split(','), default=None,
+                        help="comma-separated tasks to run, e.g. vehicles,contracts")
+    parser.add_argument("--from", dest="start_from", default=None,
+                        help="rerun this task and every task declared after it")
+    parser.add_argument("--report-dir", default=REPORT_DIR,
+                        help="where the JSON run profile is written and compared with the previous run")
+    args = parser.parse_args()
+    mode = args.mode.upper()
+    tasks = select_tasks(args.only, args.start_from)
+
+    global PROFILER
+    PROFILER = EtlProfiler("landing_to_staging")
+
     print("=" * 60)
     print("ETL: Landing to Staging")
     print("=" * 60)
     print(f"Database: {DB_PATH}")
+    print(f"Mode: {mode}, workers: {args.workers}")
     print(f"Started: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print()
 
+    # WAL (set by the bulk-load profile) lets loaders read landing while
+    # another one holds the write lock
     conn = get_connection()
 
     # Create staging schema
@@ -1331,25 +1632,9 @@ def main():
     print()
 
     # Load tables
-    print("Loading staging tables...")
-    load_customers(conn)
-    load_drivers(conn)
-    load_automobiles(conn)
-    load_vehicles(conn)
-    load_contracts(conn)
-    load_orders(conn)
-    load_billing(conn)
-    load_groups(conn)
-    load_odometer_history(conn)
-    load_damages(conn)
-    load_domain_translations(conn)
-    load_exploitation_services(conn)
-    load_maintenance_approvals(conn)
-    load_passed_invoices(conn)
-    load_replacement_cars(conn)
-    load_reporting_periods(conn)
-    load_suppliers(conn)
-    load_car_reports(conn)
+    print(f"Loading staging tables ({len(tasks)} of {len(STAGING_TASKS)})...")
+    run_started = conn.execute("SELECT datetime('now')").fetchone()[0]
+    run_staging_loads(tasks, mode, args.retire_missing, args.workers)
 
     # Summary
     print()
@@ -1359,19 +1644,38 @@ def main():
 
     cursor = conn.cursor()
     cursor.execute("""
-        SELECT table_name, source_rows, inserted_rows, status
+        SELECT table_name, inserted_rows, updated_rows, unchanged_rows, retired_rows,
+               duration_ms, status
         FROM staging_etl_log
-        WHERE load_start >= datetime('now', '-1 hour')
+        WHERE load_start >= ?
         ORDER BY log_id
-    """)
+    """, (run_started,))
 
-    total_rows = 0
+    totals = [0, 0, 0, 0]
+    print(f"  {'table':<32} {'inserted':>10} {'updated':>10} {'unchanged':>10} {'retired':>10} {'ms':>9}")
     for row in cursor.fetchall():
-        status_icon = "OK" if row[3] == 'SUCCESS' else "FAILED"
-        print(f"  {row[0]}: {row[2]:,} rows [{status_icon}]")
-        total_rows += row[2] or 0
+        status_icon = "OK" if row[6] == 'SUCCESS' else "FAILED"
+        values = [v or 0 for v in row[1:5]]
+        print(f"  {row[0]:<32} " + " ".join(f"{v:>10,}" for v in values)
+              + f" {row[5] or 0:>9,.0f} [{status_icon}]")
+        totals = [t + v for t, v in zip(totals, values)]
 
-    print(f"\nTotal rows loaded: {total_rows:,}")
+    print(f"\nTotal rows inserted: {totals[0]:,}, updated: {totals[1]:,}, "
+          f"unchanged: {totals[2]:,}, retired: {totals[3]:,}")
+
+    print()
+    print("Checking code lookups...")
+    report_unmatched_codes(conn)
+
+    print()
+    print("Profile (slowest first):")
+    report_path, comparison = PROFILER.write_report(args.report_dir)
+    PROFILER.print_summary(comparison)
+    print(f"  Report: {report_path}")
+
+    print()
+    print("Updating planner statistics...")
+    finish_bulk_load(conn)
     print(f"Completed: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
 
     conn.close()
@@ -0,0 +1,308 @@
+"""
+ETL Run Profiler
+Per-step wall time, row throughput, statement timings, SQLite query plans,
+temp B-tree usage and database growth for the ETL scripts. Each run is
+written as a JSON report and compared against the previous report of the
+same run name, so regressions in the nightly window stand out.
+
+Used by etl_landing_to_staging.py, etl_staging_to_semantic.py (SQLite) and
+load_data_pyodbc.py (SQL Server).
+"""
+
+import glob
+import json
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+# A step is flagged when it is this much slower than last run...
+REGRESSION_RATIO = 1.25
+# ...and the difference is more than this (ignores noise on tiny steps)
+REGRESSION_MIN_MS = 500
+
+# Slowest statements per step kept in the report (with their query plans)
+TOP_STATEMENTS = 5
+
+_QUERY_STATEMENT = re.compile(r"^\s*(INSERT|REPLACE|UPDATE|DELETE|SELECT|WITH)\b", re.I)
+_QUERY_PART = re.compile(r"\b(SELECT|WITH)\b", re.I)
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _query_part(sql):
+    """
+    The part of a statement whose plan matters. For INSERT ... SELECT the
+    target may be a shadow table that no longer exists by the time the plan
+    is taken, so only the SELECT is explained.
+    """
+    if re.match(r"^\s*(INSERT|REPLACE)\b", sql, re.I):
+        match = _QUERY_PART.search(sql)
+        return sql[match.start():] if match else None
+    return sql
+
+
+class _Step:
+    """Measurements for one ETL step (one table load or transform)."""
+
+    def __init__(self, name, conn, dialect):
+        self.name = name
+        self.conn = conn
+        self.dialect = dialect
+        self.rows = None
+        self.status = 'SUCCESS'
+        self.statements = []
+        self._last = None
+        self.started = time.perf_counter()
+        self.changes_before = getattr(conn, 'total_changes', 0)
+        self.size_before = database_bytes(conn, dialect)
+        self.temp_before = temp_bytes(conn, dialect)
+        if dialect == 'sqlite':
+            conn.set_trace_callback(self._trace)
+
+    def _trace(self, sql):
+        now = time.perf_counter()
+        self._close_statement(now)
+        if _QUERY_STATEMENT.match(sql) and not re.search(r"\bVALUES\s*\(", sql, re.I):
+            self._last = [sql, now]
+
+    def _close_statement(self, now):
+        if self._last is not None:
+            sql, started = self._last
+            self.statements.append((sql, (now - started) * 1000))
+            self._last = None
+
+    def finish(self):
+        ended = time.perf_counter()
+        if self.dialect == 'sqlite':
+            self.conn.set_trace_callback(None)
+            self._close_statement(ended)
+
+        wall_ms = (ended - self.started) * 1000
+        rows = self.rows
+        if rows is None:
+            rows = getattr(self.conn, 'total_changes', 0) - self.changes_before
+        size_after = database_bytes(self.conn, self.dialect)
+        temp_after = temp_bytes(self.conn, self.dialect)
+
+        statements = []
+        for sql, ms in sorted(self.statements, key=lambda s: s[1], reverse=True)[:TOP_STATEMENTS]:
+            plan = explain_query_plan(self.conn, sql) if self.dialect == 'sqlite' else None
+            statements.append({
+                'sql': _WHITESPACE.sub(' ', sql).strip()[:300],
+                'ms': round(ms, 1),
+                'plan': plan,
+            })
+        plans = [s['plan'] for s in statements if s['plan']]
+
+        return {
+            'name': self.name,
+            'status': self.status,
+            'wall_ms': round(wall_ms, 1),
+            'rows': rows,
+            'rows_per_sec': round(rows / (wall_ms / 1000), 1) if wall_ms > 0 else None,
+            'statement_count': len(self.statements),
+            'statements': statements,
+            # Sorts / GROUP BY / DISTINCT that go through temp storage (on disk
+            # unless temp_store=MEMORY), and indexes SQLite had to build on the fly
+            'temp_btrees': sum(line.count('USE TEMP B-TREE') for plan in plans for line in plan),
+            'automatic_indexes': sum('AUTOMATIC' in line for plan in plans for line in plan),
+            'temp_bytes': (temp_after - self.temp_before
+                           if temp_after is not None and self.temp_before is not None else None),
+            'db_bytes_before': self.size_before,
+            'db_bytes_after': size_after,
+            'db_growth_bytes': (size_after - self.size_before
+                                if size_after is not None and self.size_before is not None else None),
+        }
+
+
+def database_bytes(conn, dialect='sqlite'):
+    """Allocated size of the database (SQLite pages, or SQL Server data + log files)."""
+    try:
+        if dialect == 'sqlite':
+            page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+            page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+            return page_count * page_size
+        cursor = conn.cursor()
+        cursor.execute("SELECT SUM(CAST(size AS BIGINT)) * 8192 FROM sys.database_files")
+        return cursor.fetchone()[0]
+    except Exception:
+        return None
+
+
+def temp_bytes(conn, dialect='sqlite'):
+    """
+    tempdb space allocated by this session on SQL Server (sorts and hashes
+    that spilled). SQLite exposes no such counter; see temp_btrees instead.
+    """
+    if dialect == 'sqlite':
+        return None
+    try:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT (user_objects_alloc_page_count + internal_objects_alloc_page_count) * 8192
+            FROM sys.dm_db_session_space_usage
+            WHERE session_id = @@SPID
+        """)
+        return cursor.fetchone()[0]
+    except Exception:
+        return None
+
+
+def explain_query_plan(conn, sql):
+    """SQLite EXPLAIN QUERY PLAN lines for a statement, or None if it cannot be planned now."""
+    query = _query_part(sql)
+    if not query:
+        return None
+    try:
+        return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {query}")]
+    except Exception:
+        return None
+
+
+class EtlProfiler:
+    """
+    Collects step measurements for one ETL run. Steps may run concurrently
+    on separate connections; database growth is then shared between the
+    steps that overlapped.
+    """
+
+    def __init__(self, run_name, dialect='sqlite'):
+        self.run_name = run_name
+        self.dialect = dialect
+        self.started_at = datetime.now()
+        self._started = time.perf_counter()
+        self._open = {}
+        self._steps = []
+        self._lock = threading.Lock()
+
+    def begin(self, name, conn):
+        step = _Step(name, conn, self.dialect)
+        with self._lock:
+            self._open[name] = step
+
+    def end(self, name, rows=None, status='SUCCESS'):
+        with self._lock:
+            step = self._open.pop(name, None)
+        if step is None:
+            return
+        step.rows = rows
+        step.status = status
+        result = step.finish()
+        with self._lock:
+            self._steps.append(result)
+
+    @contextmanager
+    def step(self, name, conn):
+        """
+        Profile the block as one step. The block may set `rows` (defaults to
+        the connection's change count) and `status` on the yielded step.
+        """
+        self.begin(name, conn)
+        step = self._open[name]
+        try:
+            yield step
+        except Exception:
+            step.status = 'FAILED'
+            raise
+        finally:
+            self.end(name, step.rows, step.status)
+
+    def report(self):
+        steps = sorted(self._steps, key=lambda s: s['wall_ms'], reverse=True)
+        return {
+            'run': self.run_name,
+            'dialect': self.dialect,
+            'started_at': self.started_at.isoformat(timespec='seconds'),
+            'finished_at': datetime.now().isoformat(timespec='seconds'),
+            'wall_ms': round((time.perf_counter() - self._started) * 1000, 1),
+            'rows': sum(s['rows'] or 0 for s in steps),
+            'db_growth_bytes': sum(s['db_growth_bytes'] or 0 for s in steps),
+            'steps': steps,
+        }
+
+    def write_report(self, report_dir):
+        """
+        Write this run's JSON report next to earlier ones and compare it with
+        the most recent of them. Returns (report path, comparison).
+        """
+        os.makedirs(report_dir, exist_ok=True)
+        previous_path = latest_report(report_dir, self.run_name)
+        previous = None
+        if previous_path:
+            with open(previous_path, 'r', encoding='utf-8') as f:
+                previous = json.load(f)
+
+        report = self.report()
+        report['comparison'] = compare_reports(previous, report)
+        report['previous_report'] = os.path.basename(previous_path) if previous_path else None
+
+        path = os.path.join(report_dir, f"{self.run_name}_{self.started_at:%Y%m%d_%H%M%S}.json")
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        return path, report['comparison']
+
+    def print_summary(self, comparison=None):
+        report = self.report()
+        print(f"  {'step':<40} {'ms':>10} {'rows':>10} {'rows/s':>10} {'growth KB':>10} {'tmp':>4}")
+        for step in report['steps']:
+            growth = (step['db_growth_bytes'] or 0) / 1024
+            print(f"  {step['name']:<40} {step['wall_ms']:>10,.0f} {step['rows'] or 0:>10,} "
+                  f"{step['rows_per_sec'] or 0:>10,.0f} {growth:>10,.0f} {step['temp_btrees']:>4}")
+        if comparison and comparison['regressions']:
+            print()
+            print(f"  REGRESSIONS vs {comparison['previous_started_at']}:")
+            for item in comparison['regressions']:
+                print(f"    {item['name']}: {item['previous_ms']:,.0f} ms -> {item['current_ms']:,.0f} ms "
+                      f"(x{item['ratio'] or '-'})" + (" [plan changed]" if item['plan_changed'] else ""))
+
+
+def latest_report(report_dir, run_name):
+    paths = sorted(glob.glob(os.path.join(report_dir, f"{run_name}_*.json")))
+    return paths[-1] if paths else None
+
+
+def _plan_changed(old, new):
+    """True when a statement present in both steps got a different plan."""
+    old_plans = {s['sql']: s['plan'] for s in old['statements']}
+    return any(s['sql'] in old_plans and old_plans[s['sql']] != s['plan'] for s in new['statements'])
+
+
+def compare_reports(previous, current):
+    """
+    Per-step wall time / row deltas between two reports. A step is flagged
+    as a regression when it is REGRESSION_RATIO and REGRESSION_MIN_MS
+    slower, or when one of its statements got a different query plan.
+    """
+    if not previous:
+        return None
+    before = {s['name']: s for s in previous['steps']}
+    steps = []
+    regressions = []
+    for step in current['steps']:
+        old = before.get(step['name'])
+        if old is None:
+            continue
+        item = {
+            'name': step['name'],
+            'previous_ms': old['wall_ms'],
+            'current_ms': step['wall_ms'],
+            'ratio': round(step['wall_ms'] / old['wall_ms'], 2) if old['wall_ms'] else None,
+            'previous_rows': old['rows'],
+            'current_rows': step['rows'],
+            'plan_changed': _plan_changed(old, step),
+        }
+        steps.append(item)
+        slower = (step['wall_ms'] > old['wall_ms'] * REGRESSION_RATIO
+                  and step['wall_ms'] - old['wall_ms'] > REGRESSION_MIN_MS)
+        if slower or item['plan_changed']:
+            regressions.append(item)
+
+    return {
+        'previous_started_at': previous['started_at'],
+        'previous_wall_ms': previous['wall_ms'],
+        'current_wall_ms': current['wall_ms'],
+        'steps': steps,
+        'regressions': regressions,
+    }
@@ -3,20 +3,95 @@ ETL Script: Staging to Semantic Layer
 Loads AI-ready semantic layer with metadata catalog
 """
 
+import os
+import re
+import json
+import time
+import hashlib
 import sqlite3
-from datetime import datetime, timedelta
+import argparse
+from datetime import datetime
+
+from date_dimension import ensure_date_dimension
+from etl_profiler import EtlProfiler
+from reference_lookups import create_reference_tables, report_unmatched_codes
+from sqlite_bulk_load import connect_for_bulk_load, finish_bulk_load
 
 DB_PATH = r"C:\Users\X1Carbon\Documents\Projects\FleetAI\database\fleetai.db"
 SCHEMA_FILE = r"C:\Users\X1Carbon\Documents\Projects\FleetAI\database\schemas\03_semantic_layer_sqlite.sql"
+REPORT_DIR = os.path.join(os.path.dirname(DB_PATH), "etl_reports")
+
+
+# Rebuilt tables are loaded into "<table>__new" and swapped in when complete
+SHADOW_SUFFIX = "__new"
+
 
+def get_connection(bulk_load=False):
+    """
+    Connection to the semantic database. The full rebuild uses the bulk-load
+    profile (synchronous=OFF until finish_bulk_load); small in-place updates
+    such as --refresh-time-fields keep the database's normal durability.
+    """
+    if bulk_load:
+        # WAL (part of the bulk-load profile) lets the API keep reading the
+        # previous version during a swap
+        conn = connect_for_bulk_load(DB_PATH, synchronous='OFF')
+    else:
+        conn = sqlite3.connect(DB_PATH, timeout=5.0)
+    conn.create_aggregate("etl_checksum", -1, RowChecksum)
+    return conn
 
-def get_connection():
-    return sqlite3.connect(DB_PATH)
+
+def create_shadow_table(conn, table):
+    """Create an empty, index-free copy of `table` to bulk-load into."""
+    cursor = conn.cursor()
+    shadow = table + SHADOW_SUFFIX
+    ddl = cursor.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+    ).fetchone()[0]
+    cursor.execute(f"DROP TABLE IF EXISTS {shadow}")
+    cursor.execute(re.sub(r'^CREATE TABLE (IF NOT EXISTS )?("\w+"|\w+)', f"CREATE TABLE {shadow}", ddl, count=1))
+    conn.commit()
+    return shadow
+
+
+def swap_in_table(conn, table):
+    """
+    Replace `table` with its loaded shadow in a single transaction and
+    rebuild its indexes on the new data. Readers see either the old or the
+    new table, never a partially loaded one. Returns the new row count.
+    """
+    cursor = conn.cursor()
+    shadow = table + SHADOW_SUFFIX
+    conn.commit()
+    ddl = [row[0] for row in cursor.execute("""
+        SELECT sql FROM sqlite_master
+        WHERE type IN ('index', 'trigger') AND tbl_name = ? AND sql IS NOT NULL
+        ORDER BY type
+    """, (table,))]
+
+    # Keep view definitions pointing at the table name rather than following the rename
+    cursor.execute("PRAGMA legacy_alter_table = ON")
+    try:
+        cursor.execute("BEGIN IMMEDIATE")
+        cursor.execute(f"DROP TABLE {table}")
+        cursor.execute(f"ALTER TABLE {shadow} RENAME TO {table}")
+        for sql in ddl:
+            cursor.execute(sql)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.execute("PRAGMA legacy_alter_table = OFF")
+
+    return cursor.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
 
 
 def create_semantic_schema(conn):
     """Create semantic layer tables."""
     print("Creating semantic layer schema...")
+    create_reference_tables(conn)
     with open(SCHEMA_FILE, 'r') as f:
         schema_sql = f.read()
     cursor = conn.cursor()
@@ -26,82 +101,43 @@ def create_semantic_schema(conn):
 
 
 def populate_date_dimension(conn):
-    """Populate date dimension with 10 years of dates."""
+    """Add any dates missing from the date dimension (existing rows are kept)."""
     print("  Populating date dimension...", end=" ", flush=True)
-    cursor = conn.cursor()
-
-    cursor.execute("DELETE FROM dim_date")
-
-    start_date = datetime(2020, 1, 1)
-    end_date = datetime(2030, 12, 31)
-    current = start_date
-
-    dates = []
-    while current <= end_date:
-        date_key = int(current.strftime('%Y%m%d'))
-        dates.append((
-            date_key,
-            current.strftime('%Y-%m-%d'),
-            current.weekday() + 1,
-            current.strftime('%A'),
-            current.day,
-            current.timetuple().tm_yday,
-            current.isocalendar()[1],
-            current.month,
-            current.strftime('%B'),
-            (current.month - 1) // 3 + 1,
-            f"Q{(current.month - 1) // 3 + 1}",
-            current.year,
-            1 if current.weekday() >= 5 else 0,
-            0 if current.weekday() >= 5 else 1
-        ))
-        current += timedelta(days=1)
-
-    cursor.executemany("""
-        INSERT INTO dim_date (date_key, full_date, day_of_week, day_name,
-            day_of_month, day_of_year, week_of_year, month_number, month_name,
-            quarter_number, quarter_name, year_number, is_weekend, is_business_day)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    """, dates)
-    conn.commit()
-    print(f"{len(dates)} dates")
+    added = ensure_date_dimension(conn)
+    total = conn.execute("SELECT COUNT(*) FROM dim_date").fetchone()[0]
+    print(f"{added} dates added ({total} total)")
 
 
 def load_dim_customer(conn):
     """Load customer dimension."""
     print("  Loading dim_customer...", end=" ", flush=True)
     cursor = conn.cursor()
-    cursor.execute("DELETE FROM dim_customer")
+    create_shadow_table(conn, 'dim_customer')
 
     cursor.execute("""
-        INSERT INTO dim_customer (
+        INSERT INTO dim_customer__new (
             customer_id, customer_name, customer_name_line_2, customer_name_line_3,
             short_name, address, city, country_code, country_name,
             phone_number, fax_number, account_manager_name, is_active
         )
         SELECT
-            customer_id,
-            customer_name,
-            customer_name_2,
-            customer_name_3,
-            call_name,
-            address,
-            city,
-            country_code,
-            CASE country_code
-                WHEN 'AE' THEN 'United Arab Emirates'
-                WHEN 'NO' THEN 'Norway'
-                WHEN 'US' THEN 'United States'
-                ELSE country
-            END,
-            phone,
-            fax,
-            account_manager,
+            c.customer_id,
+            c.customer_name,
+            c.customer_name_2,
+            c.customer_name_3,
+            c.call_name,
+            c.address,
+            c.city,
+            c.country_code,
+            COALESCE(rc.country_name, c.country),
+            c.phone,
+            c.fax,
+            c.account_manager,
             1
-        FROM staging_customers
+        FROM staging_customers c
+        LEFT JOIN ref_country rc ON rc.country_code = c.country_code
     """)
-    conn.commit()
-    count = cursor.execute("SELECT COUNT(*) FROM dim_customer").fetchone()[0]
+    count = swap_in_table(conn, 'dim_customer')
     print(f"{count} rows")
 
 
@@ -109,10 +145,10 @@ def load_dim_vehicle(conn):
     """Load vehicle dimension with enriched data."""
     print("  Loading dim_vehicle...", end=" ", flush=True)
     cursor = conn.cursor()
-    cursor.execute("DELETE FROM dim_vehicle")
+    create_shadow_table(conn, 'dim_vehicle')
 
     cursor.execute("""
-        INSERT INTO dim_vehicle (
+        INSERT INTO dim_vehicle__new (
             vehicle_id, vin_number, registration_number, make_name, model_name,
             make_and_model, color_name,
             fuel_code, fuel_type, is_electric,
@@ -139,12 +175,7 @@ def load_dim_vehicle(conn):
             c.customer_name,
             v.contract_position_no,
             v.lease_type,
-            CASE v.lease_type
-                WHEN 'O' THEN 'Operational Lease'
-                WHEN 'F' THEN 'Financial Lease'
-                WHEN 'L' THEN 'Lease'
-                ELSE v.lease_type
-            END,
+            COALESCE(lt.lease_type_description, v.lease_type),
             v.purchase_price,
             v.residual_value,
             v.lease_amount,
@@ -158,24 +189,15 @@ def load_dim_vehicle(conn):
             CAST((julianday(v.expected_end_date) - julianday('now')) / 30.44 AS INTEGER),
             CAST(julianday(v.expected_end_date) - julianday('now') AS INTEGER),
             v.object_status,
-            CASE v.object_status
-                WHEN 0 THEN 'Created'
-                WHEN 1 THEN 'Active'
-                WHEN 2 THEN 'Terminated - Invoicing Stopped'
-                WHEN 3 THEN 'Terminated - Invoice Adjustment Made'
-                WHEN 4 THEN 'Terminated - Mileage Adjustment Made'
-                WHEN 5 THEN 'Terminated - De-investment Made'
-                WHEN 8 THEN 'Terminated - Ready for Settlement'
-                WHEN 9 THEN 'Terminated - Final Settlement Made'
-                ELSE 'Unknown'
-            END,
-            CASE WHEN v.object_status IN (0, 1) THEN 1 ELSE 0 END
+            COALESCE(vs.status_name, 'Unknown'),
+            COALESCE(vs.is_active_status, 0)
         FROM staging_vehicles v
         LEFT JOIN staging_customers c ON v.customer_no = c.customer_id
         LEFT JOIN ref_fuel_code fc ON v.fuel_code = fc.fuel_code
+        LEFT JOIN ref_lease_type lt ON v.lease_type = lt.lease_type
+        LEFT JOIN ref_vehicle_status vs ON v.object_status = vs.status_code
     """)
-    conn.commit()
-    count = cursor.execute("SELECT COUNT(*) FROM dim_vehicle").fetchone()[0]
+    count = swap_in_table(conn, 'dim_vehicle')
     print(f"{count} rows")
 
 
@@ -183,10 +205,10 @@ def load_dim_driver(conn):
     """Load driver dimension."""
     print("  Loading dim_driver...", end=" ", flush=True)
     cursor = conn.cursor()
-    cursor.execute("DELETE FROM dim_driver")
+    create_shadow_table(conn, 'dim_driver')
 
     cursor.execute("""
-        INSERT INTO dim_driver (
+        INSERT INTO dim_driver__new (
             vehicle_id, driver_sequence, driver_name, first_name, last_name,
             email_address, phone_private, phone_office, phone_mobile,
             address, city, country_code, is_primary_driver, is_active
@@ -208,8 +230,7 @@ def load_dim_driver(conn):
             CASE WHEN active_driver = '*' THEN 1 ELSE 0 END
         FROM staging_drivers
     """)
-    conn.commit()
-    count = cursor.execute("SELECT COUNT(*) FROM dim_driver").fetchone()[0]
+    count = swap_in_table(conn, 'dim_driver')
     print(f"{count} rows")
 
 
@@ -217,10 +238,10 @@ def load_dim_contract(conn):
     """Load contract dimension."""
     print("  Loading dim_contract...", end=" ", flush=True)
     cursor = conn.cursor()
-    cursor.execute("DELETE FROM dim_contract")
+    create_shadow_table(conn, 'dim_contract')
 
     cursor.execute("""
-        INSERT INTO dim_contract (
+        INSERT INTO dim_contract__new (
             contract_position_number, customer_id, customer_name, contract_number,
             make_name, model_name, lease_type, lease_type_description,
             contract_duration_months, contract_start_date, contract_end_date,
@@ -241,12 +262,7 @@ def load_dim_contract(conn):
             a.make_name,
             a.model_name,
             ct.lease_type,
-            CASE ct.lease_type
-                WHEN 'O' THEN 'Operational Lease'
-                WHEN 'F' THEN 'Financial Lease'
-                WHEN 'L' THEN 'Lease'
-                ELSE ct.lease_type
-            END,
+            COALESCE(lt.lease_type_description, ct.lease_type),
             ct.duration_months,
             ct.start_date,
             ct.end_date,
@@ -280,20 +296,62 @@ def load_dim_contract(conn):
             FROM staging_automobiles
             GROUP BY make_code, model_code
         ) a ON ct.make_code = a.make_code AND ct.model_code = a.model_code
+        LEFT JOIN ref_lease_type lt ON ct.lease_type = lt.lease_type
     """)
-    conn.commit()
-    count = cursor.execute("SELECT COUNT(*) FROM dim_contract").fetchone()[0]
+    count = swap_in_table(conn, 'dim_contract')
     print(f"{count} rows")
 
 
+# Columns measured against today. They are written by the dimension loads and
+# kept current between ETL runs by refresh_time_relative_fields().
+TIME_RELATIVE_FIELDS = {
+    'dim_vehicle': ('lease_start_date', 'expected_end_date'),
+    'dim_contract': ('contract_start_date', 'contract_end_date'),
+}
+
+
+def refresh_time_relative_fields(conn):
+    """
+    Recompute months_driven, months_remaining and days_to_contract_end in
+    place for every row, ended contracts included (the API returns and sorts
+    by the values themselves). Only rows whose values have moved since the
+    last refresh are written, so reruns within the same day are close to free.
+
+    Scheduled hourly outside the full ETL, e.g. with Windows Task Scheduler:
+        schtasks /Create /SC HOURLY /TN "FleetAI time fields" /TR
+            "python <repo>\\database\\scripts\\etl_staging_to_semantic.py --refresh-time-fields"
+    or cron:
+        5 * * * *  cd <repo>/database/scripts && python etl_staging_to_semantic.py --refresh-time-fields
+    """
+    cursor = conn.cursor()
+    total = 0
+    for table, (start_col, end_col) in TIME_RELATIVE_FIELDS.items():
+        months_driven = f"CAST((julianday('now') - julianday({start_col})) / 30.44 AS INTEGER)"
+        months_remaining = f"CAST((julianday({end_col}) - julianday('now')) / 30.44 AS INTEGER)"
+        days_to_end = f"CAST(julianday({end_col}) - julianday('now') AS INTEGER)"
+        cursor.execute(f"""
+            UPDATE {table}
+            SET months_driven = {months_driven},
+                months_remaining = {months_remaining},
+                days_to_contract_end = {days_to_end}
+            WHERE days_to_contract_end IS NOT {days_to_end}
+               OR months_driven IS NOT {months_driven}
+               OR months_remaining IS NOT {months_remaining}
+        """)
+        print(f"  {table}: {cursor.rowcount} rows refreshed")
+        total += cursor.rowcount
+    conn.commit()
+    return total
+
+
 def load_dim_group(conn):
     """Load group dimension."""
     print("  Loading dim_group...", end=" ", flush=True)
     cursor = conn.cursor()
-    cursor.execute("DELETE FROM dim_group")
+    create_shadow_table(conn, 'dim_group')
 
     cursor.execute("""
-        INSERT INTO dim_group (group_id, group_name, customer_id, is_active)
+        INSERT INTO dim_group__new (group_id, group_name, customer_id, is_active)
         SELECT
             g.group_no,
             g.group_name,
@@ -304,14 +362,13 @@ def load_dim_group(conn):
 
     # Update customer names
     cursor.execute("""
-        UPDATE dim_group
+        UPDATE dim_group__new
         SET customer_name = (
             SELECT customer_name FROM dim_customer
-            WHERE dim_customer.customer_id = dim_group.customer_id
+            WHERE dim_customer.customer_id = dim_group__new.customer_id
         )
     """)
-    conn.commit()
-    count = cursor.execute("SELECT COUNT(*) FROM dim_group").fetchone()[0]
+    count = swap_in_table(conn, 'dim_group')
     print(f"{count} rows")
 
 
@@ -319,10 +376,10 @@ def load_dim_make_model(conn):
     """Load make/model reference."""
     print("  Loading dim_make_model...", end=" ", flush=True)
     cursor = conn.cursor()
-    cursor.execute("DELETE FROM dim_make_model")
+    create_shadow_table(conn, 'dim_make_model')
 
     cursor.execute("""
-        INSERT INTO dim_make_model (
+        INSERT INTO dim_make_model__new (
             make_code, make_name, model_code, model_name, model_group, vehicle_type, is_active
         )
         SELECT
@@ -336,8 +393,7 @@ def load_dim_make_model(conn):
         FROM staging_automobiles
         GROUP BY make_code, model_code
     """)
-    conn.commit()
-    count = cursor.execute("SELECT COUNT(*) FROM dim_make_model").fetchone()[0]
+    count = swap_in_table(conn, 'dim_make_model')
     print(f"{count} rows")
 
 
@@ -345,32 +401,27 @@ def load_fact_odometer(conn):
     """Load odometer fact table."""
     print("  Loading fact_odometer_reading...", end=" ", flush=True)
     cursor = conn.cursor()
-    cursor.execute("DELETE FROM fact_odometer_reading")
+    create_shadow_table(conn, 'fact_odometer_reading')
 
     cursor.execute("""
-        INSERT INTO fact_odometer_reading (
+        INSERT INTO fact_odometer_reading__new (
             vehicle_id, reading_date, reading_date_key, odometer_km,
             transaction_amount, transaction_description, source_type, supplier_id
         )
         SELECT
-            object_no,
-            reading_date,
-            CAST(REPLACE(reading_date, '-', '') AS INTEGER),
-            odometer_km,
-            amount,
-            description,
-            CASE source_code
-                WHEN 1 THEN 'Manual Entry'
-                WHEN 2 THEN 'Fuel Transaction'
-                WHEN 3 THEN 'Service'
-                ELSE 'Other'
-            END,
-            supplier_no
-        FROM staging_odometer_history
-        WHERE reading_date IS NOT NULL
+            o.object_no,
+            o.reading_date,
+            CAST(REPLACE(o.reading_date, '-', '') AS INTEGER),
+            o.odometer_km,
+            o.amount,
+            o.description,
+            COALESCE(os.source_description, 'Other'),
+            o.supplier_no
+        FROM staging_odometer_history o
+        LEFT JOIN ref_odometer_source os ON o.source_code = os.source_code
+        WHERE o.reading_date IS NOT NULL
     """)
-    conn.commit()
-    count = cursor.execute("SELECT COUNT(*) FROM fact_odometer_reading").fetchone()[0]
+    count = swap_in_table(conn, 'fact_odometer_reading')
     print(f"{count} rows")
 
 
@@ -378,10 +429,10 @@ def load_fact_billing(conn):
     """Load billing fact table."""
     print("  Loading fact_billing...", end=" ", flush=True)
     cursor = conn.cursor()
-    cursor.execute("DELETE FROM fact_billing")
+    create_shadow_table(conn, 'fact_billing')
 
     cursor.execute("""
-        INSERT INTO fact_billing (
+        INSERT INTO fact_billing__new (
             billing_id, vehicle_id, customer_id, billing_run_number,
             billing_owner_name, billing_recipient_name, billing_address,
             billing_city, billing_method, fixed_amount, variable_amount,
@@ -405,8 +456,7 @@ def load_fact_billing(conn):
         FROM staging_billing b
         LEFT JOIN staging_vehicles v ON b.object_no = v.object_no
     """)
-    conn.commit()
-    count = cursor.execute("SELECT COUNT(*) FROM fact_billing").fetchone()[0]
+    count = swap_in_table(conn, 'fact_billing')
     print(f"{count} rows")
 
 
@@ -414,10 +464,10 @@ def load_fact_damages(conn):
     """Load damages fact table."""
     print("  Loading fact_damages...", end=" ", flush=True)
     cursor = conn.cursor()
-    cursor.execute("DELETE FROM fact_damages")
+    create_shadow_table(conn, 'fact_damages')
 
     cursor.execute("""
-        INSERT INTO fact_damages (
+        INSERT INTO fact_damages__new (
             damage_id, vehicle_id, driver_number, damage_date,
             description, damage_amount, net_damage_cost,
             accident_location, accident_country_code,
@@ -462,8 +512,7 @@ def load_fact_damages(conn):
             d.garage_name
         FROM staging_damages d
     """)
-    conn.commit()
-    count = cursor.execute("SELECT COUNT(*) FROM fact_damages").fetchone()[0]
+    count = swap_in_table(conn, 'fact_damages')
     print(f"{count} rows")
 
 
@@ -471,9 +520,9 @@ def load_dim_supplier(conn):
     """Load supplier dimension."""
     print("  Loading dim_supplier...", end=" ", flush=True)
     cursor = conn.cursor()
-    cursor.execute("DELETE FROM dim_supplier")
+    create_shadow_table(conn, 'dim_supplier')
     cursor.execute("""
-        INSERT INTO dim_supplier (
+        INSERT INTO dim_supplier__new (
             supplier_no, branch_no, supplier_name, name_line_2, name_line_3,
             full_name, class, country_code, address, city, category,
             phone, fax, email, contact_person, responsible_person, is_active
@@ -485,8 +534,7 @@ def load_dim_supplier(conn):
             phone, fax, email, contact_person, responsible_person, 1
         FROM staging_suppliers
     """)
-    conn.commit()
-    count = cursor.execute("SELECT COUNT(*) FROM dim_supplier").fetchone()[0]
+    count = swap_in_table(conn, 'dim_supplier')
     print(f"{count} rows")
 
 
@@ -494,14 +542,13 @@ def load_ref_domain_translation(conn):
     """Load domain translation reference."""
     print("  Loading ref_domain_translation...", end=" ", flush=True)
     cursor = conn.cursor()
-    cursor.execute("DELETE FROM ref_domain_translation")
+    create_shadow_table(conn, 'ref_domain_translation')
     cursor.execute("""
-        INSERT INTO ref_domain_translation (country_code, domain_id, domain_value, language_code, domain_text)
+        INSERT INTO ref_domain_translation__new (country_code, domain_id, domain_value, language_code, domain_text)
         SELECT country_code, domain_id, domain_value, language_code, domain_text
         FROM staging_domain_translations
     """)
-    conn.commit()
-    count = cursor.execute("SELECT COUNT(*) FROM ref_domain_translation").fetchone()[0]
+    count = swap_in_table(conn, 'ref_domain_translation')
     print(f"{count} rows")
 
 
@@ -509,9 +556,9 @@ def load_fact_maintenance_approvals(conn):
     """Load maintenance approvals fact table."""
     print("  Loading fact_maintenance_approvals...", end=" ", flush=True)
     cursor = conn.cursor()
-    cursor.execute("DELETE FROM fact_maintenance_approvals")
+    create_shadow_table(conn, 'fact_maintenance_approvals')
     cursor.execute("""
-        INSERT INTO fact_maintenance_approvals (
+        INSERT INTO fact_maintenance_approvals__new (
             vehicle_id, supplier_no, supplier_name, approval_date,
             mileage_km, amount, description, maintenance_type,
             major_code, minor_code, source_code, reporting_period, country_code
@@ -533,8 +580,7 @@ def load_fact_maintenance_approvals(conn):
         FROM staging_maintenance_approvals ma
         LEFT JOIN staging_suppliers s ON ma.supplier_no = s.supplier_no
     """)
-    conn.commit()
-    count = cursor.execute("SELECT COUNT(*) FROM fact_maintenance_approvals").fetchone()[0]
+    count = swap_in_table(conn, 'fact_maintenance_approvals')
     print(f"{count} rows")
 
 
@@ -542,9 +588,9 @@ def load_fact_exploitation_services(conn):
     """Load exploitation services fact table."""
     print("  Loading fact_exploitation_services...", end=" ", flush=True)
     cursor = conn.cursor()
-    cursor.execute("DELETE FROM fact_exploitation_services")
+    create_shadow_table(conn, 'fact_exploitation_services')
     cursor.execute("""
-        INSERT INTO fact_exploitation_services (
+        INSERT INTO fact_exploitation_services__new (
             vehicle_id, customer_no, service_sequence, service_code,
             service_cost_total, service_invoice, total_monthly_cost,
             total_monthly_invoice, reporting_period, country_code, currency_code
@@ -555,8 +601,7 @@ def load_fact_exploitation_services(conn):
             total_monthly_invoice, reporting_period, country_code, currency_code
         FROM staging_exploitation_services
     """)
-    conn.commit()
-    count = cursor.execute("SELECT COUNT(*) FROM fact_exploitation_services").fetchone()[0]
+    count = swap_in_table(conn, 'fact_exploitation_services')
     print(f"{count} rows")
 
 
@@ -564,9 +609,9 @@ def load_fact_passed_invoices(conn):
     """Load passed invoices fact table."""
     print("  Loading fact_passed_invoices...", end=" ", flush=True)
     cursor = conn.cursor()
-    cursor.execute("DELETE FROM fact_passed_invoices")
+    create_shadow_table(conn, 'fact_passed_invoices')
     cursor.execute("""
-        INSERT INTO fact_passed_invoices (
+        INSERT INTO fact_passed_invoices__new (
             vehicle_id, customer_no, contract_no, amount, cost_code,
             description, gross_net, invoice_no, origin_code,
             source_code, vat_type, reporting_period, country_code
@@ -577,8 +622,7 @@ def load_fact_passed_invoices(conn):
             source_code, vat_type, reporting_period, country_code
         FROM staging_passed_invoices
     """)
-    conn.commit()
-    count = cursor.execute("SELECT COUNT(*) FROM fact_passed_invoices").fetchone()[0]
+    count = swap_in_table(conn, 'fact_passed_invoices')
     print(f"{count} rows")
 
 
@@ -586,9 +630,9 @@ def load_fact_replacement_cars(conn):
     """Load replacement cars fact table."""
     print("  Loading fact_replacement_cars...", end=" ", flush=True)
     cursor = conn.cursor()
-    cursor.execute("DELETE FROM fact_replacement_cars")
+    create_shadow_table(conn, 'fact_replacement_cars')
     cursor.execute("""
-        INSERT INTO fact_replacement_cars (
+        INSERT INTO fact_replacement_cars__new (
             vehicle_id, rc_no, driver_name, begin_date, end_date,
             rc_code, km, amount, reason, description, rc_type,
             reporting_period, country_code
@@ -600,8 +644,7 @@ def load_fact_replacement_cars(conn):
             type, reporting_period, country_code
         FROM staging_replacement_cars
     """)
-    conn.commit()
-    count = cursor.execute("SELECT COUNT(*) FROM fact_replacement_cars").fetchone()[0]
+    count = swap_in_table(conn, 'fact_replacement_cars')
     print(f"{count} rows")
 
 
@@ -609,9 +652,9 @@ def load_fact_car_reports(conn):
     """Load car reports fact table (monthly vehicle snapshot)."""
     print("  Loading fact_car_reports...", end=" ", flush=True)
     cursor = conn.cursor()
-    cursor.execute("DELETE FROM fact_car_reports")
+    create_shadow_table(conn, 'fact_car_reports')
     cursor.execute("""
-        INSERT INTO fact_car_reports (
+        INSERT INTO fact_car_reports__new (
             vehicle_id, reporting_period,
             -- Book Value & Depreciation
             book_value_begin_amount, book_value_begin_lt, current_book_value,
@@ -644,8 +687,7 @@ def load_fact_car_reports(conn):
             damage_count, total_surplus, country_code, currency_code
         FROM staging_car_reports
     """)
-    conn.commit()
-    count = cursor.execute("SELECT COUNT(*) FROM fact_car_reports").fetchone()[0]
+    count = swap_in_table(conn, 'fact_car_reports')
     print(f"{count} rows")
 
 
@@ -890,14 +932,12 @@ def populate_metadata_catalog(conn):
 
 
 def calculate_fleet_kpis(conn):
-    """Calculate and store fleet KPIs."""
+    """Store today's fleet KPI snapshot (one row per kpi_date; history is kept)."""
     print("  Calculating fleet KPIs...", end=" ", flush=True)
     cursor = conn.cursor()
 
-    cursor.execute("DELETE FROM agg_fleet_kpis")
-
     cursor.execute("""
-        INSERT INTO agg_fleet_kpis (
+        INSERT OR REPLACE INTO agg_fleet_kpis (
             kpi_date, total_customers, total_vehicles, active_vehicles,
             total_drivers, total_contracts, total_monthly_revenue,
             average_odometer_km, vehicles_by_fuel_type, top_makes
@@ -905,28 +945,107 @@ def calculate_fleet_kpis(conn):
         SELECT
             date('now'),
             (SELECT COUNT(*) FROM dim_customer),
-            (SELECT COUNT(*) FROM dim_vehicle),
-            (SELECT COUNT(*) FROM dim_vehicle WHERE is_active = 1),
+            v.total_vehicles,
+            v.active_vehicles,
             (SELECT COUNT(*) FROM dim_driver),
-            (SELECT COUNT(*) FROM dim_contract),
-            (SELECT SUM(monthly_rate_total) FROM dim_contract WHERE is_active = 1),
-            (SELECT AVG(current_odometer_km) FROM dim_vehicle WHERE current_odometer_km > 0),
+            ct.total_contracts,
+            ct.total_monthly_revenue,
+            v.average_odometer_km,
             (SELECT GROUP_CONCAT(fuel_type || ':' || cnt)
              FROM (SELECT fuel_type, COUNT(*) as cnt FROM dim_vehicle GROUP BY fuel_type ORDER BY cnt DESC LIMIT 5)),
             (SELECT GROUP_CONCAT(make_name || ':' || cnt)
              FROM (SELECT make_name, COUNT(*) as cnt FROM dim_vehicle GROUP BY make_name ORDER BY cnt DESC LIMIT 5))
+        FROM (
+            SELECT COUNT(*) AS total_vehicles,
+                   SUM(CASE WHEN is_active = 1 THEN 1 ELSE 0 END) AS active_vehicles,
+                   AVG(CASE WHEN current_odometer_km > 0 THEN current_odometer_km END) AS average_odometer_km
+            FROM dim_vehicle
+        ) v, (
+            SELECT COUNT(*) AS total_contracts,
+                   SUM(CASE WHEN is_active = 1 THEN monthly_rate_total END) AS total_monthly_revenue
+            FROM dim_contract
+        ) ct
     """)
     conn.commit()
     print("done")
 
 
-def calculate_customer_kpis(conn):
-    """Calculate and store customer KPIs."""
+def _customer_kpi_checksums(cursor):
+    """
+    Fill temp.kpi_checksums with a checksum per customer of the dimension
+    rows its KPIs read: the customer's name, its vehicles and the drivers
+    on them. A vehicle moving to another customer or a driver removed
+    changes the checksum of every customer involved.
+    """
+    cursor.execute("DROP TABLE IF EXISTS temp.kpi_checksums")
+    cursor.execute("""
+        CREATE TEMP TABLE kpi_checksums AS
+        SELECT customer_id, etl_checksum(kind, item_id, a, b, c, d) AS checksum
+        FROM (
+            SELECT customer_id, 'C' AS kind, NULL AS item_id, customer_name AS a,
+                   NULL AS b, NULL AS c, NULL AS d
+            FROM dim_customer
+            UNION ALL
+            SELECT customer_id, 'V', vehicle_id, is_active, monthly_lease_amount,
+                   purchase_price, make_name
+            FROM dim_vehicle
+            UNION ALL
+            SELECT v.customer_id, 'D', d.vehicle_id, d.driver_sequence, NULL, NULL, NULL
+            FROM dim_driver d
+            JOIN dim_vehicle v ON v.vehicle_id = d.vehicle_id
+        )
+        WHERE customer_id IN (SELECT customer_id FROM dim_customer)
+        GROUP BY customer_id
+    """)
+
+
+def _collect_changed_customers(cursor):
+    """
+    Fill temp.kpi_customers with customers whose KPI inputs changed since
+    their last calculation (checksum differs from the stored one) and
+    customers with no KPI row yet.
+    """
+    cursor.execute("DROP TABLE IF EXISTS temp.kpi_customers")
+    cursor.execute("CREATE TEMP TABLE kpi_customers (customer_id INTEGER PRIMARY KEY)")
+    cursor.execute("""
+        INSERT OR IGNORE INTO kpi_customers (customer_id)
+        SELECT n.customer_id
+        FROM kpi_checksums n
+        LEFT JOIN agg_customer_kpi_checksums s ON s.customer_id = n.customer_id
+        WHERE s.checksum IS NOT n.checksum
+        UNION
+        SELECT c.customer_id
+        FROM dim_customer c
+        WHERE NOT EXISTS (SELECT 1 FROM agg_customer_kpis a WHERE a.customer_id = c.customer_id)
+    """)
+
+
+def calculate_customer_kpis(conn, full=False):
+    """
+    Refresh customer KPIs and store today's snapshot in agg_customer_kpis_history.
+
+    Only customers whose vehicles, drivers or name changed since their last
+    calculation are recomputed (by checksum, so a FULL staging reload that
+    changed nothing recomputes nothing), unless `full` is set.
+    """
     print("  Calculating customer KPIs...", end=" ", flush=True)
     cursor = conn.cursor()
 
-    cursor.execute("DELETE FROM agg_customer_kpis")
-
+    _customer_kpi_checksums(cursor)
+    if full:
+        cursor.execute("DELETE FROM agg_customer_kpis")
+        cursor.execute("DROP TABLE IF EXISTS temp.kpi_customers")
+        cursor.execute("CREATE TEMP TABLE kpi_customers AS SELECT customer_id FROM dim_customer")
+    else:
+        _collect_changed_customers(cursor)
+        cursor.execute("""
+            DELETE FROM agg_customer_kpis
+            WHERE customer_id IN (SELECT customer_id FROM kpi_customers)
+               OR customer_id NOT IN (SELECT customer_id FROM dim_customer)
+        """)
+
+    # Driver counts come from a per-vehicle lookup, so the vehicle sums are
+    # not multiplied by the number of drivers on each vehicle
     cursor.execute("""
         INSERT INTO agg_customer_kpis (
             customer_id, customer_name, total_vehicles, active_vehicles,
@@ -936,24 +1055,244 @@ def calculate_customer_kpis(conn):
         SELECT
             c.customer_id,
             c.customer_name,
-            COUNT(DISTINCT v.vehicle_id),
-            COUNT(DISTINCT CASE WHEN v.is_active = 1 THEN v.vehicle_id END),
-            COUNT(DISTINCT d.driver_key),
+            COUNT(v.vehicle_id),
+            COUNT(CASE WHEN v.is_active = 1 THEN v.vehicle_id END),
+            COALESCE(SUM((SELECT COUNT(*) FROM dim_driver d WHERE d.vehicle_id = v.vehicle_id)), 0),
             SUM(v.monthly_lease_amount),
             AVG(v.purchase_price),
             SUM(v.purchase_price),
             GROUP_CONCAT(DISTINCT v.make_name)
-        FROM dim_customer c
+        FROM kpi_customers k
+        JOIN dim_customer c ON c.customer_id = k.customer_id
         LEFT JOIN dim_vehicle v ON c.customer_id = v.customer_id
-        LEFT JOIN dim_driver d ON v.vehicle_id = d.vehicle_id
         GROUP BY c.customer_id, c.customer_name
     """)
+    refreshed = cursor.rowcount
+
+    cursor.execute("""
+        INSERT OR REPLACE INTO agg_customer_kpis_history (
+            kpi_date, customer_id, customer_name, total_vehicles, active_vehicles,
+            total_drivers, total_monthly_lease_value, average_vehicle_value,
+            total_fleet_value, primary_vehicle_makes
+        )
+        SELECT
+            date('now'), customer_id, customer_name, total_vehicles, active_vehicles,
+            total_drivers, total_monthly_lease_value, average_vehicle_value,
+            total_fleet_value, primary_vehicle_makes
+        FROM agg_customer_kpis
+    """)
+    cursor.execute("DELETE FROM agg_customer_kpi_checksums")
+    cursor.execute("INSERT INTO agg_customer_kpi_checksums (customer_id, checksum) SELECT * FROM kpi_checksums")
+    cursor.execute("DROP TABLE temp.kpi_customers")
+    cursor.execute("DROP TABLE temp.kpi_checksums")
     conn.commit()
     count = cursor.execute("SELECT COUNT(*) FROM agg_customer_kpis").fetchone()[0]
-    print(f"{count} customers")
+    print(f"{count} customers ({refreshed} recalculated)")
+
+
+# =============================================
+# MATERIALIZED VIEWS
+# =============================================
+
+# Heavy views copied into mv_* tables at the end of every run. A view with a
+# partition column is refreshed one partition of its fact table at a time;
+# a change in any of its other sources (or in the view itself) rebuilds it.
+MATERIALIZED_VIEWS = {
+    'view_vehicle_cost_analysis': {
+        'sources': ['fact_car_reports', 'dim_vehicle'],
+        'fact': 'fact_car_reports',
+        'partition_column': 'reporting_period',
+        'indexes': [['vehicle_id', 'reporting_period']],
+    },
+    'view_maintenance_analysis': {
+        'sources': ['fact_maintenance_approvals', 'dim_vehicle'],
+        'fact': 'fact_maintenance_approvals',
+        'partition_column': 'reporting_period',
+        'indexes': [['vehicle_id'], ['approval_date'], ['supplier_no']],
+    },
+    'view_supplier_summary': {
+        'sources': ['dim_supplier', 'fact_maintenance_approvals'],
+        'indexes': [['supplier_no']],
+    },
+    'view_customer_billing_summary': {
+        'sources': ['dim_customer', 'fact_billing'],
+        'indexes': [['customer_id']],
+    },
+}
+
+
+def materialized_table_name(view):
+    """view_supplier_summary -> mv_supplier_summary"""
+    return 'mv_' + view[len('view_'):]
+
+
+class RowChecksum:
+    """Order-independent checksum of a set of rows (sum of the row hashes)."""
+
+    def __init__(self):
+        self.total = 0
+
+    def step(self, *values):
+        digest = hashlib.sha1(repr(values).encode('utf-8')).digest()
+        self.total = (self.total + int.from_bytes(digest[:8], 'big')) % (1 << 64)
+
+    def finalize(self):
+        return format(self.total, '016x')
+
+
+def _source_checksum(cursor, view_sql, table, group_by=None):
+    """
+    Checksum the columns of `table` that the view actually reads, so updates
+    to other columns (e.g. the hourly time-relative fields) do not count as a
+    change. With `group_by`, returns {partition value: checksum}.
+    """
+    columns = [
+        row[1] for row in cursor.execute(f"PRAGMA table_info({table})")
+        if re.search(rf'\b{row[1]}\b', view_sql)
+    ]
+    if group_by:
+        return dict(cursor.execute(
+            f"SELECT {group_by}, etl_checksum({', '.join(columns)}) FROM {table} GROUP BY {group_by}"
+        ).fetchall())
+    return cursor.execute(f"SELECT etl_checksum({', '.join(columns)}) FROM {table}").fetchone()[0]
+
+
+def _rebuild_materialized_table(conn, view, table, spec):
+    """Copy the whole view into `table` via a shadow table and index it."""
+    cursor = conn.cursor()
+    shadow = table + SHADOW_SUFFIX
+    exists = cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+    ).fetchone()
+
+    cursor.execute(f"DROP TABLE IF EXISTS {shadow}")
+    cursor.execute(f"CREATE TABLE {shadow} AS SELECT * FROM {view}")
+    conn.commit()
+    if exists:
+        swap_in_table(conn, table)
+    else:
+        cursor.execute(f"ALTER TABLE {shadow} RENAME TO {table}")
+        conn.commit()
+
+    indexes = list(spec.get('indexes', []))
+    if spec.get('partition_column'):
+        indexes.append([spec['partition_column']])
+    for columns in indexes:
+        cursor.execute(
+            f"CREATE INDEX IF NOT EXISTS idx_{table}_{'_'.join(columns)} ON {table}({', '.join(columns)})"
+        )
+    conn.commit()
+
+
+def _refresh_partitions(conn, view, table, partition_column, values):
+    """Replace the given partitions of `table` with the view's current rows."""
+    cursor = conn.cursor()
+    for value in values:
+        cursor.execute(f"DELETE FROM {table} WHERE {partition_column} IS ?", (value,))
+        cursor.execute(f"INSERT INTO {table} SELECT * FROM {view} WHERE {partition_column} IS ?", (value,))
+
+
+def refresh_materialized_view(conn, view, spec):
+    """
+    Bring the materialized copy of `view` up to date and record it in
+    semantic_materialized_views. Returns (refresh_mode, row_count).
+    """
+    cursor = conn.cursor()
+    start = time.perf_counter()
+    table = materialized_table_name(view)
+    partition_column = spec.get('partition_column')
+    fact = spec.get('fact')
+
+    view_sql = cursor.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'view' AND name = ?", (view,)
+    ).fetchone()[0]
+    checksums = {'definition': hashlib.sha1(view_sql.encode('utf-8')).hexdigest()}
+    for source in spec['sources']:
+        if not (partition_column and source == fact):
+            checksums[source] = _source_checksum(cursor, view_sql, source)
+    partitions = _source_checksum(cursor, view_sql, fact, group_by=partition_column) if partition_column else {}
+
+    previous = cursor.execute(
+        "SELECT source_checksums FROM semantic_materialized_views WHERE view_name = ?", (view,)
+    ).fetchone()
+    exists = cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+    ).fetchone()
+
+    changed = []
+    if not exists or not previous or json.loads(previous[0] or '{}') != checksums:
+        mode = 'FULL'
+        _rebuild_materialized_table(conn, view, table, spec)
+    elif partition_column:
+        stored = dict(cursor.execute(
+            "SELECT partition_value, checksum FROM semantic_materialized_partitions WHERE view_name = ?",
+            (view,),
+        ).fetchall())
+        changed = [p for p in set(partitions) | set(stored) if partitions.get(p) != stored.get(p)]
+        mode = 'PARTITIONS' if changed else 'UNCHANGED'
+    else:
+        mode = 'UNCHANGED'
+
+    # Partition rows, their checksums and the freshness record commit together
+    conn.commit()
+    cursor.execute("BEGIN IMMEDIATE")
+    try:
+        if changed:
+            _refresh_partitions(conn, view, table, partition_column, changed)
+        cursor.execute("DELETE FROM semantic_materialized_partitions WHERE view_name = ?", (view,))
+        cursor.executemany(
+            "INSERT INTO semantic_materialized_partitions (view_name, partition_value, checksum) VALUES (?, ?, ?)",
+            [(view, value, checksum) for value, checksum in partitions.items()],
+        )
+        row_count = cursor.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        cursor.execute("""
+            INSERT OR REPLACE INTO semantic_materialized_views (
+                view_name, table_name, refresh_mode, refreshed_at, row_count,
+                partitions_refreshed, duration_ms, is_fresh, source_checksums
+            ) VALUES (?, ?, ?, datetime('now'), ?, ?, ?, 1, ?)
+        """, (
+            view, table, mode, row_count, len(changed),
+            int((time.perf_counter() - start) * 1000), json.dumps(checksums),
+        ))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return mode, row_count
+
+
+def mark_materialized_views_stale(conn):
+    """Flag every materialized copy as stale while the base tables are reloaded."""
+    conn.execute("UPDATE semantic_materialized_views SET is_fresh = 0")
+    conn.commit()
+
+
+def refresh_materialized_views(conn):
+    """Refresh every view declared in MATERIALIZED_VIEWS."""
+    for view, spec in MATERIALIZED_VIEWS.items():
+        print(f"  {view} -> {materialized_table_name(view)}...", end=" ", flush=True)
+        mode, row_count = refresh_materialized_view(conn, view, spec)
+        print(f"{mode.lower()}, {row_count:,} rows")
 
 
 def main():
+    parser = argparse.ArgumentParser(description="ETL: Staging to Semantic Layer")
+    parser.add_argument("--refresh-time-fields", action="store_true",
+                        help="only recompute months_driven / months_remaining / days_to_contract_end "
+                             "(cheap; safe to schedule hourly)")
+    parser.add_argument("--full-kpis", action="store_true",
+                        help="recalculate KPIs for every customer instead of only changed ones")
+    parser.add_argument("--report-dir", default=REPORT_DIR,
+                        help="where the JSON run profile is written and compared with the previous run")
+    args = parser.parse_args()
+
+    if args.refresh_time_fields:
+        print(f"Refreshing time-relative fields: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        conn = get_connection()
+        refresh_time_relative_fields(conn)
+        conn.close()
+        return
+
     print("=" * 60)
     print("ETL: Staging to Semantic Layer")
     print("=" * 60)
@@ -961,38 +1300,52 @@ def main():
     print(f"Started: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print()
 
-    conn = get_connection()
+    conn = get_connection(bulk_load=True)
+    profiler = EtlProfiler("staging_to_semantic")
+
+    def profiled(step, *step_args):
+        with profiler.step(step.__name__, conn):
+            step(conn, *step_args)
 
     create_semantic_schema(conn)
+    mark_materialized_views_stale(conn)
+    print()
+
+    print("Checking code lookups...")
+    report_unmatched_codes(conn)
     print()
 
     print("Loading dimension tables...")
-    populate_date_dimension(conn)
-    load_dim_customer(conn)
-    load_dim_vehicle(conn)
-    load_dim_driver(conn)
-    load_dim_contract(conn)
-    load_dim_group(conn)
-    load_dim_make_model(conn)
-    load_dim_supplier(conn)
-    load_ref_domain_translation(conn)
+    profiled(populate_date_dimension)
+    profiled(load_dim_customer)
+    profiled(load_dim_vehicle)
+    profiled(load_dim_driver)
+    profiled(load_dim_contract)
+    profiled(load_dim_group)
+    profiled(load_dim_make_model)
+    profiled(load_dim_supplier)
+    profiled(load_ref_domain_translation)
     print()
 
     print("Loading fact tables...")
-    load_fact_odometer(conn)
-    load_fact_billing(conn)
-    load_fact_damages(conn)
-    load_fact_maintenance_approvals(conn)
-    load_fact_exploitation_services(conn)
-    load_fact_passed_invoices(conn)
-    load_fact_replacement_cars(conn)
-    load_fact_car_reports(conn)
+    profiled(load_fact_odometer)
+    profiled(load_fact_billing)
+    profiled(load_fact_damages)
+    profiled(load_fact_maintenance_approvals)
+    profiled(load_fact_exploitation_services)
+    profiled(load_fact_passed_invoices)
+    profiled(load_fact_replacement_cars)
+    profiled(load_fact_car_reports)
     print()
 
     print("Populating metadata and KPIs...")
-    populate_metadata_catalog(conn)
-    calculate_fleet_kpis(conn)
-    calculate_customer_kpis(conn)
+    profiled(populate_metadata_catalog)
+    profiled(calculate_fleet_kpis)
+    profiled(calculate_customer_kpis, args.full_kpis)
+    print()
+
+    print("Refreshing materialized views...")
+    profiled(refresh_materialized_views)
 
     # Summary
     print()
@@ -1009,13 +1362,23 @@ def main():
         'fact_maintenance_approvals', 'fact_exploitation_services',
         'fact_passed_invoices', 'fact_replacement_cars', 'fact_car_reports',
         'semantic_table_catalog', 'semantic_column_catalog',
-        'agg_fleet_kpis', 'agg_customer_kpis'
-    ]
+        'agg_fleet_kpis', 'agg_customer_kpis', 'agg_customer_kpis_history',
+    ] + [materialized_table_name(view) for view in MATERIALIZED_VIEWS]
 
     for table in tables:
         count = cursor.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
         print(f"  {table}: {count:,} rows")
 
+    print()
+    print("Profile (slowest first):")
+    report_path, comparison = profiler.write_report(args.report_dir)
+    profiler.print_summary(comparison)
+    print(f"  Report: {report_path}")
+
+    print()
+    print("Updating planner statistics...")
+    finish_bulk_load(conn)
+
     print()
     print(f"Completed: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     conn.close()
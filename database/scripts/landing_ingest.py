@@ -0,0 +1,166 @@
+"""
+Landing Ingest
+Turns source DataFrames into insert tuples a column at a time instead of
+walking them with iterrows(): each column becomes a list of Python values
+in one numpy conversion (NaN / NaT / NA -> None), and rows are zipped from
+those lists. Frames are converted and inserted in chunks, so only one
+chunk of tuples exists at a time.
+
+read_source_chunks() streams the source files themselves: CSV through
+pd.read_csv(chunksize=...), Excel through openpyxl's read-only row
+iterator. A load holds one chunk in memory however large the file is.
+
+Text modes (how values are bound):
+    'none'          native Python values (int, float, bool, Timestamp, str);
+                    for typed landing tables (SQL Server)
+    'non_numeric'   numbers native, everything else str();
+                    for the SQLite landing tables with numeric columns
+    'all'           every value str(); for all-TEXT landing tables
+
+Used by load_data_sqlite.py, load_data_pyodbc.py, load_initial_data.py,
+load_set2_set3_to_landing.py, backend/scripts/import_excel_data.py and
+backend/scripts/load_landing_data.py.
+"""
+
+from itertools import repeat
+import os
+
+import pandas as pd
+
+TEXT_MODES = ('none', 'non_numeric', 'all')
+DEFAULT_CHUNK_ROWS = 50000
+# Text form of datetime values (as str(Timestamp), also for all-midnight columns)
+DATETIME_TEXT_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+def column_values(series, text_mode='none'):
+    """One column as a list of Python values, None for missing values."""
+    if text_mode not in TEXT_MODES:
+        raise ValueError(f"Unknown text mode '{text_mode}', expected one of {TEXT_MODES}")
+
+    missing = series.isna().to_numpy()
+    numeric = pd.api.types.is_numeric_dtype(series.dtype)
+    if text_mode == 'all' or (text_mode == 'non_numeric' and not numeric):
+        if pd.api.types.is_datetime64_any_dtype(series.dtype):
+            series = series.dt.strftime(DATETIME_TEXT_FORMAT)
+        values = series.astype(str).to_numpy(dtype=object)
+    else:
+        # object casts give Python int / float / bool, not numpy scalars
+        values = series.to_numpy(dtype=object)
+
+    if missing.any():
+        values[missing] = None
+    return values.tolist()
+
+
+def frame_columns(df, columns, text_mode='none'):
+    """
+    {column: list of values} for the named columns; a column the frame does
+    not have is all None.
+    """
+    return {
+        column: column_values(df[column], text_mode) if column in df.columns else [None] * len(df)
+        for column in columns
+    }
+
+
+def frame_rows(df, text_mode='none', extra=()):
+    """Rows of a frame as insert tuples, with constant `extra` values appended."""
+    columns = [column_values(df[column], text_mode) for column in df.columns]
+    columns.extend(repeat(value, len(df)) for value in extra)
+    return list(zip(*columns))
+
+
+def iter_row_chunks(df, chunk_rows=DEFAULT_CHUNK_ROWS, text_mode='none', extra=()):
+    """Insert tuples of a frame, converted and yielded chunk_rows at a time."""
+    for start in range(0, len(df), chunk_rows):
+        yield frame_rows(df.iloc[start:start + chunk_rows], text_mode, extra)
+
+
+def insert_frame(cursor, insert_sql, df, chunk_rows=DEFAULT_CHUNK_ROWS, text_mode='none',
+                 extra=(), on_chunk=None):
+    """
+    executemany() a frame in chunks; on_chunk (e.g. conn.commit) is called
+    after each chunk. Returns the number of rows inserted.
+    """
+    total = 0
+    for rows in iter_row_chunks(df, chunk_rows, text_mode, extra):
+        cursor.executemany(insert_sql, rows)
+        total += len(rows)
+        if on_chunk:
+            on_chunk()
+    return total
+
+
+def _excel_value(value):
+    """Cell value as pd.read_excel gives it (whole floats as int)."""
+    if value.__class__ is float and value.is_integer():
+        return int(value)
+    return value
+
+
+def _dedup_header(header, unnamed):
+    """
+    Rename repeated column names as pd.read_excel does: X, X -> X, X.1,
+    skipping suffixes another column already has; named columns keep their
+    names before unnamed ones (positions in `unnamed`) are renamed.
+    """
+    names = list(header)
+    counts = {}
+    for i in [i for i in range(len(names)) if i not in unnamed] + list(unnamed):
+        name = original = names[i]
+        count = counts.get(name, 0)
+        while count > 0:
+            counts[original] = count + 1
+            name = f"{original}.{count}"
+            count = count + 1 if name in names else counts.get(name, 0)
+        names[i] = name
+        counts[name] = count + 1
+    return names
+
+
+def _excel_chunks(filepath, sheet_name, chunk_rows, dtype):
+    """Worksheet rows as DataFrames, read with openpyxl in read-only mode."""
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(filepath, read_only=True, data_only=True)
+    try:
+        sheet = workbook.worksheets[sheet_name] if isinstance(sheet_name, int) else workbook[sheet_name]
+        rows = sheet.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        unnamed = [i for i, name in enumerate(header) if name is None]
+        header = _dedup_header([f"Unnamed: {i}" if name is None else name for i, name in enumerate(header)], unnamed)
+        width = len(header)
+
+        def to_frame(batch):
+            if dtype is None:
+                return pd.DataFrame(batch, columns=header)
+            values = pd.DataFrame(batch, columns=header, dtype=object)
+            return values.astype(dtype).where(values.notna())
+
+        batch = []
+        for row in rows:
+            if any(value is not None for value in row):  # skip blank rows
+                batch.append([_excel_value(value) for value in row[:width]])
+                if len(batch) == chunk_rows:
+                    yield to_frame(batch)
+                    batch = []
+        if batch:
+            yield to_frame(batch)
+    finally:
+        workbook.close()
+
+
+def read_source_chunks(filepath, file_type=None, sheet_name=0, chunk_rows=DEFAULT_CHUNK_ROWS, dtype=None):
+    """
+    Yield a CSV or Excel source file as DataFrames of up to chunk_rows rows,
+    typed as pd.read_csv / pd.read_excel would type them (dtype=str reads
+    every value as text). file_type defaults to the file extension.
+    """
+    file_type = file_type or os.path.splitext(filepath)[1].lstrip('.').lower()
+    if file_type == 'csv':
+        yield from pd.read_csv(filepath, dtype=dtype, chunksize=chunk_rows)
+    else:
+        yield from _excel_chunks(filepath, sheet_name, chunk_rows, dtype)
@@ -9,6 +9,9 @@ import os
 from datetime import datetime
 import sys
 
+from etl_profiler import EtlProfiler
+from landing_ingest import insert_frame
+
 # Configuration - modify these as needed
 SERVER = "localhost"
 DATABASE = "FleetAI"
@@ -19,6 +22,7 @@ TRUSTED_CONNECTION = True  # Windows Authentication
 EXCEL_DIR = r"C:\Users\X1Carbon\Documents\FleetAI\Files"
 SCHEMA_FILE = r"C:\Users\X1Carbon\Documents\Projects\FleetAI\database\schemas\01_landing.sql"
 BATCH_SIZE = 500
+REPORT_DIR = os.path.join(os.path.dirname(os.path.dirname(SCHEMA_FILE)), "etl_reports")
 
 
 def get_connection():
@@ -79,23 +83,8 @@ def load_excel_file(conn, filepath):
         cursor = conn.cursor()
         cursor.fast_executemany = True
 
-        # Convert DataFrame to list of tuples, handling NaN values
-        data = []
-        for _, row in df.iterrows():
-            values = []
-            for val in row.values:
-                if pd.isna(val):
-                    values.append(None)
-                else:
-                    values.append(val)
-            data.append(tuple(values))
-
-        # Insert in batches
-        total_rows = len(data)
-        for i in range(0, total_rows, BATCH_SIZE):
-            batch = data[i:i + BATCH_SIZE]
-            cursor.executemany(insert_sql, batch)
-            conn.commit()
+        # Insert in batches, NaN as NULL
+        total_rows = insert_frame(cursor, insert_sql, df, chunk_rows=BATCH_SIZE, on_chunk=conn.commit)
 
         cursor.close()
         print(f"{total_rows} rows OK")
@@ -139,10 +128,14 @@ def main():
     total_rows = 0
     successful = 0
     failed = 0
+    profiler = EtlProfiler("excel_to_landing_mssql", dialect="mssql")
 
     for filename in excel_files:
         filepath = os.path.join(EXCEL_DIR, filename)
-        rows = load_excel_file(conn, filepath)
+        with profiler.step(filename, conn) as step:
+            rows = load_excel_file(conn, filepath)
+            step.rows = rows
+            step.status = 'SUCCESS' if rows > 0 else 'FAILED'
         if rows > 0:
             total_rows += rows
             successful += 1
@@ -160,6 +153,12 @@ def main():
     print(f"Total rows: {total_rows:,}")
     print()
 
+    print("Profile (slowest first):")
+    report_path, comparison = profiler.write_report(REPORT_DIR)
+    profiler.print_summary(comparison)
+    print(f"  Report: {report_path}")
+    print()
+
     if failed == 0:
         print("All data loaded successfully!")
     else:
@@ -3,12 +3,14 @@ Load Data to SQLite Database
 Creates landing tables and loads data from Excel files
 """
 
-import sqlite3
 import pandas as pd
 import os
 from datetime import datetime
 import hashlib
 
+from landing_ingest import insert_frame
+from sqlite_bulk_load import connect_for_bulk_load, finish_bulk_load
+
 # Configuration
 EXCEL_DIR = r"C:\Users\X1Carbon\Documents\FleetAI\Files"
 DB_PATH = r"C:\Users\X1Carbon\Documents\Projects\FleetAI\database\fleetai.db"
@@ -110,23 +112,8 @@ def load_excel_file(conn, filepath):
         column_list = ", ".join([f"[{col}]" for col in df.columns])
         insert_sql = f"INSERT INTO {sqlite_table} ({column_list}) VALUES ({placeholders})"
 
-        # Convert to list of tuples, handling NaN
-        data = []
-        for _, row in df.iterrows():
-            values = []
-            for val in row.values:
-                if pd.isna(val):
-                    values.append(None)
-                elif isinstance(val, (int, float)):
-                    if pd.isna(val):
-                        values.append(None)
-                    else:
-                        values.append(val)
-                else:
-                    values.append(str(val) if val is not None else None)
-            data.append(tuple(values))
-
-        cursor.executemany(insert_sql, data)
+        # Numbers bound as-is, other values as text, NaN as NULL
+        rows = insert_frame(cursor, insert_sql, df, text_mode='non_numeric')
         conn.commit()
 
         # Create index on extraction_timestamp
@@ -134,8 +121,8 @@ def load_excel_file(conn, filepath):
         conn.commit()
 
         cursor.close()
-        print(f"{len(df)} rows OK")
-        return len(df)
+        print(f"{rows} rows OK")
+        return rows
 
     except Exception as e:
         print(f"FAILED - {e}")
@@ -154,7 +141,8 @@ def main():
     os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
 
     # Connect to SQLite (creates file if not exists)
-    conn = sqlite3.connect(DB_PATH)
+    # Full reload of the landing tables
+    conn = connect_for_bulk_load(DB_PATH, synchronous='OFF')
     print("Connected to SQLite database.")
     print()
 
@@ -181,6 +169,9 @@ def main():
         else:
             failed += 1
 
+    print()
+    print("Updating planner statistics...")
+    finish_bulk_load(conn)
     conn.close()
 
     print()
@@ -9,6 +9,8 @@ from pathlib import Path
 from datetime import datetime
 import math
 
+from landing_ingest import frame_rows
+
 # Configuration
 EXCEL_DIR = r"C:\Users\X1Carbon\Documents\FleetAI\Files"
 OUTPUT_DIR = r"C:\Users\X1Carbon\Documents\Projects\FleetAI\database\data"
@@ -53,8 +55,8 @@ def generate_insert_statements(df, table_name, prefix):
         batch = df.iloc[i:i + BATCH_SIZE]
 
         values_list = []
-        for _, row in batch.iterrows():
-            values = [clean_value(val, col) for val, col in zip(row.values, df.columns)]
+        for row in frame_rows(batch):
+            values = [clean_value(val, col) for val, col in zip(row, df.columns)]
             values_list.append(f"({', '.join(values)})")
 
         insert = f"INSERT INTO [landing].[{table_name}] ({column_list})\nVALUES\n"
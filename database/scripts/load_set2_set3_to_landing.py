@@ -4,19 +4,39 @@ Loads 8 tables from Excel/CSV source files into SQLite landing tables.
 
 Set2 tables: CCDT, CCES, CCMS, CCPI, CCRC, CCRP, CCSU
 Set3 tables: CCCR (10 files)
+
+With --workers > 1 the files (and the CCPI sheets) are parsed in parallel
+worker processes, which send their rows back in chunks to this process, the
+only one writing to the database.
+
+Usage:
+    python load_set2_set3_to_landing.py
+    python load_set2_set3_to_landing.py --workers 1
 """
 
-import sqlite3
-import pandas as pd
+import argparse
+import multiprocessing
 import os
+import queue
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 import time
 
+from landing_ingest import frame_rows, read_source_chunks
+from sqlite_bulk_load import connect_for_bulk_load, finish_bulk_load
+
 # Configuration
 SET2_DIR = r"C:\Users\X1Carbon\Documents\FleetAI\Files\Set2"
 SET3_DIR = r"C:\Users\X1Carbon\Documents\FleetAI\Files\Set3"
 DB_PATH = r"C:\Users\X1Carbon\Documents\Projects\FleetAI\database\fleetai.db"
 
+# Default parser processes, capped at the CPU count (Excel parsing is CPU-bound)
+PARSE_WORKERS = 4
+# Rows per chunk handed to the writer, and chunks queued per parser
+# (bounds the memory held between the parsers and the writer)
+PARSE_CHUNK_ROWS = 10000
+QUEUED_CHUNKS_PER_WORKER = 2
+
 # Table configurations
 # Each entry: table_name -> {file, file_type, columns}
 TABLE_CONFIGS = {
@@ -113,8 +133,8 @@ TABLE_CONFIGS = {
 
 
 def get_connection():
-    """Get database connection."""
-    return sqlite3.connect(DB_PATH)
+    """Get database connection (full reload: synchronous=OFF)."""
+    return connect_for_bulk_load(DB_PATH, synchronous='OFF')
 
 
 def create_landing_table(cursor, table_name, columns):
@@ -134,12 +154,18 @@ def create_landing_table(cursor, table_name, columns):
     cursor.execute(create_sql)
 
 
-def read_source_file(filepath, file_type, sheet_name=0):
-    """Read a source file into a DataFrame."""
-    if file_type == 'csv':
-        return pd.read_csv(filepath, dtype=str)
-    else:
-        return pd.read_excel(filepath, sheet_name=sheet_name, dtype=str)
+def source_parts(config):
+    """
+    (label, filepath, sheet) for each file or sheet of a table: the CCPI
+    sheets and the CCCR files are loaded one after another. The label is
+    printed with the part's row count (None for single-file tables).
+    """
+    if config.get('sheets'):
+        return [(f"sheet{i}", config['file'], i) for i in range(config['sheets'])]
+    if config.get('file_count'):
+        return [(f"f{i}", config['file_pattern'].format(i=i), 0)
+                for i in range(1, config['file_count'] + 1)]
+    return [(None, config['file'], 0)]
 
 
 def map_source_columns(df, expected_columns):
@@ -192,23 +218,23 @@ def map_source_columns(df, expected_columns):
     return df[list(col_mapping.keys())].rename(columns=col_mapping)
 
 
-def prepare_data(df, extraction_ts):
+def insert_statement(table_name, columns):
+    """INSERT for a landing table: source columns, extraction_timestamp, row_hash."""
+    all_cols = columns + ['extraction_timestamp', 'row_hash']
+    placeholders = ", ".join(["?" for _ in all_cols])
+    column_list = ", ".join([f"[{col}]" for col in all_cols])
+    return f"INSERT INTO {table_name} ({column_list}) VALUES ({placeholders})"
+
+
+def parse_source(filepath, file_type, sheet, columns, extraction_ts):
     """
-    Prepare DataFrame rows for batch insert.
-    Converts all values to strings (or None for NaN), adds metadata columns.
+    Insert tuples of one source file / sheet, a chunk at a time: values as
+    text (NaN as NULL), plus extraction_timestamp and row_hash.
     """
-    data = []
-    for _, row in df.iterrows():
-        values = []
-        for val in row.values:
-            if pd.isna(val):
-                values.append(None)
-            else:
-                values.append(str(val) if val is not None else None)
-        values.append(extraction_ts)  # extraction_timestamp
-        values.append(None)           # row_hash
-        data.append(tuple(values))
-    return data
+    for chunk in read_source_chunks(filepath, file_type, sheet_name=sheet,
+                                    chunk_rows=PARSE_CHUNK_ROWS, dtype=str):
+        chunk = map_source_columns(chunk, columns).reindex(columns=columns)
+        yield frame_rows(chunk, text_mode='all', extra=(extraction_ts, None))
 
 
 def load_table(conn, table_name, config, extraction_ts):
@@ -226,55 +252,32 @@ def load_table(conn, table_name, config, extraction_ts):
         create_landing_table(cursor, table_name, columns)
         conn.commit()
 
-        # Build insert SQL
-        all_cols = columns + ['extraction_timestamp', 'row_hash']
-        placeholders = ", ".join(["?" for _ in all_cols])
-        column_list = ", ".join([f"[{col}]" for col in all_cols])
-        insert_sql = f"INSERT INTO {table_name} ({column_list}) VALUES ({placeholders})"
+        insert_sql = insert_statement(table_name, columns)
+        table_start = time.perf_counter()
 
+        # Stream each file / sheet in chunks straight into the table
         total_rows = 0
-
-        # Handle CCPI special case: 2 sheets
-        if config.get('sheets'):
-            frames = []
-            for sheet_idx in range(config['sheets']):
-                df = read_source_file(config['file'], config['file_type'], sheet_name=sheet_idx)
-                df = map_source_columns(df, columns)
-                frames.append(df)
-                print(f"sheet{sheet_idx}={len(df)}", end=" ", flush=True)
-            df = pd.concat(frames, ignore_index=True)
-
-        # Handle CCCR special case: 10 files
-        elif config.get('file_count'):
-            frames = []
-            for i in range(1, config['file_count'] + 1):
-                filepath = config['file_pattern'].format(i=i)
-                if not os.path.exists(filepath):
-                    print(f"\n    WARNING: {filepath} not found, skipping.", end=" ", flush=True)
-                    continue
-                df_part = read_source_file(filepath, config['file_type'])
-                df_part = map_source_columns(df_part, columns)
-                frames.append(df_part)
-                print(f"f{i}={len(df_part)}", end=" ", flush=True)
-            if not frames:
-                print("NO FILES FOUND")
-                return 0
-            df = pd.concat(frames, ignore_index=True)
-
-        # Standard single-file table
-        else:
-            df = read_source_file(config['file'], config['file_type'])
-            df = map_source_columns(df, columns)
-
-        # Prepare data for batch insert
-        data = prepare_data(df, extraction_ts)
-
-        # Batch insert using executemany
-        cursor.executemany(insert_sql, data)
+        files_found = 0
+        for label, filepath, sheet in source_parts(config):
+            if not os.path.exists(filepath):
+                print(f"\n    WARNING: {filepath} not found, skipping.", end=" ", flush=True)
+                continue
+            files_found += 1
+
+            part_start = time.perf_counter()
+            part_rows = 0
+            for data in parse_source(filepath, config['file_type'], sheet, columns, extraction_ts):
+                cursor.executemany(insert_sql, data)
+                part_rows += len(data)
+            total_rows += part_rows
+            if label:
+                print(f"{label}={part_rows} ({time.perf_counter() - part_start:.1f}s)", end=" ", flush=True)
+
+        if not files_found:
+            print("NO FILES FOUND")
+            return 0
         conn.commit()
 
-        total_rows = len(data)
-
         # Create index on extraction_timestamp
         cursor.execute(
             f"CREATE INDEX IF NOT EXISTS idx_{table_name}_timestamp "
@@ -282,7 +285,7 @@ def load_table(conn, table_name, config, extraction_ts):
         )
         conn.commit()
 
-        print(f"{total_rows:,} rows OK")
+        print(f"{total_rows:,} rows OK ({time.perf_counter() - table_start:.1f}s)")
         return total_rows
 
     except Exception as e:
@@ -290,7 +293,118 @@ def load_table(conn, table_name, config, extraction_ts):
         return 0
 
 
+# Chunk queue of a parser process (set by _init_parser)
+_chunk_queue = None
+
+
+def _init_parser(chunk_queue):
+    global _chunk_queue
+    _chunk_queue = chunk_queue
+
+
+def _parse_part(part_id, filepath, file_type, sheet, columns, extraction_ts):
+    """
+    Parser process: queue (part_id, rows, None) per chunk of one file / sheet,
+    then (part_id, None, (row count, seconds, error)) when it is done.
+    """
+    start = time.perf_counter()
+    total, error = 0, None
+    try:
+        for data in parse_source(filepath, file_type, sheet, columns, extraction_ts):
+            _chunk_queue.put((part_id, data, None))
+            total += len(data)
+    except Exception as e:
+        error = str(e)
+    _chunk_queue.put((part_id, None, (total, time.perf_counter() - start, error)))
+
+
+def load_tables_parallel(conn, extraction_ts, workers=PARSE_WORKERS):
+    """
+    Load every table with its files and sheets parsed in `workers` processes.
+    This process owns the connection and inserts the chunks as they arrive.
+    A table with a file that fails is emptied and counted as failed, as
+    load_table() does. Returns a dict of table name -> rows loaded.
+    """
+    cursor = conn.cursor()
+    parts = []  # (table name, label, filepath, sheet)
+    files_found = {}
+    for table_name, config in TABLE_CONFIGS.items():
+        create_landing_table(cursor, table_name, config['columns'])
+        files_found[table_name] = 0
+        for label, filepath, sheet in source_parts(config):
+            if not os.path.exists(filepath):
+                print(f"  WARNING: {filepath} not found, skipping.")
+                continue
+            parts.append((table_name, label or os.path.basename(filepath), filepath, sheet))
+            files_found[table_name] += 1
+    conn.commit()
+
+    insert_sql = {name: insert_statement(name, config['columns']) for name, config in TABLE_CONFIGS.items()}
+    rows = dict.fromkeys(TABLE_CONFIGS, 0)
+    failed = set()
+    remaining = set(range(len(parts)))
+
+    chunk_queue = multiprocessing.Queue(maxsize=workers * QUEUED_CHUNKS_PER_WORKER)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_parser,
+                             initargs=(chunk_queue,)) as pool:
+        futures = {}
+        for part_id, (table_name, _, filepath, sheet) in enumerate(parts):
+            config = TABLE_CONFIGS[table_name]
+            future = pool.submit(_parse_part, part_id, filepath, config['file_type'], sheet,
+                                 config['columns'], extraction_ts)
+            futures[future] = part_id
+
+        while remaining:
+            try:
+                part_id, data, done = chunk_queue.get(timeout=1)
+            except queue.Empty:
+                # A parser process that died never reports its part as done
+                for future, part_id in futures.items():
+                    if part_id in remaining and future.done() and future.exception():
+                        table_name, label = parts[part_id][:2]
+                        remaining.discard(part_id)
+                        failed.add(table_name)
+                        print(f"  {table_name} {label}: FAILED - {future.exception()}")
+                continue
+
+            table_name, label = parts[part_id][:2]
+            if data is not None:
+                cursor.executemany(insert_sql[table_name], data)
+                rows[table_name] += len(data)
+                continue
+
+            part_rows, seconds, error = done
+            remaining.discard(part_id)
+            if error:
+                failed.add(table_name)
+                print(f"  {table_name} {label}: FAILED - {error} ({seconds:.1f}s)")
+            else:
+                print(f"  {table_name} {label}: {part_rows:,} rows in {seconds:.1f}s")
+
+    results = {}
+    for table_name in TABLE_CONFIGS:
+        if not files_found[table_name]:
+            print(f"  {table_name}: NO FILES FOUND")
+            results[table_name] = 0
+        elif table_name in failed:
+            cursor.execute(f"DELETE FROM {table_name}")
+            results[table_name] = 0
+        else:
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS idx_{table_name}_timestamp "
+                f"ON {table_name}(extraction_timestamp)"
+            )
+            results[table_name] = rows[table_name]
+    conn.commit()
+    return results
+
+
 def main():
+    parser = argparse.ArgumentParser(description="Load Set2 & Set3 to Landing (SQLite)")
+    parser.add_argument("--workers", type=int, default=min(PARSE_WORKERS, os.cpu_count() or 1),
+                        help="parser processes for the source files (1 = sequential)")
+    args = parser.parse_args()
+
     start_time = time.time()
     extraction_ts = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
 
@@ -301,6 +415,7 @@ def main():
     print(f"Set2 source: {SET2_DIR}")
     print(f"Set3 source: {SET3_DIR}")
     print(f"Extraction timestamp: {extraction_ts}")
+    print(f"Parser workers: {args.workers}")
     print()
 
     # Verify source directories exist
@@ -314,11 +429,16 @@ def main():
 
     # Load all tables
     print("Loading landing tables...")
-    results = {}
+    if args.workers > 1:
+        results = load_tables_parallel(conn, extraction_ts, args.workers)
+    else:
+        results = {}
+        for table_name, config in TABLE_CONFIGS.items():
+            results[table_name] = load_table(conn, table_name, config, extraction_ts)
 
-    for table_name, config in TABLE_CONFIGS.items():
-        rows = load_table(conn, table_name, config, extraction_ts)
-        results[table_name] = rows
+    print()
+    print("Updating planner statistics...")
+    finish_bulk_load(conn)
 
     # Summary
     elapsed = time.time() - start_time
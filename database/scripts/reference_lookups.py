@@ -0,0 +1,78 @@
+"""
+Reference Data Lookups
+Creates the code lookup tables of 00_reference_sqlite.sql and reports codes
+in the staging tables that have no entry in their lookup (which the
+transforms would otherwise decode as NULL / 'Unknown').
+
+Used by etl_landing_to_staging.py and etl_staging_to_semantic.py.
+"""
+
+import os
+
+REFERENCE_SCHEMA_FILE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', 'schemas', '00_reference_sqlite.sql'
+)
+
+# (source table, code column, lookup table, lookup key) decoded by the transforms
+CODE_CHECKS = [
+    ('staging_vehicles', 'object_status', 'ref_vehicle_status', 'status_code'),
+    ('staging_vehicles', 'lease_type', 'ref_lease_type', 'lease_type'),
+    ('staging_vehicles', 'fuel_code', 'ref_fuel_code', 'fuel_code'),
+    ('staging_contracts', 'lease_type', 'ref_lease_type', 'lease_type'),
+    ('staging_customers', 'country_code', 'ref_country', 'country_code'),
+    ('staging_orders', 'order_status_code', 'ref_order_status', 'status_code'),
+    ('staging_odometer_history', 'source_code', 'ref_odometer_source', 'source_code'),
+]
+
+# Unmatched codes listed per check
+MAX_CODES_REPORTED = 10
+
+
+def create_reference_tables(conn):
+    """Create the lookup tables and (re)apply their rows."""
+    with open(REFERENCE_SCHEMA_FILE, 'r') as f:
+        conn.executescript(f.read())
+    conn.commit()
+
+
+def _table_exists(cursor, table):
+    return cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+    ).fetchone() is not None
+
+
+def unmatched_codes(conn, checks=CODE_CHECKS):
+    """
+    Non-NULL codes missing from their lookup table.
+
+    Returns a list of (source table, column, lookup table, [(code, rows), ...])
+    for the checks that found any; checks whose tables do not exist yet are skipped.
+    """
+    cursor = conn.cursor()
+    findings = []
+    for table, column, lookup, key in checks:
+        if not (_table_exists(cursor, table) and _table_exists(cursor, lookup)):
+            continue
+        codes = cursor.execute(f"""
+            SELECT s.{column}, COUNT(*) AS row_count
+            FROM {table} s
+            LEFT JOIN {lookup} r ON r.{key} = s.{column}
+            WHERE s.{column} IS NOT NULL AND r.{key} IS NULL
+            GROUP BY s.{column}
+            ORDER BY row_count DESC
+            LIMIT {MAX_CODES_REPORTED}
+        """).fetchall()
+        if codes:
+            findings.append((table, column, lookup, codes))
+    return findings
+
+
+def report_unmatched_codes(conn, checks=CODE_CHECKS):
+    """Print unmatched codes per check; returns the findings."""
+    findings = unmatched_codes(conn, checks)
+    if not findings:
+        print("  All codes found in their lookup tables.")
+    for table, column, lookup, codes in findings:
+        listed = ", ".join(f"{code!r} ({rows:,} rows)" for code, rows in codes)
+        print(f"  WARNING: {table}.{column} not in {lookup}: {listed}")
+    return findings
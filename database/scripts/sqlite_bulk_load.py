@@ -0,0 +1,91 @@
+"""
+SQLite Bulk-Load Profile
+Connection settings for the load window of the SQLite ETL scripts: WAL,
+a large page cache, in-memory temp storage and memory-mapped reads.
+Secondary indexes can be dropped around a bulk insert and rebuilt once,
+and statistics are refreshed when the load is finished.
+
+The default is synchronous=NORMAL, which in WAL mode cannot corrupt the
+database: a power loss or OS crash can only lose the last commits.
+synchronous=OFF is faster but such a crash can corrupt the whole file,
+and fleetai.db also holds the app-layer tables written by
+seed_app_layer.py, which no ETL rebuilds. Only full rebuilds ask for OFF;
+back the file up before one. finish_bulk_load() restores
+synchronous=NORMAL and checkpoints the WAL.
+
+Used by load_data_sqlite.py, load_set2_set3_to_landing.py,
+etl_landing_to_staging.py and etl_staging_to_semantic.py.
+"""
+
+import sqlite3
+from contextlib import contextmanager
+
+# Page cache per connection, in KiB (PRAGMA cache_size takes negative KiB)
+CACHE_SIZE_KB = 256 * 1024
+MMAP_SIZE = 1024 * 1024 * 1024
+# Rows sampled per index by ANALYZE (0 = all rows)
+ANALYSIS_LIMIT = 1000
+
+
+def apply_bulk_load_pragmas(conn, synchronous='NORMAL'):
+    """Switch an open connection to the bulk-load profile. Returns the settings in effect."""
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(f"PRAGMA synchronous={synchronous}")
+    conn.execute(f"PRAGMA cache_size=-{CACHE_SIZE_KB}")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+    return {
+        name: conn.execute(f"PRAGMA {name}").fetchone()[0]
+        for name in ('journal_mode', 'synchronous', 'cache_size', 'temp_store', 'mmap_size')
+    }
+
+
+def connect_for_bulk_load(db_path, timeout=5.0, synchronous='NORMAL'):
+    """sqlite3.connect() with the bulk-load profile applied."""
+    conn = sqlite3.connect(db_path, timeout=timeout)
+    apply_bulk_load_pragmas(conn, synchronous)
+    return conn
+
+
+def secondary_indexes(conn, table):
+    """(name, CREATE INDEX sql) of the explicitly created indexes on a table."""
+    return conn.execute("""
+        SELECT name, sql FROM sqlite_master
+        WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL
+        ORDER BY name
+    """, (table,)).fetchall()
+
+
+@contextmanager
+def deferred_indexes(conn, table):
+    """
+    Drop the table's secondary indexes for the duration of the block and
+    rebuild them afterwards, so a bulk insert writes each index in one pass
+    instead of row by row. PRIMARY KEY / UNIQUE constraint indexes stay.
+    The drops run in a transaction (one is opened if the caller has none;
+    sqlite3 would otherwise autocommit the DDL) and the indexes are rebuilt
+    even if the block fails, so they are back whether the caller then
+    commits or rolls back.
+    """
+    if not conn.in_transaction:
+        conn.execute("BEGIN")
+    indexes = secondary_indexes(conn, table)
+    for name, _ in indexes:
+        conn.execute(f'DROP INDEX "{name}"')
+    try:
+        yield indexes
+    finally:
+        for _, sql in indexes:
+            conn.execute(sql)
+
+
+def finish_bulk_load(conn, analyze=True):
+    """Refresh planner statistics, restore durable syncing and checkpoint the WAL."""
+    conn.commit()
+    if analyze:
+        conn.execute(f"PRAGMA analysis_limit={ANALYSIS_LIMIT}")
+        conn.execute("ANALYZE")
+        conn.execute("PRAGMA optimize")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    conn.commit()
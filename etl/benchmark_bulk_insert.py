@@ -0,0 +1,151 @@
+"""
+Benchmark: Landing Insert Strategies
+
+Inserts the same synthetic landing rows with each strategy of
+plugins/mssql_bulk_insert.py and prints rows/sec:
+
+    row_by_row          cursor.execute() per row (the old CDC insert path)
+    executemany         plain DB-API executemany
+    fast_executemany    pyodbc parameter arrays with typed input sizes
+
+Runs against SQL Server when an ODBC connection string is given; otherwise
+against a local SQLite stand-in, where fast_executemany is not available
+and falls back to executemany (that run only shows the row-by-row cost).
+
+Usage:
+    python benchmark_bulk_insert.py
+    python benchmark_bulk_insert.py --rows 200000 --batch 10000 \\
+        --odbc "DRIVER={ODBC Driver 18 for SQL Server};SERVER=localhost;DATABASE=FleetAI;Trusted_Connection=yes;TrustServerCertificate=yes"
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'plugins'))
+from mssql_bulk_insert import pyodbc, prepare_cursor, target_input_sizes
+
+TABLE = 'bulk_insert_bench'
+COLUMNS = ['OBJECT_NO', 'REGISTRATION', 'CUSTOMER_NO', 'LEASE_AMOUNT',
+           'START_DATE', 'REMARK', 'EXTRACTED_AT']
+MSSQL_DDL = f"""
+    CREATE TABLE dbo.{TABLE} (
+        OBJECT_NO INT NOT NULL, REGISTRATION VARCHAR(20) NULL, CUSTOMER_NO INT NULL,
+        LEASE_AMOUNT DECIMAL(12, 2) NULL, START_DATE DATE NULL,
+        REMARK VARCHAR(200) NULL, EXTRACTED_AT DATETIME2 NULL
+    )
+"""
+SQLITE_DDL = f"""
+    CREATE TABLE {TABLE} (
+        OBJECT_NO INTEGER NOT NULL, REGISTRATION TEXT, CUSTOMER_NO INTEGER,
+        LEASE_AMOUNT NUMERIC, START_DATE TEXT, REMARK TEXT, EXTRACTED_AT TEXT
+    )
+"""
+STRATEGIES = ('row_by_row', 'executemany', 'fast_executemany')
+
+
+def synthetic_rows(count, sqlite=False, seed=42):
+    """Landing-like rows; the first row's REMARK is NULL, as in real extracts."""
+    rng = random.Random(seed)
+    extracted = datetime(2026, 1, 1, 2, 0, 0)
+    rows = []
+    for object_no in range(1, count + 1):
+        start = date(2018, 1, 1) + timedelta(days=rng.randint(0, 3000))
+        row = (
+            object_no, f"{rng.randint(1, 99):02d}-ABC-{object_no % 1000:03d}",
+            rng.randint(1, 5000), Decimal(f"{rng.uniform(200, 1500):.2f}"), start,
+            None if object_no == 1 or rng.random() < 0.3 else f"remark {rng.randint(1, 10 ** 6)}",
+            extracted,
+        )
+        if sqlite:
+            row = (row[0], row[1], row[2], float(row[3]), row[4].isoformat(), row[5], str(row[6]))
+        rows.append(row)
+    return rows
+
+
+def run(conn, strategy, rows, batch, schema):
+    """Insert rows with one strategy into an empty table. Returns (seconds, strategy in effect)."""
+    cursor = conn.cursor()
+    cursor.execute(f"DELETE FROM {schema}{TABLE}")
+    conn.commit()
+
+    insert_sql = f"INSERT INTO {schema}{TABLE} ({', '.join(COLUMNS)}) VALUES ({', '.join('?' for _ in COLUMNS)})"
+    effective = strategy
+    if strategy == 'fast_executemany':
+        sizes = target_input_sizes(cursor, 'dbo', TABLE, COLUMNS) if hasattr(cursor, 'fast_executemany') else None
+        effective = prepare_cursor(cursor, strategy, sizes)
+
+    start = time.perf_counter()
+    for i in range(0, len(rows), batch):
+        chunk = rows[i:i + batch]
+        if strategy == 'row_by_row':
+            for row in chunk:
+                cursor.execute(insert_sql, row)
+        else:
+            cursor.executemany(insert_sql, chunk)
+        conn.commit()
+    elapsed = time.perf_counter() - start
+
+    cursor.execute(f"SELECT COUNT(*) FROM {schema}{TABLE}")
+    loaded = cursor.fetchone()[0]
+    if loaded != len(rows):
+        raise RuntimeError(f"{strategy}: loaded {loaded} of {len(rows)} rows")
+    cursor.close()
+    return elapsed, effective
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the landing insert strategies")
+    parser.add_argument("--rows", type=int, default=50000, help="Synthetic rows to insert")
+    parser.add_argument("--batch", type=int, default=10000, help="Rows per executemany / commit")
+    parser.add_argument("--odbc", default=None, help="SQL Server ODBC connection string (default: SQLite stand-in)")
+    args = parser.parse_args()
+
+    scratch = None
+    if args.odbc:
+        if pyodbc is None:
+            parser.error("--odbc needs pyodbc installed")
+        conn = pyodbc.connect(args.odbc)
+        conn.execute(f"IF OBJECT_ID('dbo.{TABLE}') IS NOT NULL DROP TABLE dbo.{TABLE}")
+        conn.execute(MSSQL_DDL)
+        conn.commit()
+        schema, target = 'dbo.', 'SQL Server'
+    else:
+        scratch = tempfile.TemporaryDirectory()
+        conn = sqlite3.connect(os.path.join(scratch.name, 'bench.db'))
+        conn.execute(SQLITE_DDL)
+        schema, target = '', 'SQLite stand-in'
+
+    rows = synthetic_rows(args.rows, sqlite=not args.odbc)
+
+    print("=" * 60)
+    print(f"Landing insert benchmark: {args.rows:,} rows on {target}")
+    print("=" * 60)
+    results = {}
+    for strategy in STRATEGIES:
+        results[strategy] = run(conn, strategy, rows, args.batch, schema)
+
+    baseline = results['row_by_row'][0]
+    print(f"  {'strategy':<20} {'seconds':>9} {'rows/s':>12} {'speed-up':>9}")
+    for strategy, (seconds, effective) in results.items():
+        label = strategy if effective == strategy else f"{strategy}*"
+        print(f"  {label:<20} {seconds:>9.2f} {args.rows / seconds:>12,.0f} {f'x{baseline / seconds:.1f}':>9}")
+    if any(effective != strategy for strategy, (_, effective) in results.items()):
+        print("\n  * not supported by this connection, ran as executemany")
+
+    if args.odbc:
+        conn.execute(f"DROP TABLE dbo.{TABLE}")
+        conn.commit()
+    conn.close()
+    if scratch:
+        scratch.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -15,6 +15,7 @@ from airflow.utils.task_group import TaskGroup
 import sys
 sys.path.insert(0, '/opt/airflow/plugins')
 from db2_operator import DB2ExtractOperator, DB2ToMSSQLCDCOperator, DataQualityCheckOperator
+from mssql_bulk_insert import DEFAULT_LOAD_STRATEGY
 
 
 # Default arguments
@@ -29,10 +30,21 @@ default_args = {
     'execution_timeout': timedelta(hours=2),
 }
 
+# Airflow pools capping concurrent database sessions (created by airflow-init
+# in docker/docker-compose.yml). Extracts take a DB2 slot; quality checks and
+# CDC merges take an MSSQL slot.
+DB2_POOL = 'db2_extraction_pool'
+MSSQL_POOL = 'mssql_transform_pool'
+
 # Daily extraction tables configuration
+# Optional 'load_strategy' per table: 'fast_executemany' (default) or 'executemany'
+# Optional 'watermark' per table: ascending column (change timestamp or sequence)
+# to extract only new rows; tables without one are copied in full
+# Optional 'rehash_current' per table: True for one run after the row fingerprint
+# encoding changed, so CDC recomputes the stored staging hashes in SQL first
 DAILY_TABLES = [
     # Customer domain
-    {'source': 'CCAU', 'target': 'CCAU', 'key_cols': ['CCAU_AUDIT_ID'], 'staging': 'customer_audit'},
+    {'source': 'CCAU', 'target': 'CCAU', 'key_cols': ['CCAU_AUDIT_ID'], 'staging': 'customer_audit', 'watermark': 'CCAU_AUDIT_ID'},
     {'source': 'CCCA', 'target': 'CCCA', 'key_cols': ['CCCA_CONTACT_ID'], 'staging': 'customer_contacts'},
     {'source': 'CCCO', 'target': 'CCCO', 'key_cols': ['CCCO_CUSTOMER_ID'], 'staging': 'customers'},
     {'source': 'CCCP', 'target': 'CCCP', 'key_cols': ['CCCP_CHARGE_ID'], 'staging': 'contract_charges'},
@@ -46,7 +58,7 @@ DAILY_TABLES = [
     # Fuel domain
     {'source': 'CCFC', 'target': 'CCFC', 'key_cols': ['CCFC_CARD_ID'], 'staging': 'fuel_cards'},
     {'source': 'CCFIH', 'target': 'CCFIH', 'key_cols': ['CCFIH_INVOICE_NO'], 'staging': 'fuel_invoices'},
-    {'source': 'CCFID', 'target': 'CCFID', 'key_cols': ['CCFID_LINE_ID'], 'staging': 'fuel_transactions'},
+    {'source': 'CCFID', 'target': 'CCFID', 'key_cols': ['CCFID_LINE_ID'], 'staging': 'fuel_transactions', 'watermark': 'CCFID_LINE_ID'},
     {'source': 'CCFIM', 'target': 'CCFIM', 'key_cols': ['CCFIM_MISC_ID'], 'staging': 'fuel_misc'},
     {'source': 'CCFP', 'target': 'CCFP', 'key_cols': ['CCFP_PRICE_ID'], 'staging': 'fuel_prices'},
 
@@ -71,7 +83,7 @@ DAILY_TABLES = [
     {'source': 'CCXC', 'target': 'CCXC', 'key_cols': ['CCXC_EXCEPTION_ID'], 'staging': 'exceptions'},
 
     # Work Orders (CW prefix)
-    {'source': 'CWAU', 'target': 'CWAU', 'key_cols': ['CWAU_AUDIT_ID'], 'staging': 'wo_audit'},
+    {'source': 'CWAU', 'target': 'CWAU', 'key_cols': ['CWAU_AUDIT_ID'], 'staging': 'wo_audit', 'watermark': 'CWAU_AUDIT_ID'},
     {'source': 'CWBI', 'target': 'CWBI', 'key_cols': ['CWBI_BILLING_ID'], 'staging': 'wo_billing'},
     {'source': 'CWCO', 'target': 'CWCO', 'key_cols': ['CWCO_COMMENT_ID'], 'staging': 'wo_comments'},
     {'source': 'CWCP', 'target': 'CWCP', 'key_cols': ['CWCP_COMPONENT_ID'], 'staging': 'wo_components'},
@@ -102,6 +114,22 @@ DAILY_TABLES = [
 ]
 
 
+# Staging tables read by refresh_reporting_layer
+REPORTING_STAGING_TABLES = {'customers', 'customer_billing'}
+
+
+def table_lanes(tables):
+    """
+    Table configs grouped by source table, in config order. A source loaded
+    into several staging tables is extracted and checked once, then fans out
+    to one CDC task per staging table.
+    """
+    lanes = {}
+    for table_config in tables:
+        lanes.setdefault(table_config['source'], []).append(table_config)
+    return lanes
+
+
 # DAG Definition
 with DAG(
     dag_id='fleetai_daily_extraction',
@@ -136,23 +164,23 @@ with DAG(
         """
     )
 
-    # Extract task groups
-    with TaskGroup(group_id='extract_landing') as extract_group:
-        extract_tasks = {}
-        for table_config in DAILY_TABLES:
+    # One lane per source table: extract >> quality >> CDC, so each table moves
+    # on to staging as soon as its own extract is checked
+    reporting_lanes, other_lanes = [], []
+    for source, lane_tables in table_lanes(DAILY_TABLES).items():
+        table_config = lane_tables[0]
+        with TaskGroup(group_id=f"lane_{source}") as lane:
             extract_task = DB2ExtractOperator(
-                task_id=f"extract_{table_config['source']}",
-                source_table=table_config['source'],
+                task_id=f"extract_{source}",
+                source_table=source,
                 target_table=table_config['target'],
                 extraction_type='daily',
-                pool='db2_extraction_pool',
+                watermark_column=table_config.get('watermark'),
+                load_strategy=table_config.get('load_strategy', DEFAULT_LOAD_STRATEGY),
+                pool=DB2_POOL,
             )
-            extract_tasks[table_config['source']] = extract_task
 
-    # Data quality checks
-    with TaskGroup(group_id='quality_checks') as quality_group:
-        quality_tasks = []
-        for table_config in DAILY_TABLES:
+            # Data quality checks
             quality_task = DataQualityCheckOperator(
                 task_id=f"quality_{table_config['target']}",
                 table_name=f"landing.{table_config['target']}",
@@ -168,24 +196,29 @@ with DAG(
                         'timestamp_column': 'extraction_timestamp',
                         'max_age_hours': 25  # Allow some buffer
                     }
-                ]
+                ],
+                pool=MSSQL_POOL,
             )
-            quality_tasks.append(quality_task)
-
-    # Transform to staging (CDC)
-    with TaskGroup(group_id='transform_staging') as transform_group:
-        transform_tasks = []
-        for table_config in DAILY_TABLES:
-            if table_config.get('staging'):  # Only if staging table defined
-                transform_task = DB2ToMSSQLCDCOperator(
-                    task_id=f"cdc_{table_config['source']}",
-                    source_table=table_config['source'],
-                    landing_table=table_config['target'],
-                    staging_table=table_config['staging'],
-                    key_columns=table_config['key_cols'],
-                    pool='mssql_transform_pool',
-                )
-                transform_tasks.append(transform_task)
+            extract_task >> quality_task
+
+            # Transform to staging (CDC)
+            for staging_config in lane_tables:
+                if staging_config.get('staging'):  # Only if staging table defined
+                    quality_task >> DB2ToMSSQLCDCOperator(
+                        task_id=f"cdc_{staging_config['staging']}",
+                        source_table=source,
+                        landing_table=staging_config['target'],
+                        staging_table=staging_config['staging'],
+                        key_columns=staging_config['key_cols'],
+                        load_strategy=staging_config.get('load_strategy', DEFAULT_LOAD_STRATEGY),
+                        rehash_current=staging_config.get('rehash_current', False),
+                        pool=MSSQL_POOL,
+                    )
+
+        if any(config.get('staging') in REPORTING_STAGING_TABLES for config in lane_tables):
+            reporting_lanes.append(lane)
+        else:
+            other_lanes.append(lane)
 
     # Refresh reporting layer
     refresh_reporting = MsSqlOperator(
@@ -248,17 +281,6 @@ with DAG(
 
             -- Similar MERGE for other dimensions (vehicles, drivers, contracts)
             -- ... (abbreviated for space)
-
-            -- Update ETL log
-            UPDATE landing.etl_extraction_log
-            SET extraction_end = GETUTCDATE(), status = 'success'
-            WHERE table_name = '_DAG_DAILY'
-              AND status = 'running'
-              AND extraction_start = (
-                  SELECT MAX(extraction_start)
-                  FROM landing.etl_extraction_log
-                  WHERE table_name = '_DAG_DAILY'
-              );
         """
     )
 
@@ -272,8 +294,28 @@ with DAG(
         """
     )
 
+    # Mark the run complete once every lane has finished
+    log_completion = MsSqlOperator(
+        task_id='log_dag_completion',
+        mssql_conn_id='mssql_fleetai',
+        sql="""
+            UPDATE landing.etl_extraction_log
+            SET extraction_end = GETUTCDATE(), status = 'success'
+            WHERE table_name = '_DAG_DAILY'
+              AND status = 'running'
+              AND extraction_start = (
+                  SELECT MAX(extraction_start)
+                  FROM landing.etl_extraction_log
+                  WHERE table_name = '_DAG_DAILY'
+              );
+        """
+    )
+
     # End marker
     end = EmptyOperator(task_id='end')
 
-    # Define dependencies
-    start >> pre_validation >> extract_group >> quality_group >> transform_group >> refresh_reporting >> refresh_aggregates >> end
+    # Define dependencies: refresh_reporting only waits for the lanes it reads
+    start >> pre_validation >> reporting_lanes + other_lanes
+    reporting_lanes >> refresh_reporting >> refresh_aggregates
+    other_lanes >> refresh_aggregates
+    refresh_aggregates >> log_completion >> end
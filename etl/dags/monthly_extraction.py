@@ -15,6 +15,7 @@ from airflow.models import Variable
 import sys
 sys.path.insert(0, '/opt/airflow/plugins')
 from db2_operator import DB2ExtractOperator, DB2ToMSSQLCDCOperator, DataQualityCheckOperator
+from mssql_bulk_insert import DEFAULT_LOAD_STRATEGY
 
 
 default_args = {
@@ -28,7 +29,16 @@ default_args = {
     'execution_timeout': timedelta(hours=6),  # Longer timeout for monthly
 }
 
+# Airflow pools capping concurrent database sessions (created by airflow-init
+# in docker/docker-compose.yml)
+DB2_POOL = 'db2_extraction_pool'
+MSSQL_POOL = 'mssql_transform_pool'
+
 # Monthly extraction tables - larger datasets
+# Optional 'load_strategy' per table: 'fast_executemany' (default) or 'executemany'
+# Optional 'watermark' per table: ascending column (change timestamp or sequence)
+# Optional 'rehash_current' per table: True for one run after the row fingerprint
+# encoding changed, so CDC recomputes the stored staging hashes in SQL first
 MONTHLY_TABLES = [
     {
         'source': 'CCEB',
@@ -61,6 +71,10 @@ MONTHLY_TABLES = [
 ]
 
 
+# Staging tables read by refresh_dimensions_full
+DIMENSION_STAGING_TABLES = {'vehicles', 'contracts'}
+
+
 def check_if_first_of_month(**context):
     """Check if running on first of month or forced via variable"""
     execution_date = context['execution_date']
@@ -77,7 +91,7 @@ def send_extraction_summary(**context):
     results = {}
 
     for table in MONTHLY_TABLES:
-        task_id = f"extract_landing.extract_{table['source']}"
+        task_id = f"lane_{table['source']}.extract_{table['source']}"
         try:
             result = ti.xcom_pull(task_ids=task_id)
             results[table['source']] = result
@@ -145,22 +159,24 @@ with DAG(
         """
     )
 
-    # Extract landing tables
-    with TaskGroup(group_id='extract_landing') as extract_group:
-        for table in MONTHLY_TABLES:
-            DB2ExtractOperator(
+    # One lane per table: extract >> quality >> CDC
+    dimension_lanes, other_lanes = [], []
+    for table in MONTHLY_TABLES:
+        with TaskGroup(group_id=f"lane_{table['source']}") as lane:
+            extract_task = DB2ExtractOperator(
                 task_id=f"extract_{table['source']}",
                 source_table=table['source'],
                 target_table=table['target'],
                 extraction_type='monthly',
+                watermark_column=table.get('watermark'),
                 batch_size=50000,  # Larger batches for monthly
-                pool='db2_extraction_pool',
+                prefetch_batches=2,  # Read the next batches from DB2 while writing
+                load_strategy=table.get('load_strategy', DEFAULT_LOAD_STRATEGY),
+                pool=DB2_POOL,
             )
 
-    # Quality checks with stricter thresholds for monthly
-    with TaskGroup(group_id='quality_checks') as quality_group:
-        for table in MONTHLY_TABLES:
-            DataQualityCheckOperator(
+            # Quality checks with stricter thresholds for monthly
+            quality_task = DataQualityCheckOperator(
                 task_id=f"quality_{table['target']}",
                 table_name=f"landing.{table['target']}",
                 checks=[
@@ -181,20 +197,27 @@ with DAG(
                         'columns': table['key_cols'],
                         'max_null_percentage': 0  # Keys should never be null
                     }
-                ]
+                ],
+                pool=MSSQL_POOL,
             )
 
-    # CDC to staging
-    with TaskGroup(group_id='transform_staging') as transform_group:
-        for table in MONTHLY_TABLES:
-            DB2ToMSSQLCDCOperator(
+            # CDC to staging
+            cdc_task = DB2ToMSSQLCDCOperator(
                 task_id=f"cdc_{table['source']}",
                 source_table=table['source'],
                 landing_table=table['target'],
                 staging_table=table['staging'],
                 key_columns=table['key_cols'],
-                pool='mssql_transform_pool',
+                load_strategy=table.get('load_strategy', DEFAULT_LOAD_STRATEGY),
+                rehash_current=table.get('rehash_current', False),
+                pool=MSSQL_POOL,
             )
+            extract_task >> quality_task >> cdc_task
+
+        if table['staging'] in DIMENSION_STAGING_TABLES:
+            dimension_lanes.append(lane)
+        else:
+            other_lanes.append(lane)
 
     # Refresh reporting dimensions with full rebuild
     refresh_dimensions = MsSqlOperator(
@@ -326,6 +349,7 @@ with DAG(
     # Dependencies
     start >> check_run
     check_run >> skip_extraction >> end
-    check_run >> proceed_extraction >> archive_previous >> extract_group
-    extract_group >> quality_group >> transform_group >> refresh_dimensions
-    refresh_dimensions >> generate_snapshots >> send_summary >> clear_force_flag >> end
+    check_run >> proceed_extraction >> archive_previous >> dimension_lanes + other_lanes
+    dimension_lanes >> refresh_dimensions >> generate_snapshots >> send_summary
+    other_lanes >> send_summary
+    send_summary >> clear_force_flag >> end
@@ -3,18 +3,133 @@ FleetAI - DB2 for i (IBM Power10) ODBC Operator for Airflow
 Provides operators for extracting data from IBM i DB2 via ODBC
 """
 
-from typing import Any, Optional, Sequence
-import hashlib
+from typing import Any, Iterable, Iterator, Optional, Sequence
 import logging
+import queue
+import threading
+import time
 from datetime import datetime
+from decimal import Decimal, InvalidOperation
 
 from airflow.models import BaseOperator
 from airflow.providers.odbc.hooks.odbc import OdbcHook
 from airflow.providers.microsoft.mssql.hooks.mssql import MsSqlHook
 from airflow.utils.decorators import apply_defaults
 
+from mssql_bulk_insert import DEFAULT_LOAD_STRATEGY, prepare_cursor, pyodbc, target_input_sizes
+from row_fingerprint import FINGERPRINT_BYTES, fingerprint_rows, sql_fingerprint_expression
+
 logger = logging.getLogger(__name__)
 
+_END_OF_STREAM = object()
+
+# Columns the landing tables add to the source columns
+LANDING_METADATA_COLUMNS = ('extraction_id', 'extraction_timestamp', 'row_hash')
+
+
+class _ProducerError:
+    """Wraps an exception raised in the prefetch thread"""
+
+    def __init__(self, error: BaseException) -> None:
+        self.error = error
+
+
+def prefetch(items: Iterable, depth: int) -> Iterator:
+    """
+    Iterate over `items` in a background thread, keeping at most `depth`
+    items buffered, so the producer (DB2 reads) overlaps the consumer
+    (MSSQL writes) without holding more than depth + 2 items in memory.
+
+    Errors in the producer are re-raised in the consumer; when the consumer
+    stops early the producer is told to stop and `items` is closed.
+    """
+    buffer: queue.Queue = queue.Queue(maxsize=max(1, depth))
+    stop = threading.Event()
+
+    def put(item: Any) -> bool:
+        while not stop.is_set():
+            try:
+                buffer.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce() -> None:
+        try:
+            for item in items:
+                if not put(item):
+                    return
+            put(_END_OF_STREAM)
+        except BaseException as e:
+            put(_ProducerError(e))
+        finally:
+            close = getattr(items, 'close', None)
+            if close is not None:
+                close()
+
+    producer = threading.Thread(target=produce, name='db2-prefetch', daemon=True)
+    producer.start()
+    try:
+        while True:
+            item = buffer.get()
+            if item is _END_OF_STREAM:
+                return
+            if isinstance(item, _ProducerError):
+                raise item.error
+            yield item
+    finally:
+        stop.set()
+        producer.join(timeout=30)
+
+
+def fetch_batches(hook: Any, query: str, batch_size: int, parameters: Optional[tuple] = None) -> Iterator:
+    """
+    Yield the column names, then lists of up to batch_size rows from a
+    server-side cursor (DB2 or MSSQL). The connection is opened by whichever
+    thread starts iterating, so it can run as a prefetch producer.
+    """
+    conn = hook.get_conn()
+    try:
+        cursor = conn.cursor()
+        cursor.arraysize = batch_size
+        if parameters:
+            cursor.execute(query, parameters)
+        else:
+            cursor.execute(query)
+        yield [col[0] for col in cursor.description]
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield rows
+        cursor.close()
+    finally:
+        conn.close()
+
+
+def format_watermark(value: Any) -> str:
+    """Text form of a watermark for landing.etl_extraction_log"""
+    if isinstance(value, datetime):
+        return value.isoformat(sep=' ')
+    return str(value)
+
+
+def parse_watermark(text: str) -> Any:
+    """Watermark text back to a sequence number or timestamp for binding"""
+    try:
+        return int(text)
+    except ValueError:
+        pass
+    try:
+        return datetime.fromisoformat(text)
+    except ValueError:
+        pass
+    try:
+        return Decimal(text)
+    except InvalidOperation:
+        return text
+
 
 class DB2ExtractOperator(BaseOperator):
     """
@@ -25,8 +140,15 @@ class DB2ExtractOperator(BaseOperator):
     :param db2_conn_id: Airflow connection ID for DB2 ODBC
     :param mssql_conn_id: Airflow connection ID for MSSQL
     :param columns: List of columns to extract (None = all)
-    :param batch_size: Number of rows per batch insert
+    :param batch_size: Number of rows fetched from DB2 and inserted per batch
     :param extraction_type: 'daily' or 'monthly'
+    :param prefetch_batches: Batches read ahead from DB2 in a background thread
+        while the previous batch is written (0 = read and write in turn)
+    :param load_strategy: 'fast_executemany' (typed parameter arrays) or
+        'executemany' for the landing inserts
+    :param watermark_column: Ascending source column (change timestamp or
+        sequence). When set, only rows at or past the highest value of the
+        last successful extraction are read; None = full table copy
     """
 
     template_fields: Sequence[str] = ('source_table', 'target_table')
@@ -42,6 +164,9 @@ class DB2ExtractOperator(BaseOperator):
         columns: Optional[list] = None,
         batch_size: int = 10000,
         extraction_type: str = 'daily',
+        prefetch_batches: int = 0,
+        load_strategy: str = DEFAULT_LOAD_STRATEGY,
+        watermark_column: Optional[str] = None,
         **kwargs
     ) -> None:
         super().__init__(**kwargs)
@@ -52,56 +177,108 @@ class DB2ExtractOperator(BaseOperator):
         self.columns = columns
         self.batch_size = batch_size
         self.extraction_type = extraction_type
+        self.prefetch_batches = prefetch_batches
+        self.load_strategy = load_strategy
+        self.watermark_column = watermark_column
 
     def execute(self, context: Any) -> dict:
-        """Execute the extraction"""
+        """
+        Execute the extraction.
+
+        Rows are streamed from a DB2 cursor with fetchmany(batch_size) and
+        written through a single MSSQL connection, committing per batch, so
+        memory use depends on batch_size rather than on the table size.
+        Every row gets the extraction start as extraction_timestamp. The
+        extraction_id range of the inserted rows is stored in the log, which
+        is how DB2ToMSSQLCDCOperator finds the rows of this extraction.
+        """
         extraction_start = datetime.utcnow()
         log_id = None
 
         try:
-            # Log extraction start
-            log_id = self._log_extraction_start()
-
             # Get hooks
             db2_hook = OdbcHook(odbc_conn_id=self.db2_conn_id)
             mssql_hook = MsSqlHook(mssql_conn_id=self.mssql_conn_id)
 
-            # Build SELECT query
-            columns_str = ', '.join(self.columns) if self.columns else '*'
-            source_query = f"SELECT {columns_str} FROM {self.source_table}"
+            previous_watermark = self._last_watermark(mssql_hook) if self.watermark_column else None
 
-            logger.info(f"Extracting from DB2: {source_query}")
+            # Log extraction start
+            log_id = self._log_extraction_start(extraction_start)
 
-            # Execute query and fetch all data
-            source_data = db2_hook.get_records(source_query)
-            source_row_count = len(source_data)
+            # Build SELECT query
+            columns = list(self.columns) if self.columns else None
+            if columns and self.watermark_column and self.watermark_column not in columns:
+                columns.append(self.watermark_column)
+            columns_str = ', '.join(columns) if columns else '*'
+            source_query = f"SELECT {columns_str} FROM {self.source_table}"
+            parameters = None
+            if previous_watermark is not None:
+                # >= rather than >: rows committed later with the boundary
+                # value are not lost; re-read rows are unchanged for the CDC
+                source_query += f" WHERE {self.watermark_column} >= ?"
+                parameters = (parse_watermark(previous_watermark),)
 
-            logger.info(f"Fetched {source_row_count} rows from {self.source_table}")
+            logger.info(f"Extracting from DB2: {source_query} {parameters or ''}")
 
-            if source_row_count == 0:
-                self._log_extraction_end(log_id, 0, 0, 'success')
-                return {'source_rows': 0, 'extracted_rows': 0}
+            batches = fetch_batches(db2_hook, source_query, self.batch_size, parameters)
+            if self.prefetch_batches > 0:
+                batches = prefetch(batches, self.prefetch_batches)
 
-            # Get column names from cursor
-            cursor_description = db2_hook.get_cursor().description
-            column_names = [col[0] for col in cursor_description] if cursor_description else self.columns
+            # The first item is the column list from the cursor description
+            column_names = next(batches)
+            insert_sql = self._insert_sql(column_names, extraction_start)
+            watermark_index = self._watermark_index(column_names)
+            watermark = None
 
-            # Insert into MSSQL landing table in batches
             extracted_count = 0
-            for i in range(0, source_row_count, self.batch_size):
-                batch = source_data[i:i + self.batch_size]
-                self._insert_batch(mssql_hook, batch, column_names)
-                extracted_count += len(batch)
-                logger.info(f"Inserted batch {i // self.batch_size + 1}: {extracted_count}/{source_row_count}")
-
-            # Log success
-            self._log_extraction_end(log_id, source_row_count, extracted_count, 'success')
+            batch_number = 0
+            conn = mssql_hook.get_conn()
+            try:
+                cursor = conn.cursor()
+                # One extract per landing table at a time, so the identity
+                # values above the current maximum are this extraction's rows
+                first_id = self._max_extraction_id(cursor) + 1
+                strategy = prepare_cursor(
+                    cursor, self.load_strategy,
+                    self._input_sizes(cursor, 'landing', self.target_table, column_names)
+                )
+                logger.info(f"Loading landing.{self.target_table} with {strategy}")
+                for batch in batches:
+                    self._insert_batch(cursor, insert_sql, batch)
+                    conn.commit()
+                    extracted_count += len(batch)
+                    if watermark_index is not None:
+                        watermark = self._max_value(batch, watermark_index, watermark)
+                    batch_number += 1
+                    logger.info(f"Inserted batch {batch_number}: {extracted_count} rows")
+                last_id = self._max_extraction_id(cursor)
+                cursor.close()
+            finally:
+                batches.close()
+                conn.close()
+
+            logger.info(
+                f"Extracted {extracted_count} rows from {self.source_table} in "
+                f"{(datetime.utcnow() - extraction_start).total_seconds():.1f}s"
+            )
+
+            new_watermark = format_watermark(watermark) if watermark is not None else previous_watermark
+
+            # Every fetched row is inserted, so source and extracted counts match
+            self._log_extraction_end(
+                log_id, extracted_count, extracted_count, 'success',
+                watermark_value=new_watermark, extraction_ids=(first_id, last_id)
+            )
 
             return {
-                'source_rows': source_row_count,
+                'source_rows': extracted_count,
                 'extracted_rows': extracted_count,
                 'source_table': self.source_table,
-                'target_table': self.target_table
+                'target_table': self.target_table,
+                'extraction_timestamp': extraction_start.isoformat(),
+                'watermark_column': self.watermark_column,
+                'watermark_from': previous_watermark,
+                'watermark_to': new_watermark
             }
 
         except Exception as e:
@@ -110,42 +287,73 @@ class DB2ExtractOperator(BaseOperator):
                 self._log_extraction_end(log_id, 0, 0, 'failed', str(e))
             raise
 
-    def _insert_batch(self, hook: MsSqlHook, batch: list, columns: list) -> None:
-        """Insert a batch of records into MSSQL"""
-        if not batch:
-            return
-
+    def _insert_sql(self, columns: list, extraction_timestamp: datetime) -> str:
         placeholders = ', '.join(['?' for _ in columns])
         columns_str = ', '.join(columns)
-
-        insert_sql = f"""
-            INSERT INTO landing.{self.target_table} ({columns_str})
-            VALUES ({placeholders})
+        # One timestamp for the whole extraction, inlined rather than bound per row
+        timestamp = extraction_timestamp.isoformat(timespec='microseconds')
+        return f"""
+            INSERT INTO landing.{self.target_table} ({columns_str}, extraction_timestamp)
+            VALUES ({placeholders}, CONVERT(DATETIME2, '{timestamp}', 126))
         """
 
-        conn = hook.get_conn()
-        cursor = conn.cursor()
-        try:
-            cursor.executemany(insert_sql, batch)
-            conn.commit()
-        finally:
-            cursor.close()
+    def _max_extraction_id(self, cursor: Any) -> int:
+        cursor.execute(f"SELECT ISNULL(MAX(extraction_id), 0) FROM landing.{self.target_table}")
+        return cursor.fetchone()[0]
+
+    def _watermark_index(self, columns: list) -> Optional[int]:
+        if not self.watermark_column:
+            return None
+        names = [c.upper() for c in columns]
+        return names.index(self.watermark_column.upper())
+
+    @staticmethod
+    def _max_value(batch: list, index: int, current: Any) -> Any:
+        values = [row[index] for row in batch if row[index] is not None]
+        if not values:
+            return current
+        highest = max(values)
+        return highest if current is None or highest > current else current
+
+    def _last_watermark(self, hook: MsSqlHook) -> Optional[str]:
+        """Highest watermark of the last successful extraction of this table"""
+        row = hook.get_first("""
+            SELECT TOP 1 watermark_value
+            FROM landing.etl_extraction_log
+            WHERE table_name = ? AND watermark_column = ?
+              AND status = 'success' AND watermark_value IS NOT NULL
+            ORDER BY log_id DESC
+        """, parameters=(self.target_table, self.watermark_column))
+        return row[0] if row else None
+
+    def _input_sizes(self, cursor: Any, schema: str, table: str, columns: list) -> Optional[list]:
+        """Typed input sizes of the target columns, needed for fast_executemany only"""
+        if self.load_strategy != 'fast_executemany' or not hasattr(cursor, 'fast_executemany'):
+            return None
+        return target_input_sizes(cursor, schema, table, columns)
+
+    def _insert_batch(self, cursor: Any, insert_sql: str, batch: list) -> None:
+        """Insert a batch of records into MSSQL on a cursor set up by prepare_cursor"""
+        if not batch:
+            return
+        cursor.executemany(insert_sql, batch)
 
-    def _log_extraction_start(self) -> int:
+    def _log_extraction_start(self, extraction_start: datetime) -> int:
         """Log extraction start to tracking table"""
         mssql_hook = MsSqlHook(mssql_conn_id=self.mssql_conn_id)
 
         sql = """
             INSERT INTO landing.etl_extraction_log
-            (table_name, extraction_type, extraction_start, status)
+            (table_name, extraction_type, extraction_start, status, watermark_column)
             OUTPUT INSERTED.log_id
-            VALUES (?, ?, GETUTCDATE(), 'running')
+            VALUES (?, ?, ?, 'running', ?)
         """
 
         conn = mssql_hook.get_conn()
         cursor = conn.cursor()
         try:
-            cursor.execute(sql, (self.target_table, self.extraction_type))
+            cursor.execute(sql, (self.target_table, self.extraction_type,
+                                 extraction_start, self.watermark_column))
             log_id = cursor.fetchone()[0]
             conn.commit()
             return log_id
@@ -158,9 +366,14 @@ class DB2ExtractOperator(BaseOperator):
         source_count: int,
         extracted_count: int,
         status: str,
-        error_message: Optional[str] = None
+        error_message: Optional[str] = None,
+        watermark_value: Optional[str] = None,
+        extraction_ids: Optional[tuple] = None
     ) -> None:
-        """Update extraction log with results"""
+        """
+        Update extraction log with results. extraction_ids is the (first, last)
+        extraction_id of the landing rows inserted; first > last when none were.
+        """
         mssql_hook = MsSqlHook(mssql_conn_id=self.mssql_conn_id)
 
         sql = """
@@ -169,14 +382,19 @@ class DB2ExtractOperator(BaseOperator):
                 source_row_count = ?,
                 extracted_row_count = ?,
                 status = ?,
-                error_message = ?
+                error_message = ?,
+                watermark_value = ?,
+                first_extraction_id = ?,
+                last_extraction_id = ?
             WHERE log_id = ?
         """
 
         conn = mssql_hook.get_conn()
         cursor = conn.cursor()
         try:
-            cursor.execute(sql, (source_count, extracted_count, status, error_message, log_id))
+            first_id, last_id = extraction_ids or (None, None)
+            cursor.execute(sql, (source_count, extracted_count, status, error_message,
+                                 watermark_value, first_id, last_id, log_id))
             conn.commit()
         finally:
             cursor.close()
@@ -184,15 +402,27 @@ class DB2ExtractOperator(BaseOperator):
 
 class DB2ToMSSQLCDCOperator(BaseOperator):
     """
-    Operator that performs CDC (Change Data Capture) logic:
-    - Compares source data hash with existing landing data
-    - Skip unchanged, Update modified, Insert new records
+    Operator that performs CDC (Change Data Capture) logic as SCD Type 2:
+    - Reads the landing rows of the table's last successful extraction
+      (or the whole DB2 table when from_landing is False)
+    - Bulk loads that snapshot with row fingerprints into a temp table
+    - Closes current staging rows whose hash changed, in one UPDATE
+    - Inserts new versions for new and changed keys, in one INSERT
+    Unchanged rows are left alone; change detection runs in SQL Server.
 
     :param source_table: Source table in DB2
     :param landing_table: Landing table in MSSQL
     :param staging_table: Staging table in MSSQL
     :param key_columns: List of columns that form the business key
-    :param compare_columns: Columns to include in hash comparison
+    :param compare_columns: Columns to include in hash comparison (default: all)
+    :param batch_size: Number of rows read and loaded per batch
+    :param load_strategy: 'fast_executemany' (typed parameter arrays) or
+        'executemany' for loading the snapshot
+    :param from_landing: Read the rows just extracted by DB2ExtractOperator
+        instead of reading the source table from DB2 again
+    :param rehash_current: Recompute source_hash of the current staging rows
+        in SQL before comparing (once, after the fingerprint encoding changed,
+        so unchanged rows do not all get a new version)
     """
 
     template_fields: Sequence[str] = ('source_table', 'landing_table', 'staging_table')
@@ -208,6 +438,10 @@ class DB2ToMSSQLCDCOperator(BaseOperator):
         compare_columns: Optional[list] = None,
         db2_conn_id: str = 'db2_iseries',
         mssql_conn_id: str = 'mssql_fleetai',
+        batch_size: int = 10000,
+        load_strategy: str = DEFAULT_LOAD_STRATEGY,
+        from_landing: bool = True,
+        rehash_current: bool = False,
         **kwargs
     ) -> None:
         super().__init__(**kwargs)
@@ -218,6 +452,10 @@ class DB2ToMSSQLCDCOperator(BaseOperator):
         self.compare_columns = compare_columns
         self.db2_conn_id = db2_conn_id
         self.mssql_conn_id = mssql_conn_id
+        self.batch_size = batch_size
+        self.load_strategy = load_strategy
+        self.from_landing = from_landing
+        self.rehash_current = rehash_current
 
     def execute(self, context: Any) -> dict:
         """Execute CDC transformation"""
@@ -232,137 +470,204 @@ class DB2ToMSSQLCDCOperator(BaseOperator):
             'staging_table': self.staging_table
         }
 
-        # Fetch source data
-        source_query = f"SELECT * FROM {self.source_table}"
-        source_records = db2_hook.get_records(source_query)
-
-        if not source_records:
-            logger.info(f"No records found in {self.source_table}")
-            return stats
-
-        # Get column names
-        cursor_description = db2_hook.get_cursor().description
-        columns = [col[0] for col in cursor_description]
-
-        # Build key index
-        key_indices = [columns.index(k) for k in self.key_columns]
-
-        # Get existing staging data hashes
-        existing_hashes = self._get_existing_hashes(mssql_hook)
-
-        # Process each record
-        inserts = []
-        updates = []
-
-        for record in source_records:
-            # Build business key
-            key = tuple(record[i] for i in key_indices)
-            key_str = '|'.join(str(v) for v in key)
-
-            # Calculate hash
-            hash_input = '|'.join(str(v) if v is not None else '' for v in record)
-            record_hash = hashlib.sha256(hash_input.encode()).hexdigest()
+        if self.from_landing:
+            batches = self._landing_batches(mssql_hook)
+            if batches is None:
+                logger.warning(f"No successful extraction of landing.{self.landing_table} to process")
+                return stats
+        else:
+            batches = fetch_batches(db2_hook, f"SELECT * FROM {self.source_table}", self.batch_size)
+        columns = next(batches)
+        compare_indices = [
+            columns.index(c) for c in (self.compare_columns or columns)
+        ]
 
-            existing_hash = existing_hashes.get(key_str)
-
-            if existing_hash is None:
-                # New record
-                inserts.append((record, record_hash))
-                stats['inserts'] += 1
-            elif existing_hash != record_hash:
-                # Modified record
-                updates.append((record, record_hash, key))
-                stats['updates'] += 1
-            else:
-                # Unchanged
-                stats['unchanged'] += 1
-
-        # Execute inserts
-        if inserts:
-            self._execute_inserts(mssql_hook, inserts, columns)
+        conn = mssql_hook.get_conn()
+        try:
+            cursor = conn.cursor()
+            self._create_snapshot_table(cursor, columns)
+
+            # Load the source snapshot with its fingerprints
+            load_cursor = conn.cursor()
+            self._prepare_load_cursor(load_cursor, columns)
+            load_sql = self._snapshot_insert_sql(columns)
+            source_count = 0
+            for batch in batches:
+                hashes = fingerprint_rows(batch, compare_indices)
+                load_cursor.executemany(
+                    load_sql,
+                    [(*record, source_hash) for record, source_hash in zip(batch, hashes)]
+                )
+                source_count += len(batch)
+            load_cursor.close()
+
+            if source_count == 0:
+                logger.info(f"No records found in {self.source_table}")
+                conn.rollback()
+                return stats
+
+            logger.info(f"Loaded {source_count} source rows into the CDC snapshot")
+            if self.rehash_current:
+                self._rehash_current_rows(cursor, [columns[i] for i in compare_indices])
+            closed, inserted = self._merge_snapshot(cursor, columns)
+            conn.commit()
+            cursor.close()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            batches.close()
+            conn.close()
 
-        # Execute updates
-        if updates:
-            self._execute_updates(mssql_hook, updates, columns)
+        stats['updates'] = closed
+        stats['inserts'] = inserted - closed
+        stats['unchanged'] = source_count - inserted
 
         logger.info(f"CDC Complete: {stats}")
         return stats
 
-    def _get_existing_hashes(self, hook: MsSqlHook) -> dict:
-        """Get existing record hashes from staging table"""
-        key_concat = "CONCAT_WS('|', " + ', '.join(self.key_columns) + ")"
-
-        sql = f"""
-            SELECT {key_concat} as business_key,
-                   CONVERT(VARCHAR(64), source_hash, 2) as hash_value
-            FROM staging.{self.staging_table}
-            WHERE is_current = 1
+    def _landing_batches(self, hook: MsSqlHook) -> Optional[Iterator]:
+        """
+        Batches of the source columns of the last successful extraction, found
+        by the extraction_id range it logged (integers compare exactly, unlike
+        timestamps bound through the driver)
         """
+        row = hook.get_first("""
+            SELECT TOP 1 log_id, first_extraction_id, last_extraction_id
+            FROM landing.etl_extraction_log
+            WHERE table_name = ? AND status = 'success'
+              AND first_extraction_id IS NOT NULL
+            ORDER BY log_id DESC
+        """, parameters=(self.landing_table,))
+        if not row:
+            return None
+        log_id, first_id, last_id = row
+
+        columns = [
+            r[0] for r in hook.get_records("""
+                SELECT COLUMN_NAME
+                FROM INFORMATION_SCHEMA.COLUMNS
+                WHERE TABLE_SCHEMA = 'landing' AND TABLE_NAME = ?
+                ORDER BY ORDINAL_POSITION
+            """, parameters=(self.landing_table,))
+            if r[0] not in LANDING_METADATA_COLUMNS
+        ]
+        logger.info(
+            f"Reading landing.{self.landing_table} rows {first_id}-{last_id} of extraction log {log_id}"
+        )
+        return fetch_batches(
+            hook,
+            f"""
+                SELECT {', '.join(columns)}
+                FROM landing.{self.landing_table}
+                WHERE extraction_id BETWEEN ? AND ?
+            """,
+            self.batch_size,
+            (first_id, last_id)
+        )
+
+    def _rehash_current_rows(self, cursor: Any, hash_columns: list) -> None:
+        """Recompute source_hash of the current staging rows in SQL Server"""
+        cursor.execute("""
+            SELECT COLUMN_NAME, DATA_TYPE, NUMERIC_SCALE
+            FROM INFORMATION_SCHEMA.COLUMNS
+            WHERE TABLE_SCHEMA = 'staging' AND TABLE_NAME = ?
+        """, (self.staging_table,))
+        types = {row[0].lower(): (row[1], row[2]) for row in cursor.fetchall()}
+        expression = sql_fingerprint_expression(
+            [(c, *types[c.lower()]) for c in hash_columns]
+        )
+        cursor.execute(f"""
+            UPDATE staging.{self.staging_table}
+            SET source_hash = {expression}
+            WHERE is_current = 1
+        """)
+        logger.info(f"Recomputed source_hash of {cursor.rowcount} current rows in staging.{self.staging_table}")
 
-        records = hook.get_records(sql)
-        return {r[0]: r[1] for r in records}
+    def _key_join(self, left: str, right: str) -> str:
+        return ' AND '.join(f"{left}.{k} = {right}.{k}" for k in self.key_columns)
 
-    def _execute_inserts(self, hook: MsSqlHook, records: list, columns: list) -> None:
-        """Insert new records into staging"""
-        # Build INSERT statement
+    def _create_snapshot_table(self, cursor: Any, columns: list) -> None:
+        """#cdc_snapshot: the staging table's column types plus the fingerprint"""
+        col_list = ', '.join(columns)
+        cursor.execute(f"""
+            SELECT TOP 0 {col_list}
+            INTO #cdc_snapshot
+            FROM staging.{self.staging_table}
+        """)
+        cursor.execute(f"ALTER TABLE #cdc_snapshot ADD source_hash VARBINARY({FINGERPRINT_BYTES}) NOT NULL")
+
+    def _prepare_load_cursor(self, cursor: Any, columns: list) -> None:
+        input_sizes = None
+        if self.load_strategy == 'fast_executemany' and hasattr(cursor, 'fast_executemany'):
+            # The snapshot has the staging columns' types
+            input_sizes = target_input_sizes(cursor, 'staging', self.staging_table, columns)
+            input_sizes.append(
+                (pyodbc.SQL_VARBINARY, FINGERPRINT_BYTES, 0) if pyodbc is not None else None
+            )
+        prepare_cursor(cursor, self.load_strategy, input_sizes)
+
+    def _snapshot_insert_sql(self, columns: list) -> str:
         col_list = ', '.join(columns)
         placeholders = ', '.join(['?' for _ in columns])
-
-        insert_sql = f"""
-            INSERT INTO staging.{self.staging_table}
-            ({col_list}, source_hash, valid_from, is_current)
-            VALUES ({placeholders}, HASHBYTES('SHA2_256', ?), GETUTCDATE(), 1)
+        return f"""
+            INSERT INTO #cdc_snapshot ({col_list}, source_hash)
+            VALUES ({placeholders}, ?)
         """
 
-        conn = hook.get_conn()
-        cursor = conn.cursor()
-        try:
-            for record, hash_val in records:
-                hash_input = '|'.join(str(v) if v is not None else '' for v in record)
-                cursor.execute(insert_sql, (*record, hash_input))
-            conn.commit()
-        finally:
-            cursor.close()
-
-    def _execute_updates(self, hook: MsSqlHook, records: list, columns: list) -> None:
-        """Update existing records using SCD Type 2"""
-        conn = hook.get_conn()
-        cursor = conn.cursor()
+    def _merge_snapshot(self, cursor: Any, columns: list) -> tuple:
+        """
+        Close changed current rows, then insert a current row for every key
+        without one (new keys and the keys just closed).
+        Returns (rows closed, rows inserted).
+        """
+        key_list = ', '.join(self.key_columns)
+        cursor.execute(f"CREATE CLUSTERED INDEX ix_cdc_snapshot_key ON #cdc_snapshot ({key_list})")
+
+        now = datetime.utcnow()
+        cursor.execute(f"""
+            UPDATE s
+            SET valid_to = ?, is_current = 0
+            FROM staging.{self.staging_table} s
+            INNER JOIN #cdc_snapshot n ON {self._key_join('s', 'n')}
+            WHERE s.is_current = 1
+              AND (s.source_hash <> n.source_hash OR s.source_hash IS NULL)
+        """, (now,))
+        closed = cursor.rowcount
 
-        try:
-            for record, hash_val, key in records:
-                # Close existing record
-                key_conditions = ' AND '.join([f"{k} = ?" for k in self.key_columns])
-                close_sql = f"""
-                    UPDATE staging.{self.staging_table}
-                    SET valid_to = GETUTCDATE(), is_current = 0
-                    WHERE {key_conditions} AND is_current = 1
-                """
-                cursor.execute(close_sql, key)
-
-                # Insert new version
-                col_list = ', '.join(columns)
-                placeholders = ', '.join(['?' for _ in columns])
-                hash_input = '|'.join(str(v) if v is not None else '' for v in record)
-
-                insert_sql = f"""
-                    INSERT INTO staging.{self.staging_table}
-                    ({col_list}, source_hash, valid_from, is_current)
-                    VALUES ({placeholders}, HASHBYTES('SHA2_256', ?), GETUTCDATE(), 1)
-                """
-                cursor.execute(insert_sql, (*record, hash_input))
+        col_list = ', '.join(columns)
+        cursor.execute(f"""
+            INSERT INTO staging.{self.staging_table}
+            ({col_list}, source_hash, valid_from, is_current)
+            SELECT {', '.join(f'n.{c}' for c in columns)}, n.source_hash, ?, 1
+            FROM #cdc_snapshot n
+            WHERE NOT EXISTS (
+                SELECT 1 FROM staging.{self.staging_table} s
+                WHERE {self._key_join('s', 'n')} AND s.is_current = 1
+            )
+        """, (now,))
+        inserted = cursor.rowcount
 
-            conn.commit()
-        finally:
-            cursor.close()
+        cursor.execute("DROP TABLE #cdc_snapshot")
+        return closed, inserted
 
 
 class DataQualityCheckOperator(BaseOperator):
     """
     Operator to perform data quality checks on extracted data.
 
+    All row count, null and freshness checks of a table are compiled into
+    one aggregate query (one table scan); each duplicate check adds one
+    GROUP BY query. Tables above sample_threshold_rows take their null
+    percentages from a TABLESAMPLE and their row count from partition
+    metadata; freshness and duplicates always read the full table.
+    Each result reports the query it came from and that query's cost.
+
     :param table_name: Table to check
     :param checks: List of check configurations
+    :param sample_threshold_rows: Sample null checks on tables with more rows
+        than this (None = never sample)
+    :param sample_percent: TABLESAMPLE percentage used when sampling
     """
 
     template_fields: Sequence[str] = ('table_name',)
@@ -374,34 +679,83 @@ class DataQualityCheckOperator(BaseOperator):
         table_name: str,
         checks: list,
         mssql_conn_id: str = 'mssql_fleetai',
+        sample_threshold_rows: Optional[int] = None,
+        sample_percent: float = 10,
         **kwargs
     ) -> None:
         super().__init__(**kwargs)
         self.table_name = table_name
         self.checks = checks
         self.mssql_conn_id = mssql_conn_id
+        self.sample_threshold_rows = sample_threshold_rows
+        self.sample_percent = sample_percent
 
     def execute(self, context: Any) -> dict:
         """Execute data quality checks"""
         hook = MsSqlHook(mssql_conn_id=self.mssql_conn_id)
-        results = []
+        queries = {}
+
+        metadata_rows = None
+        if self.sample_threshold_rows is not None:
+            try:
+                row = self._run_query(hook, queries, 'metadata_row_count', f"""
+                    SELECT SUM(row_count)
+                    FROM sys.dm_db_partition_stats
+                    WHERE object_id = OBJECT_ID('{self.table_name}') AND index_id IN (0, 1)
+                """)
+                metadata_rows = row[0] if row else None
+            except Exception as e:
+                # e.g. no VIEW DATABASE STATE permission: check the full table
+                logger.warning(f"Row count metadata unavailable, not sampling: {e}")
+        sampled = metadata_rows is not None and metadata_rows > self.sample_threshold_rows
+
+        # Compile the scan-based checks into the full and the sampled aggregate
+        full_exprs, sample_exprs = [], []
+        for i, check in enumerate(self.checks):
+            check_type = check.get('type')
+            if check_type == 'row_count' and not sampled:
+                full_exprs.append("COUNT_BIG(*) AS row_total")
+            elif check_type == 'null_check':
+                target = sample_exprs if sampled else full_exprs
+                target.append("COUNT_BIG(*) AS row_total")
+                for j, col in enumerate(check.get('columns', [])):
+                    target.append(f"SUM(CASE WHEN {col} IS NULL THEN 1 ELSE 0 END) AS null_{i}_{j}")
+            elif check_type == 'freshness':
+                col = check.get('timestamp_column', 'extraction_timestamp')
+                full_exprs.append(f"MAX({col}) AS latest_{i}")
+                full_exprs.append(f"DATEDIFF(HOUR, MAX({col}), GETUTCDATE()) AS age_{i}")
+
+        aggregates = {}
+        if full_exprs:
+            aggregates['aggregate'] = self._run_aggregate(
+                hook, queries, 'aggregate', full_exprs, f"{self.table_name}"
+            )
+        if sample_exprs:
+            aggregates['sampled_aggregate'] = self._run_aggregate(
+                hook, queries, 'sampled_aggregate', sample_exprs,
+                f"{self.table_name} TABLESAMPLE SYSTEM ({self.sample_percent} PERCENT)"
+            )
 
-        for check in self.checks:
+        results = []
+        for i, check in enumerate(self.checks):
             check_type = check.get('type')
             check_name = check.get('name', check_type)
 
             try:
                 if check_type == 'row_count':
-                    result = self._check_row_count(hook, check)
+                    result = self._check_row_count(check, aggregates, metadata_rows, sampled)
                 elif check_type == 'null_check':
-                    result = self._check_nulls(hook, check)
+                    result = self._check_nulls(check, i, aggregates, sampled)
                 elif check_type == 'duplicate_check':
-                    result = self._check_duplicates(hook, check)
+                    result = self._check_duplicates(hook, queries, check, i)
                 elif check_type == 'freshness':
-                    result = self._check_freshness(hook, check)
+                    result = self._check_freshness(check, i, aggregates)
                 else:
                     result = {'status': 'skipped', 'message': f'Unknown check type: {check_type}'}
 
+                query = result.get('query')
+                if query in queries:
+                    result['cost_ms'] = queries[query]['ms']
                 result['check_name'] = check_name
                 results.append(result)
 
@@ -418,88 +772,117 @@ class DataQualityCheckOperator(BaseOperator):
                 })
 
         logger.info(f"Data quality checks complete: {results}")
-        return {'checks': results}
-
-    def _check_row_count(self, hook: MsSqlHook, check: dict) -> dict:
+        return {'checks': results, 'queries': list(queries.values()), 'sampled': sampled}
+
+    def _run_query(self, hook: MsSqlHook, queries: dict, name: str, sql: str,
+                   records: bool = False) -> Any:
+        """Run one query and record its cost under `name`"""
+        started = time.perf_counter()
+        result = hook.get_records(sql) if records else hook.get_first(sql)
+        queries[name] = {'query': name, 'ms': round((time.perf_counter() - started) * 1000, 1)}
+        return result
+
+    def _run_aggregate(self, hook: MsSqlHook, queries: dict, name: str,
+                       exprs: list, source: str) -> dict:
+        """One scan computing every expression; returns {alias: value} or {'error': ...}"""
+        exprs = list(dict.fromkeys(exprs))
+        sql = f"SELECT {', '.join(exprs)} FROM {source}"
+        try:
+            row = self._run_query(hook, queries, name, sql)
+        except Exception as e:
+            logger.error(f"{name} query failed: {e}")
+            return {'error': str(e)}
+        aliases = [expr.rsplit(' AS ', 1)[1] for expr in exprs]
+        return dict(zip(aliases, row)) if row else {}
+
+    @staticmethod
+    def _aggregate_value(aggregates: dict, query: str, alias: str) -> Any:
+        values = aggregates.get(query, {})
+        if 'error' in values:
+            raise RuntimeError(f"{query} query failed: {values['error']}")
+        return values.get(alias)
+
+    def _check_row_count(self, check: dict, aggregates: dict,
+                         metadata_rows: Optional[int], sampled: bool) -> dict:
         """Check minimum row count"""
         min_count = check.get('min_count', 1)
 
-        sql = f"SELECT COUNT(*) FROM {self.table_name}"
-        result = hook.get_first(sql)
-        count = result[0] if result else 0
+        if sampled:
+            count, query = metadata_rows, 'metadata_row_count'
+        else:
+            count = self._aggregate_value(aggregates, 'aggregate', 'row_total')
+            query = 'aggregate'
+        count = count or 0
 
         return {
             'status': 'passed' if count >= min_count else 'failed',
             'actual': count,
-            'expected_min': min_count
+            'expected_min': min_count,
+            'query': query
         }
 
-    def _check_nulls(self, hook: MsSqlHook, check: dict) -> dict:
+    def _check_nulls(self, check: dict, index: int, aggregates: dict, sampled: bool) -> dict:
         """Check for null values in specified columns"""
         columns = check.get('columns', [])
         max_null_pct = check.get('max_null_percentage', 0)
+        query = 'sampled_aggregate' if sampled else 'aggregate'
 
         results = []
-        for col in columns:
-            sql = f"""
-                SELECT
-                    COUNT(*) as total,
-                    SUM(CASE WHEN {col} IS NULL THEN 1 ELSE 0 END) as null_count
-                FROM {self.table_name}
-            """
-            result = hook.get_first(sql)
-            total, null_count = result if result else (0, 0)
-            null_pct = (null_count / total * 100) if total > 0 else 0
-
-            results.append({
-                'column': col,
-                'null_count': null_count,
-                'null_percentage': null_pct,
-                'passed': null_pct <= max_null_pct
-            })
+        if columns:
+            total = self._aggregate_value(aggregates, query, 'row_total') or 0
+            for j, col in enumerate(columns):
+                null_count = self._aggregate_value(aggregates, query, f"null_{index}_{j}") or 0
+                null_pct = (null_count / total * 100) if total > 0 else 0
+
+                results.append({
+                    'column': col,
+                    'null_count': null_count,
+                    'null_percentage': null_pct,
+                    'passed': null_pct <= max_null_pct
+                })
 
         all_passed = all(r['passed'] for r in results)
         return {
             'status': 'passed' if all_passed else 'failed',
-            'details': results
+            'details': results,
+            'query': query,
+            'sampled': sampled
         }
 
-    def _check_duplicates(self, hook: MsSqlHook, check: dict) -> dict:
+    def _check_duplicates(self, hook: MsSqlHook, queries: dict, check: dict, index: int) -> dict:
         """Check for duplicate records based on key columns"""
         key_columns = check.get('key_columns', [])
         key_str = ', '.join(key_columns)
+        query = f"duplicates_{index}"
 
+        # Group count and a sample in one pass, without fetching every group
         sql = f"""
-            SELECT {key_str}, COUNT(*) as cnt
+            SELECT TOP 5 {key_str}, COUNT(*) as cnt, COUNT(*) OVER () as dup_groups
             FROM {self.table_name}
             GROUP BY {key_str}
             HAVING COUNT(*) > 1
         """
-        duplicates = hook.get_records(sql)
-        dup_count = len(duplicates)
+        duplicates = self._run_query(hook, queries, query, sql, records=True)
+        dup_count = duplicates[0][-1] if duplicates else 0
 
         return {
             'status': 'passed' if dup_count == 0 else 'warning',
             'duplicate_groups': dup_count,
-            'sample_duplicates': duplicates[:5] if duplicates else []
+            'sample_duplicates': [tuple(d[:-1]) for d in duplicates] if duplicates else [],
+            'query': query
         }
 
-    def _check_freshness(self, hook: MsSqlHook, check: dict) -> dict:
+    def _check_freshness(self, check: dict, index: int, aggregates: dict) -> dict:
         """Check data freshness based on timestamp column"""
-        timestamp_column = check.get('timestamp_column', 'extraction_timestamp')
         max_age_hours = check.get('max_age_hours', 24)
 
-        sql = f"""
-            SELECT MAX({timestamp_column}) as latest,
-                   DATEDIFF(HOUR, MAX({timestamp_column}), GETUTCDATE()) as age_hours
-            FROM {self.table_name}
-        """
-        result = hook.get_first(sql)
-        latest, age_hours = result if result else (None, None)
+        latest = self._aggregate_value(aggregates, 'aggregate', f"latest_{index}")
+        age_hours = self._aggregate_value(aggregates, 'aggregate', f"age_{index}")
 
         return {
             'status': 'passed' if age_hours is not None and age_hours <= max_age_hours else 'failed',
             'latest_timestamp': str(latest) if latest else None,
             'age_hours': age_hours,
-            'max_age_hours': max_age_hours
+            'max_age_hours': max_age_hours,
+            'query': 'aggregate'
         }
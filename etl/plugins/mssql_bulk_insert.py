@@ -0,0 +1,100 @@
+"""
+FleetAI - MSSQL Bulk Insert Strategies
+Batch inserts for the landing and staging loads of the DB2 operators.
+
+'fast_executemany' sends a whole batch to SQL Server as one parameter array
+instead of one round trip per row. pyodbc otherwise sizes every parameter
+from the first row's Python values (a NULL or a short string in row one
+breaks or truncates later rows), so the target columns' types are read from
+INFORMATION_SCHEMA and bound with setinputsizes().
+
+'executemany' is the plain DB-API path; use it per table when a target has
+very wide (MAX) columns that are better streamed row by row. Connections
+that do not support fast_executemany (pymssql, sqlite3) fall back to it.
+
+Kept free of Airflow imports so the benchmark can use it directly.
+"""
+
+from typing import Any, Optional, Sequence
+import logging
+
+try:
+    import pyodbc
+except ImportError:  # pyodbc is only needed for typed input sizes
+    pyodbc = None
+
+logger = logging.getLogger(__name__)
+
+LOAD_STRATEGIES = ('executemany', 'fast_executemany')
+DEFAULT_LOAD_STRATEGY = 'fast_executemany'
+
+
+def _sql_type(data_type: str, length: Optional[int], precision: Optional[int],
+              scale: Optional[int]) -> Optional[tuple]:
+    """(pyodbc SQL type, column size, decimal digits) for an INFORMATION_SCHEMA type"""
+    if pyodbc is None:
+        return None
+    data_type = data_type.lower()
+    # -1 is (MAX); size 0 lets the driver stream it
+    length = 0 if length in (None, -1) else length
+
+    if data_type in ('varchar', 'char', 'text'):
+        return (pyodbc.SQL_VARCHAR, length, 0)
+    if data_type in ('nvarchar', 'nchar', 'ntext'):
+        return (pyodbc.SQL_WVARCHAR, length, 0)
+    if data_type in ('decimal', 'numeric', 'money', 'smallmoney'):
+        return (pyodbc.SQL_DECIMAL, precision or 18, scale or 0)
+    if data_type in ('datetime2', 'datetime', 'smalldatetime'):
+        digits = {'datetime2': 7, 'datetime': 3}.get(data_type, 0)
+        return (pyodbc.SQL_TYPE_TIMESTAMP, 20 + digits if digits else 19, digits)
+    simple = {
+        'bigint': pyodbc.SQL_BIGINT,
+        'int': pyodbc.SQL_INTEGER,
+        'smallint': pyodbc.SQL_SMALLINT,
+        'tinyint': pyodbc.SQL_TINYINT,
+        'bit': pyodbc.SQL_BIT,
+        'float': pyodbc.SQL_DOUBLE,
+        'real': pyodbc.SQL_REAL,
+        'date': pyodbc.SQL_TYPE_DATE,
+    }
+    if data_type in simple:
+        return (simple[data_type], 0, 0)
+    # varbinary, uniqueidentifier, ...: leave to pyodbc
+    return None
+
+
+def target_input_sizes(cursor: Any, schema: str, table: str, columns: Sequence[str]) -> list:
+    """
+    Input sizes for inserting `columns` into schema.table, in column order.
+    Unknown columns or types get None (bound from the Python value).
+    """
+    cursor.execute("""
+        SELECT COLUMN_NAME, DATA_TYPE, CHARACTER_MAXIMUM_LENGTH,
+               NUMERIC_PRECISION, NUMERIC_SCALE
+        FROM INFORMATION_SCHEMA.COLUMNS
+        WHERE TABLE_SCHEMA = ? AND TABLE_NAME = ?
+    """, (schema, table))
+    types = {
+        row[0].upper(): _sql_type(row[1], row[2], row[3], row[4])
+        for row in cursor.fetchall()
+    }
+    return [types.get(column.upper()) for column in columns]
+
+
+def prepare_cursor(cursor: Any, strategy: str, input_sizes: Optional[list] = None) -> str:
+    """
+    Configure an open cursor for a load strategy and return the strategy in
+    effect ('executemany' when fast_executemany is not available).
+    """
+    if strategy not in LOAD_STRATEGIES:
+        raise ValueError(f"Unknown load strategy '{strategy}', expected one of {LOAD_STRATEGIES}")
+
+    if strategy == 'fast_executemany':
+        if not hasattr(cursor, 'fast_executemany'):
+            logger.info("Connection does not support fast_executemany, using executemany")
+            return 'executemany'
+        cursor.fast_executemany = True
+        if input_sizes and any(size is not None for size in input_sizes):
+            cursor.setinputsizes(input_sizes)
+    return strategy
+
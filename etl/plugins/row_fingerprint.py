@@ -0,0 +1,162 @@
+"""
+FleetAI - Row Fingerprints
+One 128-bit content hash per row, used for change detection by the CDC
+operator (stored in staging.*.source_hash on MSSQL) and by
+database/scripts/etl_landing_to_staging.py (SQLite, as hex via the SQL
+function etl_row_hash).
+
+Encoding (version 1). Each value becomes a type tag and a normalised text:
+
+    None                    'N'
+    bool                    'B' + '1' / '0'
+    int, Decimal, float     'D' + the number in plain notation, without
+                            trailing fractional zeros ('1.50' -> '1.5',
+                            '100.00' -> '100', -0 -> '0'); floats go
+                            through repr() first, so 1.5 == Decimal('1.5')
+    str                     'S' + the text with trailing blanks removed
+                            (DB2 CHAR padding), '\\' and '|' escaped
+    datetime                'T' + 'YYYY-MM-DD HH:MM:SS.ffffff' (+ UTC offset
+                            when the value has one)
+    date                    'A' + 'YYYY-MM-DD'
+    time                    'H' + 'HH:MM:SS.ffffff'
+    bytes                   'X' + upper-case hex
+
+The fields are joined with '|' (escaped inside strings, so no value can
+shift the fields) and the text is encoded as UTF-16LE, which is how SQL
+Server holds NVARCHAR. The digest is SHA-256 cut to 16 bytes: HASHBYTES
+has no BLAKE2, and at row sizes the cost is in encoding the values, not
+in the hash. sql_fingerprint_expression() builds the same hash as a
+T-SQL expression, so stored hashes can be computed or checked in SQL
+Server. A value of any other type raises TypeError.
+
+The encoding is by value type, not source: a date read as text (SQLite)
+hashes as a string. Each store only compares hashes it computed itself.
+
+Kept free of Airflow imports so the SQLite scripts can use it directly.
+"""
+
+from datetime import date, datetime, time
+from decimal import Decimal
+from operator import itemgetter
+from typing import Any, Iterable, List, Optional, Sequence, Tuple
+import hashlib
+
+FINGERPRINT_BYTES = 16
+FIELD_SEPARATOR = '|'
+
+
+def _number_text(value: Decimal) -> str:
+    if value.is_nan() or value.is_infinite():
+        return str(value)
+    if value == 0:
+        return '0'
+    return format(value.normalize(), 'f')
+
+
+def _string_text(value: str) -> str:
+    return value.rstrip(' ').replace('\\', '\\\\').replace(FIELD_SEPARATOR, '\\' + FIELD_SEPARATOR)
+
+
+def encode_value(value: Any) -> str:
+    """Type tag and normalised text of one value (see the module docstring)"""
+    if value is None:
+        return 'N'
+    if isinstance(value, bool):
+        return 'B1' if value else 'B0'
+    if isinstance(value, (int, Decimal)):
+        return 'D' + _number_text(Decimal(value))
+    if isinstance(value, float):
+        return 'D' + _number_text(Decimal(repr(value)))
+    if isinstance(value, str):
+        return 'S' + _string_text(value)
+    # datetime before date: datetime is a date subclass
+    if isinstance(value, datetime):
+        return 'T' + value.isoformat(sep=' ', timespec='microseconds')
+    if isinstance(value, date):
+        return 'A' + value.isoformat()
+    if isinstance(value, time):
+        return 'H' + value.isoformat(timespec='microseconds')
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return 'X' + bytes(value).hex().upper()
+    raise TypeError(f"No fingerprint encoding for {type(value).__name__} value {value!r}")
+
+
+def encode_row(values: Iterable) -> bytes:
+    """Canonical typed encoding of a row's values"""
+    return FIELD_SEPARATOR.join(map(encode_value, values)).encode('utf-16-le')
+
+
+def fingerprint(values: Iterable) -> bytes:
+    """16-byte fingerprint of one row"""
+    return hashlib.sha256(encode_row(values)).digest()[:FINGERPRINT_BYTES]
+
+
+def fingerprint_hex(*values: Any) -> str:
+    """Hex fingerprint of the arguments (registered as a SQLite function)"""
+    return fingerprint(values).hex()
+
+
+def fingerprint_rows(rows: Iterable[Sequence], indices: Optional[Sequence[int]] = None) -> List[bytes]:
+    """
+    Fingerprints of a batch of rows (tuples, lists or pyodbc Rows), optionally
+    over the columns at `indices` only. Same result as fingerprint() per row.
+    """
+    if indices is None:
+        values = map(tuple, rows)
+    elif len(indices) == 1:
+        index = indices[0]
+        values = ((row[index],) for row in rows)
+    else:
+        values = map(itemgetter(*indices), rows)
+
+    sha256 = hashlib.sha256
+    size = FINGERPRINT_BYTES
+    return [sha256(encode_row(v)).digest()[:size] for v in values]
+
+
+def _sql_field(column: str, data_type: str, numeric_scale: Optional[int]) -> str:
+    """T-SQL for the encoding of one column's value"""
+    data_type = data_type.lower()
+    if data_type == 'bit':
+        text = f"CASE WHEN {column} = 1 THEN N'B1' ELSE N'B0' END"
+    elif data_type in ('tinyint', 'smallint', 'int', 'bigint'):
+        text = f"N'D' + CONVERT(NVARCHAR(20), {column})"
+    elif data_type in ('decimal', 'numeric'):
+        number = f"CONVERT(NVARCHAR(40), {column})"
+        if numeric_scale:
+            # Drop trailing fractional zeros, then a trailing '.'
+            number = f"REPLACE(RTRIM(REPLACE({number}, N'0', N' ')), N' ', N'0')"
+            number = (f"CASE WHEN RIGHT({number}, 1) = N'.' "
+                      f"THEN LEFT({number}, LEN({number}) - 1) ELSE {number} END")
+        text = f"N'D' + {number}"
+    elif data_type in ('char', 'varchar', 'nchar', 'nvarchar', 'text', 'ntext'):
+        text = (f"N'S' + REPLACE(REPLACE(RTRIM(CAST({column} AS NVARCHAR(MAX))), "
+                f"N'\\', N'\\\\'), N'{FIELD_SEPARATOR}', N'\\{FIELD_SEPARATOR}')")
+    elif data_type in ('datetime2', 'smalldatetime'):
+        text = f"N'T' + CONVERT(NVARCHAR(26), CAST({column} AS DATETIME2(6)), 121)"
+    elif data_type == 'date':
+        text = f"N'A' + CONVERT(NVARCHAR(10), {column}, 23)"
+    elif data_type == 'time':
+        text = f"N'H' + CONVERT(NVARCHAR(15), CAST({column} AS TIME(6)))"
+    elif data_type in ('binary', 'varbinary'):
+        text = f"N'X' + CONVERT(NVARCHAR(MAX), {column}, 2)"
+    else:
+        raise TypeError(f"No fingerprint encoding for SQL type {data_type} ({column})")
+    return f"CASE WHEN {column} IS NULL THEN N'N' ELSE {text} END"
+
+
+def sql_fingerprint_expression(columns: Sequence[Tuple[str, str, Optional[int]]]) -> str:
+    """
+    T-SQL expression giving fingerprint() of the named columns, from
+    (column, DATA_TYPE, NUMERIC_SCALE) as in INFORMATION_SCHEMA.COLUMNS.
+    FLOAT/REAL, MONEY and DATETIME columns are not supported: SQL Server has
+    no repr(), converts MONEY at two decimals and holds DATETIME in 1/300 s
+    ticks (.003333 as DATETIME2, .003000 through pyodbc).
+
+    The fields are joined with + onto an NVARCHAR(MAX) (never NULL, see
+    _sql_field), so any number of columns fits; CONCAT takes at most 254
+    arguments.
+    """
+    fields = f" + N'{FIELD_SEPARATOR}' + ".join(_sql_field(*column) for column in columns)
+    return (f"CAST(HASHBYTES('SHA2_256', CAST(N'' AS NVARCHAR(MAX)) + {fields}) "
+            f"AS BINARY({FINGERPRINT_BYTES}))")